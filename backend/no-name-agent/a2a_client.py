@@ -0,0 +1,219 @@
+"""
+Process-wide HTTP layer for A2A and bank API calls.
+
+financial_agent (a RemoteA2aAgent) and bank_client each make outbound
+calls on hot paths. Left alone, each creates its own httpx client, so a cold
+path pays DNS, TLS and the agent-card fetch separately. Everything here
+shares one transport instead:
+
+- one keep-alive connection pool, HTTP/2 when the h2 package is installed,
+  sized by A2A_MAX_CONNECTIONS / A2A_MAX_KEEPALIVE
+- per-call timeouts: A2A_CONNECT_TIMEOUT for connecting, A2A_TIMEOUT for the
+  rest (agent calls can take a while; bank API calls pass their own)
+- retries with exponential backoff (A2A_RETRIES): GETs are retried on
+  connection errors and 502/503/504, other methods only when the request
+  never reached the server
+- agent cards (/.well-known/agent-card.json) are cached for A2A_CARD_TTL
+  seconds and then revalidated with If-None-Match / If-Modified-Since, so an
+  unchanged card costs a 304 instead of a full fetch
+"""
+
+import os
+import time
+import random
+import asyncio
+import importlib.util
+
+import httpx
+
+A2A_TIMEOUT = float(os.getenv("A2A_TIMEOUT", "120"))
+A2A_CONNECT_TIMEOUT = float(os.getenv("A2A_CONNECT_TIMEOUT", "5"))
+A2A_RETRIES = int(os.getenv("A2A_RETRIES", "2"))
+A2A_RETRY_BACKOFF = float(os.getenv("A2A_RETRY_BACKOFF", "0.25"))
+A2A_MAX_CONNECTIONS = int(os.getenv("A2A_MAX_CONNECTIONS", "50"))
+A2A_MAX_KEEPALIVE = int(os.getenv("A2A_MAX_KEEPALIVE", "20"))
+A2A_KEEPALIVE_EXPIRY = float(os.getenv("A2A_KEEPALIVE_EXPIRY", "120"))
+A2A_CARD_TTL = float(os.getenv("A2A_CARD_TTL", "300"))
+# HTTP/2 needs the optional h2 package (httpx[http2])
+A2A_HTTP2 = os.getenv("A2A_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+AGENT_CARD_PATHS = ("/.well-known/agent-card.json", "/.well-known/agent.json")
+RETRY_STATUS_CODES = (502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+# Failures where the request was never sent, so even a POST is safe to repeat
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Body headers that no longer apply once a cached body has been decoded
+DECODED_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class _CachedCard:
+    """An agent card response and the validators to revalidate it with."""
+
+    def __init__(self, response: httpx.Response):
+        self.status_code = response.status_code
+        self.headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in DECODED_BODY_HEADERS
+        ]
+        self.content = response.content
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.fetched_at = time.monotonic()
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() - self.fetched_at < A2A_CARD_TTL
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(self.status_code, headers=self.headers, content=self.content, request=request)
+
+
+class A2ATransport(httpx.AsyncBaseTransport):
+    """Pooled transport with retries and agent-card caching."""
+
+    def __init__(
+        self,
+        retries: int = A2A_RETRIES,
+        backoff: float = A2A_RETRY_BACKOFF,
+        http2: bool = A2A_HTTP2,
+        limits: httpx.Limits = None,
+    ):
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=limits or httpx.Limits(
+                max_connections=A2A_MAX_CONNECTIONS,
+                max_keepalive_connections=A2A_MAX_KEEPALIVE,
+                keepalive_expiry=A2A_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._retries = retries
+        self._backoff = backoff
+        self._cards = {}
+        self._card_locks = {}
+        self.http2 = http2
+        self.requests = 0
+        self.retried = 0
+        self.card_hits = 0
+        self.card_revalidated = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET" and request.url.path.endswith(AGENT_CARD_PATHS):
+            return await self._get_card(request)
+        return await self._send(request)
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.requests += 1
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                retryable = idempotent or isinstance(e, NOT_SENT_ERRORS)
+                if not retryable or attempt >= self._retries:
+                    raise
+            else:
+                if not (idempotent and response.status_code in RETRY_STATUS_CODES) or attempt >= self._retries:
+                    return response
+                await response.aclose()
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(self._backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+
+    async def _get_card(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        cached = self._cards.get(url)
+        if cached is not None and cached.fresh:
+            self.card_hits += 1
+            return cached.to_response(request)
+
+        # One fetch per card; concurrent resolvers wait for it
+        lock = self._card_locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            cached = self._cards.get(url)
+            if cached is not None and cached.fresh:
+                self.card_hits += 1
+                return cached.to_response(request)
+            if cached is not None:
+                if cached.etag:
+                    request.headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    request.headers["If-Modified-Since"] = cached.last_modified
+
+            response = await self._send(request)
+            if response.status_code == 304 and cached is not None:
+                await response.aclose()
+                cached.fetched_at = time.monotonic()
+                self.card_revalidated += 1
+                return cached.to_response(request)
+            if response.status_code != 200:
+                return response
+            await response.aread()
+            self._cards[url] = _CachedCard(response)
+            return self._cards[url].to_response(request)
+
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "requests": self.requests,
+            "retried": self.retried,
+            "cached_cards": len(self._cards),
+            "card_hits": self.card_hits,
+            "card_revalidated": self.card_revalidated,
+        }
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+a2a_transport = A2ATransport()
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """View of a2a_transport that does not close the pool when a client closes."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await a2a_transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Create an httpx client whose requests go through the shared pool.
+
+    Closing the returned client does not close the pool; that happens once,
+    in close_shared_transport, at shutdown.
+
+    Args:
+        **kwargs: httpx.AsyncClient arguments (base_url, timeout, headers, ...)
+
+    Returns:
+        httpx.AsyncClient: Client bound to the shared transport
+    """
+    kwargs.setdefault("timeout", httpx.Timeout(A2A_TIMEOUT, connect=A2A_CONNECT_TIMEOUT))
+    return httpx.AsyncClient(transport=_SharedTransport(), **kwargs)
+
+
+# Passed to every RemoteA2aAgent; ADK leaves clients it did not create open
+a2a_http_client = create_http_client()
+
+
+async def prefetch_agent_card(url: str) -> bool:
+    """
+    Warm the pool and the card cache so the first agent call skips both.
+
+    Returns:
+        bool: Whether the card was fetched
+    """
+    try:
+        response = await a2a_http_client.get(url)
+        return response.status_code == 200
+    except httpx.HTTPError:
+        return False
+
+
+async def close_shared_transport():
+    await a2a_http_client.aclose()
+    await a2a_transport.aclose()
@@ -0,0 +1,329 @@
+"""
+Affordability checks for large purchases.
+
+big_spendings_agent used to gather the user's summary, net worth, cash flow
+and goals with one financial_agent call per ReAct step and then apply the
+28/36 rule in prose. load_financial_snapshot fetches the same data from the
+bank API concurrently, and assess_affordability does the arithmetic:
+
+- front-end DTI: housing payment / gross monthly income (limit 28%)
+- back-end DTI: all debt payments incl. the new one / gross monthly income (limit 36%)
+- emergency fund: months of expenses covered by liquid savings after the down payment
+- goal impact: whether the monthly surplus left after the new payment still
+  covers the contributions the user's goals need
+
+Where an endpoint is unavailable, income and spending fall back to averages
+over the user's recent transactions; every fallback is listed in the result.
+A financed purchase whose loan term or rate is unknown is assessed with
+default terms (a 30-year mortgage or a 5-year loan at a configured rate),
+never as a cash purchase or a payment-free loan; see default_loan_terms.
+"""
+
+import os
+import asyncio
+import datetime
+from typing import Optional
+from dataclasses import dataclass, field
+
+from bank_client import BankApiClient, bank_client, parse_amount, parse_transaction_date
+from transaction_store import TransactionStore, transaction_store
+
+FRONT_END_DTI_LIMIT = 0.28
+BACK_END_DTI_LIMIT = 0.36
+EMERGENCY_FUND_MIN_MONTHS = 3
+EMERGENCY_FUND_TARGET_MONTHS = 6
+CASH_FLOW_MONTHS = 3
+
+# Loan terms assumed when the user gives none
+MORTGAGE_TERM_YEARS = 30
+MORTGAGE_RATE = float(os.getenv("AFFORDABILITY_MORTGAGE_RATE", "6.5"))
+LOAN_TERM_YEARS = 5
+LOAN_RATE = float(os.getenv("AFFORDABILITY_LOAN_RATE", "7.5"))
+
+HOUSING_PURCHASES = ("house", "home", "mortgage", "condo", "apartment", "property", "housing")
+LIQUID_ACCOUNT_TYPES = ("checking", "savings", "cash", "money market")
+
+
+def _pick(row: dict, *keys):
+    """First numeric value among keys in row, or None."""
+    for key in keys:
+        value = row.get(key) if isinstance(row, dict) else None
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip()):
+            return parse_amount(value)
+    return None
+
+
+def monthly_loan_payment(principal: float, annual_interest_rate: float, term_years: float) -> float:
+    """
+    Standard amortized monthly payment.
+
+    Args:
+        principal (float): Amount borrowed
+        annual_interest_rate (float): Annual rate in percent (e.g. 6.5)
+        term_years (float): Loan term in years
+
+    Returns:
+        float: Monthly payment (0 if nothing is borrowed)
+    """
+    if principal <= 0 or term_years <= 0:
+        return 0.0
+    payments = term_years * 12
+    rate = annual_interest_rate / 100 / 12
+    if rate == 0:
+        return principal / payments
+    return principal * rate / (1 - (1 + rate) ** -payments)
+
+
+def default_loan_terms(
+    is_housing: bool, term_years: Optional[float] = None, annual_interest_rate: Optional[float] = None
+) -> tuple:
+    """
+    Fill in unknown loan terms.
+
+    Args:
+        is_housing (bool): Whether the loan is a mortgage
+        term_years (float): Known term, or None if unknown
+        annual_interest_rate (float): Known rate in percent (0 for 0% financing),
+            or None if unknown
+
+    Returns:
+        tuple: (term_years, annual_interest_rate, dict of the values assumed)
+    """
+    assumed = {}
+    if term_years is None or term_years <= 0:
+        term_years = assumed["loan_term_years"] = MORTGAGE_TERM_YEARS if is_housing else LOAN_TERM_YEARS
+    if annual_interest_rate is None or annual_interest_rate < 0:
+        annual_interest_rate = assumed["annual_interest_rate"] = MORTGAGE_RATE if is_housing else LOAN_RATE
+    return term_years, annual_interest_rate, assumed
+
+
+@dataclass
+class FinancialSnapshot:
+    """The figures an affordability check needs, with where each came from."""
+
+    monthly_income: float = None
+    monthly_expenses: float = None
+    monthly_debt_payments: float = 0.0
+    liquid_savings: float = None
+    net_worth: float = None
+    goals: list = field(default_factory=list)
+    sources: dict = field(default_factory=dict)
+    unavailable: list = field(default_factory=list)
+
+
+async def load_financial_snapshot(
+    user_id: str,
+    client: BankApiClient = bank_client,
+    store: TransactionStore = transaction_store,
+) -> FinancialSnapshot:
+    """Fetch summary, net worth, cash flow, goals, accounts and transactions concurrently."""
+    names = ["summary", "net_worth", "cash_flow", "goals", "accounts", "transactions"]
+    results = await asyncio.gather(
+        client.fetch_financial_summary(user_id),
+        client.fetch_net_worth(user_id),
+        client.fetch_cash_flow(user_id),
+        client.fetch_goals(user_id),
+        client.fetch_accounts(user_id),
+        store.get(user_id),
+        return_exceptions=True,
+    )
+    data = {}
+    snapshot = FinancialSnapshot()
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            snapshot.unavailable.append(name)
+        else:
+            data[name] = result
+    summary, cash_flow = data.get("summary", {}), data.get("cash_flow", {})
+    accounts = data.get("accounts", [])
+
+    def first(*candidates):
+        """First (source, value) whose value is known."""
+        for source, value in candidates:
+            if value is not None:
+                return source, value
+        return None, None
+
+    recent = (
+        data["transactions"].monthly_cash_flow(CASH_FLOW_MONTHS)
+        if "transactions" in data
+        else {"income": None, "spending": None}
+    )
+    income_keys = ("monthly_income", "gross_monthly_income", "income", "total_income")
+    expense_keys = ("monthly_expenses", "expenses", "total_expenses")
+    debt_keys = ("monthly_debt_payments", "debt_payments", "total_debt_payments")
+    savings_keys = ("liquid_savings", "total_savings", "savings", "cash")
+
+    account_payments = [
+        _pick(account, "minimum_payment", "monthly_payment") for account in accounts
+    ]
+    liquid_balances = [
+        _pick(account, "balance", "current_balance")
+        for account in accounts
+        if any(kind in str(account.get("account_type", account.get("type", ""))).lower() for kind in LIQUID_ACCOUNT_TYPES)
+    ]
+
+    fields = {
+        "monthly_income": first(
+            ("cash_flow", _pick(cash_flow, *income_keys)),
+            ("summary", _pick(summary, *income_keys)),
+            ("transactions", recent["income"]),
+        ),
+        "monthly_expenses": first(
+            ("cash_flow", _pick(cash_flow, *expense_keys)),
+            ("summary", _pick(summary, *expense_keys)),
+            ("transactions", recent["spending"]),
+        ),
+        "monthly_debt_payments": first(
+            ("cash_flow", _pick(cash_flow, *debt_keys)),
+            ("summary", _pick(summary, *debt_keys)),
+            ("accounts", sum(p for p in account_payments if p) if any(account_payments) else None),
+        ),
+        "liquid_savings": first(
+            ("summary", _pick(summary, *savings_keys)),
+            ("accounts", sum(b for b in liquid_balances if b) if liquid_balances else None),
+        ),
+        "net_worth": first(
+            ("net_worth", _pick(data.get("net_worth", {}), "net_worth", "netWorth", "total")),
+            ("summary", _pick(summary, "net_worth", "netWorth")),
+        ),
+    }
+    for name, (source, value) in fields.items():
+        if source is not None:
+            setattr(snapshot, name, value)
+            snapshot.sources[name] = source
+    snapshot.monthly_debt_payments = snapshot.monthly_debt_payments or 0.0
+    snapshot.goals = data.get("goals", [])
+    return snapshot
+
+
+def _goal_monthly_need(goal: dict, today: datetime.date) -> tuple:
+    """(name, monthly contribution the goal still needs, or None if it has no deadline)."""
+    name = goal.get("name") or goal.get("goal_name") or "Goal"
+    target = _pick(goal, "target_amount", "target", "goal_amount") or 0
+    current = _pick(goal, "current_amount", "saved_amount", "current", "amount_saved") or 0
+    remaining = max(target - current, 0)
+    deadline = parse_transaction_date(str(goal.get("target_date") or goal.get("deadline") or ""))
+    if not remaining or deadline is None:
+        return name, 0.0 if not remaining else None
+    months_left = max((deadline.year - today.year) * 12 + deadline.month - today.month, 1)
+    return name, remaining / months_left
+
+
+def assess_affordability(
+    snapshot: FinancialSnapshot,
+    purchase_price: float,
+    down_payment: float,
+    monthly_payment: float,
+    is_housing: bool,
+    today: datetime.date = None,
+) -> dict:
+    """
+    Apply the 28/36 rule, emergency-fund and goal checks to a purchase.
+
+    Args:
+        snapshot (FinancialSnapshot): The user's finances
+        purchase_price (float): Total price
+        down_payment (float): Cash paid up front (the full price for cash purchases)
+        monthly_payment (float): New monthly payment (housing: incl. taxes and insurance)
+        is_housing (bool): Whether the front-end (housing) ratio applies
+        today (date): Reference date for goal deadlines
+
+    Returns:
+        dict: Verdict ("affordable", "stretch", "not_affordable" or
+            "insufficient_data"), the reasons, and the exact metrics
+    """
+    today = today or datetime.date.today()
+    reasons = []
+    metrics = {"purchase_price": round(purchase_price, 2), "down_payment": round(down_payment, 2),
+               "new_monthly_payment": round(monthly_payment, 2)}
+    income = snapshot.monthly_income
+    if not income or income <= 0:
+        return {
+            "verdict": "insufficient_data",
+            "reasons": ["Monthly income is unknown, so debt-to-income ratios cannot be computed."],
+            "metrics": metrics,
+            "unavailable": snapshot.unavailable,
+        }
+
+    blocking, stretching = False, False
+    metrics["monthly_income"] = round(income, 2)
+    metrics["existing_debt_payments"] = round(snapshot.monthly_debt_payments, 2)
+
+    if is_housing:
+        front_end = monthly_payment / income
+        metrics["front_end_dti"] = round(front_end * 100, 1)
+        metrics["max_housing_payment"] = round(income * FRONT_END_DTI_LIMIT, 2)
+        if front_end > FRONT_END_DTI_LIMIT:
+            blocking = True
+            reasons.append(
+                f"Housing payment is {front_end:.1%} of income, above the {FRONT_END_DTI_LIMIT:.0%} limit."
+            )
+
+    back_end = (snapshot.monthly_debt_payments + monthly_payment) / income
+    metrics["back_end_dti"] = round(back_end * 100, 1)
+    metrics["max_total_debt_payments"] = round(income * BACK_END_DTI_LIMIT, 2)
+    if back_end > BACK_END_DTI_LIMIT:
+        blocking = True
+        reasons.append(f"Total debt payments would be {back_end:.1%} of income, above the {BACK_END_DTI_LIMIT:.0%} limit.")
+
+    if snapshot.liquid_savings is not None:
+        remaining_savings = snapshot.liquid_savings - down_payment
+        metrics["liquid_savings_after_purchase"] = round(remaining_savings, 2)
+        if remaining_savings < 0:
+            blocking = True
+            reasons.append(f"The down payment exceeds liquid savings by ${-remaining_savings:,.2f}.")
+        if snapshot.monthly_expenses:
+            months = max(remaining_savings, 0) / (snapshot.monthly_expenses + monthly_payment)
+            metrics["emergency_fund_months"] = round(months, 1)
+            if months < EMERGENCY_FUND_MIN_MONTHS:
+                stretching = True
+                reasons.append(
+                    f"Only {months:.1f} months of expenses would remain in savings "
+                    f"(keep at least {EMERGENCY_FUND_MIN_MONTHS}, ideally {EMERGENCY_FUND_TARGET_MONTHS})."
+                )
+
+    if snapshot.monthly_expenses is not None:
+        # Expenses already include existing debt payments when derived from transactions
+        surplus = income - snapshot.monthly_expenses
+        if snapshot.sources.get("monthly_expenses") != "transactions":
+            surplus -= snapshot.monthly_debt_payments
+        surplus_after = surplus - monthly_payment
+        metrics["monthly_surplus"] = round(surplus, 2)
+        metrics["monthly_surplus_after_purchase"] = round(surplus_after, 2)
+        if surplus_after < 0:
+            blocking = True
+            reasons.append(f"Monthly spending would exceed income by ${-surplus_after:,.2f}.")
+
+        goal_needs = [_goal_monthly_need(goal, today) for goal in snapshot.goals]
+        needed = sum(need for _, need in goal_needs if need)
+        if needed:
+            metrics["goal_contributions_needed"] = round(needed, 2)
+            if surplus_after < needed <= surplus:
+                stretching = True
+                reasons.append(
+                    f"Goals need ${needed:,.2f}/month; after the purchase only ${max(surplus_after, 0):,.2f} would be left."
+                )
+        metrics["goals_at_risk"] = [
+            name for name, need in goal_needs if need and surplus_after < needed
+        ]
+
+    if blocking:
+        verdict = "not_affordable"
+    elif stretching:
+        verdict = "stretch"
+    else:
+        verdict = "affordable"
+        reasons.append("Within the 28/36 limits with savings and goals intact.")
+
+    return {
+        "verdict": verdict,
+        "reasons": reasons,
+        "metrics": metrics,
+        "sources": snapshot.sources,
+        "unavailable": snapshot.unavailable,
+    }
+
+
+def is_housing_purchase(purchase_type: str) -> bool:
+    return any(word in purchase_type.lower() for word in HOUSING_PURCHASES)
@@ -2,7 +2,6 @@ from google.adk.tools.google_search_tool import google_search
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
 from google.genai import types
 import uvicorn
 # from daily_spendings_agent import daily_spendings_agent
@@ -13,19 +12,30 @@ from google.adk.planners import PlanReActPlanner
 from daily_spendings_agent import daily_spendings_agent
 from investments_agent.agent import agent as investments_agent
 from google.adk.tools.agent_tool import AgentTool
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
 from big_spendings_agent import big_spendings_agent
 # from proactive_insights_agent.agent import proactive_insights_agent
 
 from calendar_agent import calendar_agent
+from prompt_budget import instrument_agent_tree
+from agent_executor import AdkAgentToA2AExecutor, build_a2a_app
+from intent_router import BIG_SPENDINGS, CALENDAR, DAILY_SPENDINGS, FINANCIAL, INVESTMENTS, IntentRouter
 
 daily_spendings_agent_tool = AgentTool(agent=daily_spendings_agent)
 investments_agent_tool = AgentTool(agent=investments_agent)
-financial_agent_tool = AgentTool(agent=financial_agent)
 calendar_agent_tool = AgentTool(agent=calendar_agent)
 big_spendings_agent_tool = AgentTool(agent=big_spendings_agent)
 # proactive_insights_agent_tool = AgentTool(agent=proactive_insights_agent)
 
+# Sends obvious requests straight to a sub-agent without a routing model call
+intent_router = IntentRouter({
+    FINANCIAL: financial_agent_tool,
+    CALENDAR: calendar_agent_tool,
+    BIG_SPENDINGS: big_spendings_agent_tool,
+    DAILY_SPENDINGS: daily_spendings_agent_tool,
+    INVESTMENTS: investments_agent_tool,
+})
+
 
 
 
@@ -168,6 +178,7 @@ Your Response: Use financial_agent to get transaction history for the user and f
         """,
     # sub_agents=[financial_agent],
     tools=[financial_agent_tool, daily_spendings_agent_tool, investments_agent_tool, calendar_agent_tool, big_spendings_agent_tool],
+    before_model_callback=intent_router.before_model_callback,
     generate_content_config=types.GenerateContentConfig(
                 safety_settings=[
                     types.SafetySetting( 
@@ -179,8 +190,12 @@ Your Response: Use financial_agent to get transaction history for the user and f
 )
 
 
+# Usage recording and, with PROMPT_CONTEXT_CACHE=1, static instruction caching
+instrument_agent_tree(root_agent)
 
 # # # Make your agent A2A-compatible
-a2a_app = to_a2a(root_agent, port=8001)
+# Served through AdkAgentToA2AExecutor for its concurrency limits, cancellation and streaming
+a2a_executor = AdkAgentToA2AExecutor(root_agent)
+a2a_app = build_a2a_app(a2a_executor, port=8001)
 
 # uvicorn.run(a2a_app, host='0.0.0.0', port=9998)
\ No newline at end of file
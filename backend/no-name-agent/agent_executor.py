@@ -1,13 +1,48 @@
+"""
+A2A executor that runs an ADK agent per task.
+
+- tasks run concurrently up to A2A_EXECUTOR_MAX_CONCURRENCY; further tasks
+  wait in submitted state, up to A2A_EXECUTOR_MAX_QUEUED, and are failed
+  beyond that
+- each task's run_async loop runs in its own asyncio task, tracked by task
+  id, so cancel() stops the agent (and its pending model and tool calls)
+  instead of letting it run to completion
+- sessions are partitioned per caller: the authenticated user, else the
+  "user_id" in the request metadata, else a shared anonymous id. Tasks in
+  the same conversation (caller + context id) run one at a time
+- with A2A_STREAMING=1 the agent runs in SSE mode and its partial text is
+  forwarded as it arrives, as appended chunks of the "response" artifact,
+  coalesced to at least A2A_STREAM_MIN_CHARS characters or one chunk per
+  A2A_STREAM_FLUSH_SECONDS. Tool calls and results are reported as working
+  status updates. The final chunk replaces the artifact with the complete
+  answer, so the finished task looks the same as without streaming
+
+build_a2a_app serves an agent over A2A with this executor, in place of
+ADK's to_a2a (whose executor has none of the above).
+"""
+
+import os
 import json
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.utils.errors import ServerError
 from a2a.types import (
+    AgentCapabilities,
     Part,
     Task,
     TaskState,
+    TaskNotCancelableError,
     TextPart,
-    UnsupportedOperationError,
 )
 from a2a.utils import (
     new_agent_parts_message,
@@ -21,9 +56,92 @@ from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactServ
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
 from google.genai.types import Content
 
+from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.agents.base_agent import BaseAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from agent import FinancialCopilotAgent
+from stream_logging import SessionLog, configure_stream_logging
+
+MAX_CONCURRENT_TASKS = int(os.getenv("A2A_EXECUTOR_MAX_CONCURRENCY", "8"))
+MAX_QUEUED_TASKS = int(os.getenv("A2A_EXECUTOR_MAX_QUEUED", "64"))
+ANONYMOUS_USER_ID = "remote_agent"
+STREAMING_ENABLED = os.getenv("A2A_STREAMING", "1") == "1"
+STREAM_MIN_CHARS = int(os.getenv("A2A_STREAM_MIN_CHARS", "120"))
+STREAM_FLUSH_SECONDS = float(os.getenv("A2A_STREAM_FLUSH_SECONDS", "0.25"))
+TOOL_RESULT_PREVIEW_CHARS = 2000
+
+
+def caller_user_id(context: RequestContext) -> str:
+    """The user a request's sessions belong to."""
+    user = context.call_context.user if context.call_context else None
+    if user is not None and user.is_authenticated and user.user_name:
+        return user.user_name
+    for metadata in (context.metadata, context.message.metadata if context.message else None):
+        if metadata and metadata.get("user_id"):
+            return str(metadata["user_id"])
+    return ANONYMOUS_USER_ID
+
+
+def _preview(result) -> str:
+    text = result if isinstance(result, str) else json.dumps(result, default=str)
+    return text[:TOOL_RESULT_PREVIEW_CHARS]
+
+
+class ArtifactStream:
+    """Coalesces partial response text into appended chunks of one artifact."""
+
+    def __init__(
+        self,
+        updater: TaskUpdater,
+        name: str = "response",
+        min_chars: int = STREAM_MIN_CHARS,
+        flush_seconds: float = STREAM_FLUSH_SECONDS,
+    ):
+        self.artifact_id = str(uuid.uuid4())
+        self.chunks = 0
+        self._updater = updater
+        self._name = name
+        self._min_chars = min_chars
+        self._flush_seconds = flush_seconds
+        self._buffer = []
+        self._buffered = 0
+        # The first chunk goes out as soon as it arrives
+        self._last_flush = 0.0
+
+    async def add(self, text: str):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._min_chars or time.monotonic() - self._last_flush >= self._flush_seconds:
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        await self._updater.add_artifact(
+            [Part(root=TextPart(text=text))],
+            artifact_id=self.artifact_id,
+            name=self._name,
+            append=self.chunks > 0,
+            last_chunk=False,
+        )
+        self.chunks += 1
+        self._last_flush = time.monotonic()
+
+    async def finish(self, text: str, metadata: dict = None):
+        """Replace the streamed chunks with the complete text."""
+        self._buffer.clear()
+        self._buffered = 0
+        await self._updater.add_artifact(
+            [Part(root=TextPart(text=text))],
+            artifact_id=self.artifact_id,
+            name=self._name,
+            metadata=metadata,
+            append=False,
+            last_chunk=True,
+        )
 
 
 class AdkAgentToA2AExecutor(AgentExecutor):
@@ -40,7 +158,15 @@ class AdkAgentToA2AExecutor(AgentExecutor):
             artifact_service=InMemoryArtifactService(),
             memory_service=InMemoryMemoryService(),
         )
-        self._user_id = "remote_agent"
+        self._slots = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+        # Task id -> the asyncio task driving its run_async loop
+        self._running = {}
+        # (user_id, context_id) -> [lock, tasks using it]
+        self._conversations = {}
+        # Ids of tasks accepted but not yet holding a slot
+        self._waiting = set()
+        self._active = 0
+        configure_stream_logging()
 
     async def execute(
         self,
@@ -58,17 +184,58 @@ class AdkAgentToA2AExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
 
         updater = TaskUpdater(event_queue, task.id, task.context_id)
+        # Check and reserve the queue place with no await in between, so concurrent calls cannot overshoot
+        if len(self._waiting) >= MAX_QUEUED_TASKS:
+            await updater.failed(message=new_agent_text_message("The agent is busy. Please try again shortly."))
+            return
+        self._waiting.add(task.id)
+
+        run = asyncio.create_task(self._run_queued(query, task, caller_user_id(context), updater))
+        self._running[task.id] = run
+        try:
+            # wait() rather than await: a cancel() of run must not cancel execute itself
+            await asyncio.wait({run})
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+        finally:
+            self._running.pop(task.id, None)
+            # A run cancelled before it started never left the queue itself
+            self._waiting.discard(task.id)
+        if not run.cancelled():
+            run.result()
+
+    async def _run_queued(self, query: str, task: Task, user_id: str, updater: TaskUpdater):
+        """Wait for the conversation and a free slot, then run the agent."""
+        key = (user_id, task.context_id)
+        conversation = self._conversations.setdefault(key, [asyncio.Lock(), 0])
+        conversation[1] += 1
+        try:
+            async with conversation[0]:
+                async with self._slots:
+                    self._waiting.discard(task.id)
+                    self._active += 1
+                    try:
+                        await self._run_agent(query, task, user_id, updater)
+                    finally:
+                        self._active -= 1
+        finally:
+            conversation[1] -= 1
+            if not conversation[1]:
+                self._conversations.pop(key, None)
+
+    async def _run_agent(self, query: str, task: Task, user_id: str, updater: TaskUpdater):
         session_id = task.context_id
 
         session = await self._runner.session_service.get_session(
             app_name=self._agent.name,
-            user_id=self._user_id,
+            user_id=user_id,
             session_id=session_id,
         )
         if session is None:
             session = await self._runner.session_service.create_session(
                 app_name=self._agent.name,
-                user_id=self._user_id,
+                user_id=user_id,
                 state={},
                 session_id=session_id,
             )
@@ -77,6 +244,11 @@ class AdkAgentToA2AExecutor(AgentExecutor):
 
         full_response_text = ""
 
+        session_log = SessionLog(session_id)
+
+        stream = ArtifactStream(updater)
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE if STREAMING_ENABLED else StreamingMode.NONE)
+
         # Working status
         await updater.start_work()
 
@@ -86,12 +258,34 @@ class AdkAgentToA2AExecutor(AgentExecutor):
             isjson_response = False
 
             async for event in self._runner.run_async(
-                user_id=self._user_id, session_id=session.id, new_message=content
+                user_id=user_id, session_id=session.id, new_message=content, run_config=run_config
             ):
-                
+                if event.partial:
+                    if event.content and event.content.parts:
+                        text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+                        if text:
+                            await stream.add(text)
+                    continue
+
                 if event.content and event.content.parts:
+                    calls = event.get_function_calls()
                     responses = event.get_function_responses()
-                    print(event.content.parts)
+                    session_log.event(
+                        "executor",
+                        "event_parts",
+                        logging.DEBUG,
+                        author=event.author,
+                        parts=len(event.content.parts),
+                        function_responses=len(responses),
+                    )
+                    if calls:
+                        await stream.flush()
+                    for call in calls:
+                        await updater.update_status(
+                            TaskState.working,
+                            message=new_agent_text_message(f"Calling {call.name}", task.context_id, task.id),
+                            metadata={"tool_name": call.name},
+                        )
                     if responses:
                         for response in responses:
                             if 'result' in response.response:
@@ -100,22 +294,25 @@ class AdkAgentToA2AExecutor(AgentExecutor):
                             else:
                                 tool_name = response.name
                                 tool_result = response.response
+                            await updater.update_status(
+                                TaskState.working,
+                                message=new_agent_text_message(f"{tool_name} finished", task.context_id, task.id),
+                                metadata={"tool_name": tool_name, "tool_result": _preview(tool_result)},
+                            )
 
                 if event.is_final_response():
                     if event.content and event.content.parts and event.content.parts[0].text:
                         if not isjson_response:
-                            await updater.add_artifact(
-                                [Part(root=TextPart(text=event.content.parts[0].text))], 
-                                name='response',
+                            await stream.finish(
+                                event.content.parts[0].text,
                                 metadata={
                                     "tool_name": tool_name,
                                     "tool_result": tool_result,
                                 }
                             )
                         else:
-                            await updater.add_artifact(
-                                [Part(root=TextPart(text=tool_result))], 
-                                name='response',
+                            await stream.finish(
+                                tool_result,
                                 metadata={
                                     "tool_name": tool_name,
                                     "tool_result": tool_result,
@@ -129,4 +326,56 @@ class AdkAgentToA2AExecutor(AgentExecutor):
     async def cancel(
         self, context: RequestContext, event_queue: EventQueue
     ) -> None:
-        raise ServerError(error=UnsupportedOperationError())
\ No newline at end of file
+        run = self._running.get(context.task_id)
+        if run is None or run.done():
+            raise ServerError(error=TaskNotCancelableError())
+        # Cancelling the task closes the run_async iterator and its in-flight model/tool calls
+        run.cancel()
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._active,
+            "queued": len(self._waiting),
+            "max_concurrency": MAX_CONCURRENT_TASKS,
+            "conversations": len(self._conversations),
+        }
+
+
+def build_a2a_app(
+    executor: AdkAgentToA2AExecutor,
+    host: str = "localhost",
+    port: int = 8000,
+    protocol: str = "http",
+) -> Starlette:
+    """
+    A2A Starlette application serving an agent through AdkAgentToA2AExecutor.
+
+    The agent card is built from the agent at startup, as ADK's to_a2a does,
+    and advertises streaming when A2A_STREAMING is on, so clients use
+    message/stream and receive the partial artifact chunks.
+
+    Args:
+        executor (AdkAgentToA2AExecutor): The executor wrapping the agent to serve
+        host (str): Host for the RPC URL in the agent card
+        port (int): Port for the RPC URL in the agent card
+        protocol (str): Protocol for the RPC URL in the agent card
+
+    Returns:
+        Starlette: The application, to run with uvicorn
+    """
+    card_builder = AgentCardBuilder(
+        agent=executor._agent,
+        rpc_url=f"{protocol}://{host}:{port}/",
+        capabilities=AgentCapabilities(streaming=STREAMING_ENABLED),
+    )
+    request_handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        agent_card = await card_builder.build()
+        A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler).add_routes_to_app(app)
+        yield
+
+    return Starlette(lifespan=lifespan)
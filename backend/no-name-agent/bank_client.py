@@ -0,0 +1,255 @@
+"""
+Direct client for the Cymbal Bank API that backs the remote financial_agent.
+
+The financial_agent answers questions by calling this same API, but going
+through it costs a Gemini round-trip and re-serializes the data as text.
+For pure data lookups (e.g. the transaction history chart) we call the API
+directly and only fall back to the agent when the API is unavailable.
+
+The REST API is not served by the A2A agent's host, so its base URL must
+be configured with BANK_API_BASE_URL. Without it every call raises
+BankApiError before any request is made and callers use the agent path.
+"""
+
+import os
+import re
+import json
+import datetime
+from dataclasses import dataclass
+from functools import lru_cache
+
+import httpx
+
+from a2a_client import create_http_client
+
+# Base URL of the bank REST API; the direct path is disabled when unset
+BANK_API_URL = os.getenv("BANK_API_BASE_URL", "").rstrip("/")
+BANK_API_TIMEOUT = float(os.getenv("CYMBAL_BANK_API_TIMEOUT", "10"))
+
+
+class BankApiError(Exception):
+    """Raised when the bank API cannot be reached or returns unusable data."""
+
+
+@dataclass(frozen=True)
+class Transaction:
+    """A single bank transaction."""
+
+    transaction_id: str
+    account_id: str
+    amount: float
+    category: str
+    date: str
+    description: str
+
+    @classmethod
+    def from_api(cls, row: dict) -> "Transaction":
+        """
+        Build a Transaction from an API row.
+
+        Accepts both the snake_case keys returned by the bank API and the
+        display keys ("Transaction ID", "Amount", ...) used by the frontend.
+        """
+        def pick(*keys, default=""):
+            for key in keys:
+                if key in row and row[key] is not None:
+                    return row[key]
+            return default
+
+        return cls(
+            transaction_id=str(pick("transaction_id", "Transaction ID", "id")),
+            account_id=str(pick("account_id", "Account ID")),
+            amount=parse_amount(pick("amount", "Amount", default=0)),
+            category=str(pick("category", "Category")),
+            date=str(pick("date", "Date", "timestamp")),
+            description=str(pick("description", "Description", "merchant", "Merchant")),
+        )
+
+    def to_row(self) -> dict:
+        """Return the transaction in the JSON format the frontend expects."""
+        return {
+            "Transaction ID": self.transaction_id,
+            "Account ID": self.account_id,
+            "Amount": format_amount(self.amount),
+            "Category": self.category,
+            "Date": self.date,
+            "Description": self.description,
+        }
+
+
+def parse_amount(value) -> float:
+    """Parse an amount such as 12.5, "12.50" or "-$1,200" into a float."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("$", "").replace(",", "")
+    try:
+        return float(text) if text else 0.0
+    except ValueError:
+        return 0.0
+
+
+def format_amount(amount: float) -> str:
+    """Format an amount the way the bank API displays it (e.g. "$4000", "-$12.50")."""
+    sign = "-" if amount < 0 else ""
+    value = abs(amount)
+    if value == int(value):
+        return f"{sign}${int(value)}"
+    return f"{sign}${value:.2f}"
+
+
+def debits_are_negative(amounts) -> bool:
+    """
+    Whether a history records spending as negative amounts.
+
+    Decided by majority, so a few refunds in a positive-debit history (or a
+    few deposits in a negative-debit one) do not flip the convention.
+    """
+    negatives = positives = 0
+    for amount in amounts:
+        if amount < 0:
+            negatives += 1
+        elif amount > 0:
+            positives += 1
+    return negatives > positives
+
+
+@lru_cache(maxsize=4096)
+def normalize_merchant(name: str, merge_locations: bool = False) -> str:
+    """
+    Normalize a merchant name by case and punctuation ("AMAZON MKTPLACE #123"
+    becomes "amazon mktplace 123").
+
+    Numbers are kept by default, since "Store 42" and "Store 17" are different
+    stores. With merge_locations, numeric words are dropped as well so every
+    location or reference number of a merchant maps to one name.
+    """
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    if merge_locations:
+        words = [word for word in words if not word.isdigit()]
+    return " ".join(words)
+
+
+TRANSACTION_DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%m/%d/%Y %H:%M", "%m/%d/%Y"]
+
+
+def parse_transaction_date(value: str) -> datetime.datetime:
+    """
+    Parse a transaction date or timestamp into a UTC-comparable datetime.
+
+    Args:
+        value (str): ISO 8601 ("2025-08-14T10:00:00Z", "2025-08-14") or US-style date
+
+    Returns:
+        datetime: Aware datetime (naive values are taken as UTC), or None
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        for fmt in TRANSACTION_DATE_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed
+
+
+class BankApiClient:
+    """Async client for the Cymbal Bank REST API."""
+
+    def __init__(self, base_url: str = BANK_API_URL, timeout: float = BANK_API_TIMEOUT):
+        self._base_url = base_url
+        self._timeout = timeout
+        self._client = None
+
+    @property
+    def configured(self) -> bool:
+        """Whether a base URL is set; if not, every call raises BankApiError."""
+        return bool(self._base_url)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Share the process-wide keep-alive pool
+            self._client = create_http_client(base_url=self._base_url, timeout=self._timeout)
+        return self._client
+
+    async def get_json(self, path: str, params: dict = None):
+        """GET a path on the bank API and return the decoded JSON body."""
+        if not self.configured:
+            raise BankApiError("BANK_API_BASE_URL is not set")
+        try:
+            response = await self._get_client().get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            raise BankApiError(f"GET {path} failed: {e}") from e
+
+    async def fetch_transactions(self, user_id: str) -> list[Transaction]:
+        """
+        Fetch every transaction for a user in one request.
+
+        Args:
+            user_id (str): The bank user ID (e.g. "user-001")
+
+        Returns:
+            list[Transaction]: The user's transactions in API order
+        """
+        data = await self.get_json(f"/api/users/{user_id}/transactions")
+        if isinstance(data, dict):
+            data = data.get("transactions", data.get("data"))
+        if not isinstance(data, list):
+            raise BankApiError(f"Unexpected transactions payload for user {user_id}")
+        return [Transaction.from_api(row) for row in data if isinstance(row, dict)]
+
+    async def _fetch_list(self, path: str, *keys: str, params: dict = None) -> list[dict]:
+        """GET a path that returns a list of objects, possibly wrapped in one of keys."""
+        data = await self.get_json(path, params=params)
+        if isinstance(data, dict):
+            for key in keys + ("data",):
+                if isinstance(data.get(key), list):
+                    data = data[key]
+                    break
+        if not isinstance(data, list):
+            raise BankApiError(f"Unexpected payload from {path}")
+        return [row for row in data if isinstance(row, dict)]
+
+    async def fetch_accounts(self, user_id: str) -> list[dict]:
+        """Fetch the user's bank accounts (GET /api/users/{user_id}/accounts)."""
+        return await self._fetch_list(f"/api/users/{user_id}/accounts", "accounts")
+
+    async def fetch_goals(self, user_id: str) -> list[dict]:
+        """Fetch the user's financial goals (GET /api/goals/{user_id})."""
+        return await self._fetch_list(f"/api/goals/{user_id}", "goals")
+
+    async def _fetch_financials(self, name: str, user_id: str) -> dict:
+        data = await self.get_json(f"/api/financials/{name}", params={"user_id": user_id})
+        if not isinstance(data, dict):
+            raise BankApiError(f"Unexpected {name} payload for user {user_id}")
+        return data
+
+    async def fetch_net_worth(self, user_id: str) -> dict:
+        """Fetch the user's net worth breakdown (GET /api/financials/net-worth)."""
+        return await self._fetch_financials("net-worth", user_id)
+
+    async def fetch_financial_summary(self, user_id: str) -> dict:
+        """Fetch the user's financial summary (GET /api/financials/summary)."""
+        return await self._fetch_financials("summary", user_id)
+
+    async def fetch_cash_flow(self, user_id: str) -> dict:
+        """Fetch the user's monthly cash flow (GET /api/financials/cash-flow)."""
+        return await self._fetch_financials("cash-flow", user_id)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+bank_client = BankApiClient()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the calendar free-slot finder.
+
+Generates busy calendars with thousands of random events (including
+overlapping and all-day events) and times find_free_slots, checking its
+answers against a brute-force minute-by-minute scan on the smaller sizes.
+
+Usage (from backend/no-name-agent):
+    python benchmarks/bench_free_slots.py
+"""
+
+import sys
+import time
+import random
+import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calendar_free_slots import find_free_slots, working_windows  # noqa: E402
+
+TIMEZONE_ID = "America/New_York"
+ZONE = ZoneInfo(TIMEZONE_ID)
+WINDOW_START = datetime.datetime(2025, 1, 6, tzinfo=ZONE)
+SIZES = [1_000, 5_000, 20_000, 100_000]
+REPEATS = 5
+
+
+def random_calendar(event_count: int, days: int, seed: int = 42) -> list:
+    """Random busy intervals: mostly 15-120 minute meetings, some all-day events."""
+    rng = random.Random(seed)
+    start = WINDOW_START.timestamp()
+    intervals = []
+    for _ in range(event_count):
+        day = rng.randrange(days)
+        if rng.random() < 0.02:
+            day_start = (WINDOW_START + datetime.timedelta(days=day)).timestamp()
+            intervals.append((day_start, day_start + 86400))
+            continue
+        minute = rng.randrange(7 * 60, 19 * 60)
+        event_start = start + day * 86400 + minute * 60
+        intervals.append((event_start, event_start + rng.choice([15, 30, 45, 60, 90, 120]) * 60))
+    return intervals
+
+
+def brute_force(busy, window_end, duration, max_slots):
+    """Reference answer: walk every minute of every working window."""
+    slots = []
+    for day_start, day_end in working_windows(WINDOW_START, window_end, TIMEZONE_ID):
+        minute = day_start
+        free_from = None
+        while minute <= day_end:
+            taken = minute == day_end or any(s <= minute < e for s, e in busy)
+            if not taken and free_from is None:
+                free_from = minute
+            if taken and free_from is not None:
+                if minute - free_from >= duration.total_seconds():
+                    slots.append((free_from, minute))
+                free_from = None
+            minute += 60
+        if len(slots) >= max_slots:
+            break
+    return slots[:max_slots]
+
+
+def main():
+    duration = datetime.timedelta(minutes=30)
+    for size in SIZES:
+        days = max(30, size // 8)
+        window_end = WINDOW_START + datetime.timedelta(days=days)
+        busy = random_calendar(size, days)
+
+        timings = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            slots = find_free_slots(busy, WINDOW_START, window_end, duration, TIMEZONE_ID, max_slots=10)
+            timings.append(time.perf_counter() - started)
+
+        # Ask for every slot in the window to measure a full sweep
+        started = time.perf_counter()
+        all_slots = find_free_slots(busy, WINDOW_START, window_end, duration, TIMEZONE_ID, max_slots=10**9)
+        full_sweep = time.perf_counter() - started
+
+        checked = ""
+        if size <= 1_000:
+            expected = brute_force(busy, window_end, duration, 10)
+            actual = [(s.timestamp(), e.timestamp()) for s, e in slots]
+            assert actual == expected, f"mismatch for {size} events"
+            checked = " (matches brute force)"
+
+        print(
+            f"{size:>7} events over {days:>4} days: first 10 slots "
+            f"{min(timings) * 1000:8.2f} ms, all {len(all_slots):>5} slots "
+            f"{full_sweep * 1000:8.2f} ms{checked}"
+        )
+
+
+if __name__ == "__main__":
+    main()
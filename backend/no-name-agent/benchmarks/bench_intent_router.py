@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Accuracy and latency benchmark for the root_agent intent router.
+
+Runs the keyword classifier over a labeled set of requests: the examples
+from root_agent's instruction plus held-out paraphrases, and requests that
+must stay with the model (writes, ambiguous, multi-intent, out of scope).
+Reports how many requests are pre-routed (coverage), how many of those go
+to the right sub-agent (precision), and the per-request classification time.
+
+With --llm MODEL it also asks the current router (root_agent's instruction
+and tools on MODEL, without the pre-routing callback) for its first tool
+call on every request, and reports agreement and the time that hop takes.
+That mode needs Gemini credentials (GOOGLE_API_KEY or Vertex AI settings).
+
+Usage (from backend/no-name-agent):
+    python benchmarks/bench_intent_router.py
+    python benchmarks/bench_intent_router.py --llm gemini-2.0-flash
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from financial_agent.cache import WRITE_REQUEST_PATTERN  # noqa: E402
+from intent_router import (  # noqa: E402
+    BIG_SPENDINGS,
+    CALENDAR,
+    DAILY_SPENDINGS,
+    FINANCIAL,
+    INVESTMENTS,
+    ROUTE_EXAMPLES,
+    IntentClassifier,
+)
+
+MODEL = None  # must go through the model
+
+HELD_OUT = [
+    ("List my accounts", FINANCIAL),
+    ("What's my checking account balance?", FINANCIAL),
+    ("Show my transaction history as a table", FINANCIAL),
+    ("What did I spend recently? Show my last transactions", FINANCIAL),
+    ("How much debt do I have?", FINANCIAL),
+    ("What are my liabilities?", FINANCIAL),
+    ("How is my cash flow this month?", FINANCIAL),
+    ("Which partners offer benefits?", FINANCIAL),
+    ("How close am I to my vacation goal?", FINANCIAL),
+    ("Do I have any recurring payments?", FINANCIAL),
+    ("Do I have any meetings this week?", CALENDAR),
+    ("What's on my calendar tomorrow?", CALENDAR),
+    ("Show my upcoming appointments", CALENDAR),
+    ("Is it affordable for me to buy a house?", BIG_SPENDINGS),
+    ("Could I afford a $30,000 car?", BIG_SPENDINGS),
+    ("How much of a down payment would I need for a home?", BIG_SPENDINGS),
+    ("Am I eligible for a home loan?", BIG_SPENDINGS),
+    ("Which subscriptions am I paying for?", DAILY_SPENDINGS),
+    ("Any coupons I could use?", DAILY_SPENDINGS),
+    ("I was charged twice at the coffee shop", DAILY_SPENDINGS),
+    ("Find duplicate charges on my card", DAILY_SPENDINGS),
+    ("Are there deals on groceries?", DAILY_SPENDINGS),
+    ("How is the Nasdaq doing today?", INVESTMENTS),
+    ("What's the share price of Tesla?", INVESTMENTS),
+    ("Explain what an ETF is", INVESTMENTS),
+    ("What is a Roth IRA?", INVESTMENTS),
+    ("Any financial news about Apple?", INVESTMENTS),
+    # Writes: the instruction asks the model to gather details and confirm first
+    ("I want to open a new savings account.", MODEL),
+    ("Help me set up a goal to save for a vacation.", MODEL),
+    ("Increase my car savings goal by $500.", MODEL),
+    ("Set up a monthly $50 transfer to my savings.", MODEL),
+    ("Cancel my automatic gym payment.", MODEL),
+    ("Deposit $100 into my savings account", MODEL),
+    ("Add $500 to my vacation goal", MODEL),
+    ("Move $50 from checking to savings", MODEL),
+    ("Withdraw $20 from my checking account", MODEL),
+    ("Close my checking account", MODEL),
+    ("Reschedule my meeting with Alice to Friday", MODEL),
+    ("Move my meeting to 3pm", MODEL),
+    ("Add a meeting with Bob tomorrow at 2pm", MODEL),
+    ("Stop my Netflix subscription", MODEL),
+    ("Yes, go ahead with the savings account", MODEL),
+    # Ambiguous, multi-intent or out of scope
+    ("Cancel my booking", MODEL),
+    ("Show my accounts and check my subscriptions", MODEL),
+    ("What's the weather?", MODEL),
+    ("Hi there", MODEL),
+    ("Thanks!", MODEL),
+    ("How much did I spend on groceries last month?", MODEL),
+]
+
+ITERATIONS = 2_000
+
+
+def labeled_requests() -> list:
+    # Instruction examples that change data are meant to go through the model
+    instruction = [
+        (text, MODEL if WRITE_REQUEST_PATTERN.search(text) else label)
+        for label, texts in ROUTE_EXAMPLES.items()
+        for text in texts
+    ]
+    return [("instruction", text, label) for text, label in instruction] + [
+        ("held-out", text, label) for text, label in HELD_OUT
+    ]
+
+
+def accuracy(classifier: IntentClassifier, requests: list):
+    print(f"{'set':<12}{'requests':>10}{'routed':>9}{'correct':>9}{'wrong':>7}{'to model':>10}")
+    mistakes = []
+    for name in ("instruction", "held-out"):
+        rows = [(text, label) for kind, text, label in requests if kind == name]
+        routed = correct = wrong = 0
+        for text, label in rows:
+            route = classifier.classify(text)
+            if route is None:
+                continue
+            routed += 1
+            if route.label == label:
+                correct += 1
+            else:
+                # label None: only the model should answer; anything routed is a mistake
+                wrong += 1
+                mistakes.append((text, label, route.label))
+        print(f"{name:<12}{len(rows):>10}{routed:>9}{correct:>9}{wrong:>7}{len(rows) - routed:>10}")
+    routable = [text for _, text, label in requests if label is not MODEL]
+    covered = sum(1 for text in routable if classifier.classify(text) is not None)
+    print(f"coverage of routable requests: {covered}/{len(routable)} ({covered / len(routable):.0%})")
+    for text, expected, got in mistakes:
+        print(f"  misrouted: {text!r} -> {got} (expected {expected or 'model'})")
+
+
+def latency(classifier: IntentClassifier, requests: list):
+    texts = [text for _, text, _ in requests]
+    started = time.perf_counter()
+    for _ in range(ITERATIONS // 10):
+        classifier._classify.cache_clear()
+        for text in texts:
+            classifier.classify(text)
+    cold = (time.perf_counter() - started) / (ITERATIONS // 10 * len(texts)) * 1e6
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for text in texts:
+            classifier.classify(text)
+    warm = (time.perf_counter() - started) / (ITERATIONS * len(texts)) * 1e6
+
+    started = time.perf_counter()
+    IntentClassifier()
+    build = (time.perf_counter() - started) * 1e3
+    print(f"classify: {cold:.1f} us cold, {warm:.2f} us cached; building the classifier: {build:.2f} ms")
+
+
+async def llm_routing(model: str, classifier: IntentClassifier, requests: list):
+    """Time root_agent's own routing hop and compare its choices with the classifier."""
+    from google.genai import types
+    from google.adk.agents.llm_agent import LlmAgent
+    from google.adk.runners import InMemoryRunner
+
+    from agent import intent_router, root_agent
+
+    router = LlmAgent(
+        model=model,
+        name=root_agent.name,
+        global_instruction=root_agent.global_instruction,
+        instruction=root_agent.instruction,
+        tools=root_agent.tools,
+    )
+    runner = InMemoryRunner(agent=router, app_name="bench_intent_router")
+    tool_labels = {tool.name: label for label, tool in intent_router.tools.items()}
+
+    agree = disagree = 0
+    timings = []
+    for _, text, _ in requests:
+        session = await runner.session_service.create_session(app_name="bench_intent_router", user_id="user-001")
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        started = time.perf_counter()
+        chosen = MODEL
+        async for event in runner.run_async(user_id="user-001", session_id=session.id, new_message=message):
+            calls = event.get_function_calls()
+            if calls:
+                chosen = tool_labels.get(calls[0].name, calls[0].name)
+                break
+            if event.is_final_response():
+                break
+        timings.append(time.perf_counter() - started)
+
+        route = classifier.classify(text)
+        if route is not None:
+            if route.label == chosen:
+                agree += 1
+            else:
+                disagree += 1
+                print(f"  differs: {text!r}: router {route.label}, model {chosen or 'answered directly'}")
+
+    timings.sort()
+    print(f"model routing hop ({model}): median {timings[len(timings) // 2] * 1e3:.0f} ms, "
+          f"max {timings[-1] * 1e3:.0f} ms over {len(timings)} requests")
+    print(f"pre-routed requests where the model picked the same tool: {agree}/{agree + disagree}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", metavar="MODEL", help="also time and compare against root_agent's routing on MODEL")
+    args = parser.parse_args()
+
+    classifier = IntentClassifier()
+    requests = labeled_requests()
+    accuracy(classifier, requests)
+    latency(classifier, requests)
+    if args.llm:
+        asyncio.run(llm_routing(args.llm, classifier, requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the calendar agent's parse_datetime.
+
+Compares calendar_datetime.parse_datetime (regex dispatch + memoization)
+against the previous try-every-strptime-format loop, on each absolute
+format the tools accept, with a warm cache (repeated strings, as the model
+sends them) and a cold one. Both parsers must agree on every input.
+
+Usage (from backend/no-name-agent):
+    python benchmarks/bench_parse_datetime.py
+"""
+
+import sys
+import time
+import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import calendar_datetime  # noqa: E402
+from calendar_datetime import parse_datetime  # noqa: E402
+
+LEGACY_FORMATS = [
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %I:%M %p",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y",
+    "%B %d, %Y %H:%M",
+    "%B %d, %Y %I:%M %p",
+    "%B %d, %Y",
+]
+
+# One sample per legacy format (the later ones paid for every earlier miss), plus a failure
+SAMPLES = [
+    "2023-12-31 14:00",
+    "2023-12-31 2:00 PM",
+    "2023-12-31",
+    "12/31/2023 14:00",
+    "12/31/2023 2:00 PM",
+    "12/31/2023",
+    "December 31, 2023 14:00",
+    "December 31, 2023 2:00 PM",
+    "December 31, 2023",
+    "not a date",
+]
+ITERATIONS = 20_000
+
+
+def legacy_parse_datetime(datetime_str):
+    """The previous implementation, kept here as the baseline."""
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.datetime.strptime(datetime_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def per_call_us(func, value, iterations=ITERATIONS) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(value)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def cold_parse(value):
+    calendar_datetime._parse.cache_clear()
+    return parse_datetime(value)
+
+
+def main():
+    for sample in SAMPLES:
+        assert parse_datetime(sample) == legacy_parse_datetime(sample), sample
+
+    print(f"{'input':<28}{'legacy':>12}{'cold':>12}{'cached':>12}")
+    totals = [0.0, 0.0, 0.0]
+    for sample in SAMPLES:
+        timings = [
+            per_call_us(legacy_parse_datetime, sample),
+            per_call_us(cold_parse, sample),
+            per_call_us(parse_datetime, sample),
+        ]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        print(f"{sample!r:<28}" + "".join(f"{timing:>9.2f} us" for timing in timings))
+    print(f"{'mean':<28}" + "".join(f"{total / len(SAMPLES):>9.2f} us" for total in totals))
+
+    today = datetime.date(2025, 1, 7)
+    for phrase in ("tomorrow 3pm", "next tuesday at 10:30", "in 2 days"):
+        print(f"{phrase!r:<28}-> {parse_datetime(phrase, today)} (legacy: {legacy_parse_datetime(phrase)})")
+
+
+if __name__ == "__main__":
+    main()
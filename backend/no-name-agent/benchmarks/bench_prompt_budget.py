@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Static prompt budget of the agent tree, and the effect of instruction caching.
+
+Prints the static prompt (instruction, global instruction, tool
+declarations) of every LlmAgent reachable from root_agent and
+proactive_insights_agent, flags those above PROMPT_BUDGET_TOKENS, and
+estimates the static tokens a routed turn sends: root_agent twice (routing
+and answering) plus two calls of the sub-agent it delegates to.
+
+With --model MODEL (needs Gemini credentials) it also counts the
+instructions exactly and, for every agent whose prefix is large enough to
+cache, compares time-to-first-token of a short request with the prefix sent
+inline against the same request on a cached content.
+
+Usage (from backend/no-name-agent):
+    python benchmarks/bench_prompt_budget.py
+    python benchmarks/bench_prompt_budget.py --model gemini-2.5-flash
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prompt_budget import (  # noqa: E402
+    CONTEXT_CACHE_MIN_TOKENS,
+    PROMPT_BUDGET_TOKENS,
+    _tool_declaration,
+    measure_agent_tree,
+    walk_agents,
+)
+
+TTFT_REPEATS = 3
+TTFT_PROMPT = "Reply with OK."
+
+
+def agent_trees() -> list:
+    from agent import root_agent
+    from proactive_insights_agent.agent import proactive_insights_agent
+
+    return [root_agent, proactive_insights_agent]
+
+
+def print_static(trees: list):
+    print(f"{'agent':<32}{'instruction':>12}{'tools':>8}{'decl chars':>12}{'~tokens':>9}")
+    seen = set()
+    sizes = {}
+    for tree in trees:
+        for size in measure_agent_tree(tree):
+            if size.agent in seen:
+                continue
+            seen.add(size.agent)
+            sizes[size.agent] = size
+            flag = "  over budget" if size.estimated_tokens > PROMPT_BUDGET_TOKENS else ""
+            print(
+                f"{size.agent:<32}{size.instruction_chars + size.global_instruction_chars:>12}"
+                f"{size.tools:>8}{size.tool_declaration_chars:>12}{size.estimated_tokens:>9}{flag}"
+            )
+
+    root = trees[0]
+    root_tokens = sizes[root.name].estimated_tokens
+    print(f"\nstatic tokens per routed turn (budget {PROMPT_BUDGET_TOKENS} per agent):")
+    for agent in walk_agents(root)[1:]:
+        delegates = list(root.sub_agents) + [getattr(tool, "agent", None) for tool in root.tools]
+        if any(delegate is agent for delegate in delegates):
+            total = 2 * root_tokens + 2 * sizes[agent.name].estimated_tokens
+            print(f"  {root.name} -> {agent.name:<28}~{total} tokens")
+
+
+def static_prefix(agent):
+    from google.genai import types
+
+    instruction = "\n\n".join(
+        text for text in (agent.global_instruction, agent.instruction) if isinstance(text, str) and text
+    )
+    declarations = [_tool_declaration(tool) for tool in agent.tools]
+    declarations = [declaration for declaration in declarations if declaration is not None]
+    tools = [types.Tool(function_declarations=declarations)] if declarations else None
+    return instruction, tools
+
+
+def first_token_seconds(client, model: str, config) -> float:
+    started = time.perf_counter()
+    for _ in client.models.generate_content_stream(model=model, contents=TTFT_PROMPT, config=config):
+        return time.perf_counter() - started
+    return time.perf_counter() - started
+
+
+def compare_caching(trees: list, model: str):
+    from google import genai
+    from google.genai import types
+
+    client = genai.Client()
+    seen = set()
+    print(f"\n{'agent':<32}{'tokens':>8}{'inline ttft':>14}{'cached ttft':>14}")
+    for tree in trees:
+        for agent in walk_agents(tree):
+            if agent.name in seen:
+                continue
+            seen.add(agent.name)
+            instruction, tools = static_prefix(agent)
+            tokens = client.models.count_tokens(model=model, contents=instruction or " ").total_tokens
+            if tokens < CONTEXT_CACHE_MIN_TOKENS:
+                print(f"{agent.name:<32}{tokens:>8}{'too small to cache':>28}")
+                continue
+
+            inline = types.GenerateContentConfig(system_instruction=instruction, tools=tools)
+            cache = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(system_instruction=instruction, tools=tools, ttl="300s"),
+            )
+            try:
+                cached = types.GenerateContentConfig(cached_content=cache.name)
+                inline_times = [first_token_seconds(client, model, inline) for _ in range(TTFT_REPEATS)]
+                cached_times = [first_token_seconds(client, model, cached) for _ in range(TTFT_REPEATS)]
+            finally:
+                client.caches.delete(name=cache.name)
+            print(
+                f"{agent.name:<32}{tokens:>8}{statistics.median(inline_times) * 1e3:>11.0f} ms"
+                f"{statistics.median(cached_times) * 1e3:>11.0f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="count tokens exactly and measure time-to-first-token on MODEL")
+    args = parser.parse_args()
+
+    trees = agent_trees()
+    print_static(trees)
+    if args.model:
+        compare_caching(trees, args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,20 @@
+from typing import Optional
+
 from google.adk.agents import Agent
 from google.adk.models import Gemini
 from google.adk.planners import PlanReActPlanner
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
+from financial_agent.multi_fetch import fetch_financial_data
 from google.adk.tools.agent_tool import AgentTool
+from affordability import (
+    assess_affordability,
+    default_loan_terms,
+    is_housing_purchase,
+    load_financial_snapshot,
+    monthly_loan_payment,
+)
 
-financial_agent_tool = AgentTool(agent=financial_agent)
 # support_agent = RemoteA2aAgent(
 #     name="support_agent",
 #     description=(
@@ -16,15 +25,81 @@ financial_agent_tool = AgentTool(agent=financial_agent)
 #     ),
 # )
 
+async def check_affordability(
+    user_id: str,
+    purchase_type: str,
+    purchase_price: float,
+    down_payment: float,
+    monthly_payment: float,
+    is_cash_purchase: bool,
+    loan_term_years: Optional[int] = None,
+    annual_interest_rate: Optional[float] = None,
+):
+    """
+    Checks whether the user can afford a large purchase, using their real finances.
+
+    Fetches the user's financial summary, net worth, cash flow, goals and accounts
+    at once, then computes the front-end (housing) and back-end debt-to-income
+    ratios against the 28/36 rule, the emergency-fund months left after the down
+    payment, and the impact on the user's goals.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+        purchase_type (str): What is being bought (e.g. "house", "car")
+        purchase_price (float): Total price
+        down_payment (float): Cash paid up front, or 0 if none or unknown
+        monthly_payment (float): Known monthly payment, or 0 to compute it from the loan terms
+        is_cash_purchase (bool): True only if the user pays the full price up front
+        loan_term_years (int): Loan term in years; omit if unknown (a default term is assumed)
+        annual_interest_rate (float): Annual interest rate in percent (e.g. 6.5, or 0 for
+            0% financing); omit if unknown (a default rate is assumed)
+
+    Returns:
+        dict: verdict ("affordable", "stretch", "not_affordable" or
+            "insufficient_data"), reasons, the exact metrics and the loan
+            terms that were assumed
+    """
+    is_housing = is_housing_purchase(purchase_type)
+    assumed = {}
+    if is_cash_purchase:
+        down_payment, monthly_payment = purchase_price, 0.0
+    elif monthly_payment <= 0 and purchase_price > down_payment:
+        loan_term_years, annual_interest_rate, assumed = default_loan_terms(
+            is_housing, loan_term_years, annual_interest_rate
+        )
+        monthly_payment = monthly_loan_payment(purchase_price - down_payment, annual_interest_rate, loan_term_years)
+
+    snapshot = await load_financial_snapshot(user_id)
+    result = assess_affordability(
+        snapshot,
+        purchase_price=purchase_price,
+        down_payment=down_payment,
+        monthly_payment=monthly_payment,
+        is_housing=is_housing,
+    )
+    result["purchase_type"] = purchase_type
+    if assumed:
+        result["assumptions"] = assumed
+        result["reasons"].append(
+            "Loan terms not given; assumed "
+            + " and ".join(
+                f"{value} years" if name == "loan_term_years" else f"{value}% interest"
+                for name, value in assumed.items()
+            )
+            + "."
+        )
+    return result
+
 big_spendings_agent = Agent(
     name="big_spendings_agent",
     model="gemini-2.5-flash",
     planner=PlanReActPlanner(),
-    tools=[financial_agent_tool],
+    tools=[check_affordability, fetch_financial_data, financial_agent_tool],
     description="I am a big spending agent. I can help you determine if you can afford large purchases and schedule appointments with financial advisors.",
     instruction="""You are a big spending agent. Your goal is to help users make informed decisions about large purchases.
         You have all the information about the user's finances by querying the financial_agent. You must respond with a tool-informed response with evidence.
-        To determine if a user can afford a large purchase, you need to analyze their financial health. You can do this by calling the financial_agent to get the user's financial summary, net worth, cash flow, and life goals.
+        To determine if a user can afford a large purchase, call the check_affordability tool once with the purchase details. It fetches the user's financial summary, net worth, cash flow, goals and accounts itself and returns an exact verdict, the 28/36 debt-to-income ratios, emergency-fund months and goal impact. Use its numbers as given instead of recalculating them, pass 0 for a down payment or monthly payment the user has not given, and leave out loan_term_years and annual_interest_rate unless the user states them (0 is a real 0% financing rate; ask for the price if it is missing). Set is_cash_purchase to true only if the user says they will pay the full price up front; otherwise the tool assumes default loan terms for the financed amount and lists them under "assumptions", which you must mention in your answer.
+        Only call the financial_agent as described below if check_affordability returns "insufficient_data" or you need data it does not cover.
         Important: You have access to all of the user's financial data. Debts, assets, income, expenses, networth, cashflow, etc. You must use this information to determine the answers to the user's question.
         For example, if they ask about if they quality for a mortgage, ask the financial_agent to get information about the user's cashflow, debts, and networth, and then use that information to determine if they qualify.
         If they ask about if they can afford a new car, ask the financial_agent to get information about the user's cashflow, debts, and networth, and then use that information to determine if they can afford it.
@@ -84,6 +159,7 @@ big_spendings_agent = Agent(
         If the user wants to speak with a financial advisor, you can use the schedule_appointment tool to schedule an appointment.
 
         You can also interact with the financial_agent to get more detailed financial data. To do this, you need to call the financial_agent with the appropriate tool name and arguments.
+        When you need several pieces of data that do not depend on each other (e.g. accounts, debts, goals and net worth), call fetch_financial_data once with all of the requests instead of calling the financial_agent once per request.
 
         For example, to get the user's transactions, you can call the financial_agent with the following input:
     
@@ -9,12 +9,21 @@ Utility functions for Google Calendar integration.
 import json
 import os
 import datetime
+import threading
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
+import httplib2
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+
+from calendar_datetime import parse_datetime
+from calendar_free_slots import find_free_slots
+from calendar_store import CalendarEventStore, event_bounds
 
 # Define the scopes for Google Calendar API
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
@@ -23,43 +32,175 @@ SCOPES = ["https://www.googleapis.com/auth/calendar"]
 TOKEN_PATH = Path(os.path.expanduser("~/.credentials/calendar_token.json"))
 CREDENTIALS_PATH = Path(__file__).parent / "credentials.json"
 
+# Refresh the access token this long before it expires
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=5)
+
+
+class CalendarAuth:
+    """
+    Process-wide OAuth credentials and Calendar service for all tool calls.
+
+    The token file is read once, the access token is refreshed shortly
+    before it expires, and a single service object is reused. The service
+    object itself is safe to share between threads, but its HTTP transport
+    is not, so every request is sent over a per-thread authorized
+    connection that shares the same credentials.
+    """
+
+    def __init__(self, token_path: Path = TOKEN_PATH, credentials_path: Path = CREDENTIALS_PATH):
+        self._token_path = token_path
+        self._credentials_path = credentials_path
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._creds = None
+        self._service = None
+
+    def get_credentials(self):
+        """
+        Return valid credentials, loading or refreshing them if needed.
+
+        Returns:
+            Credentials or None if authentication is not possible
+        """
+        with self._lock:
+            if self._creds is None and self._token_path.exists():
+                self._creds = Credentials.from_authorized_user_info(
+                    json.loads(self._token_path.read_text()), SCOPES
+                )
+
+            if self._creds and not self._needs_refresh(self._creds):
+                return self._creds
+
+            if self._creds and self._creds.refresh_token:
+                self._creds.refresh(Request())
+            else:
+                # If credentials.json doesn't exist, we can't proceed with OAuth flow
+                if not self._credentials_path.exists():
+                    print(
+                        f"Error: {self._credentials_path} not found. Please follow setup instructions."
+                    )
+                    return None
+
+                flow = InstalledAppFlow.from_client_secrets_file(self._credentials_path, SCOPES)
+                self._creds = flow.run_local_server(port=0)
+                self._service = None
+
+            # Save the credentials for the next run
+            self._token_path.parent.mkdir(parents=True, exist_ok=True)
+            self._token_path.write_text(self._creds.to_json())
+            return self._creds
+
+    @staticmethod
+    def _needs_refresh(creds) -> bool:
+        if not creds.valid:
+            return True
+        # Credentials.expiry is a naive UTC datetime
+        return bool(creds.expiry) and creds.expiry - datetime.datetime.utcnow() < TOKEN_REFRESH_MARGIN
+
+    def get_service(self):
+        """
+        Return the shared Calendar service, creating it on first use.
+
+        Returns:
+            A Google Calendar service object or None if authentication fails
+        """
+        creds = self.get_credentials()
+        if not creds:
+            return None
+        with self._lock:
+            if self._service is None:
+                self._service = build(
+                    "calendar",
+                    "v3",
+                    http=self.thread_http(),
+                    requestBuilder=self._build_request,
+                    cache_discovery=False,
+                )
+            return self._service
+
+    def thread_http(self):
+        """Return this thread's authorized HTTP connection."""
+        http = getattr(self._local, "http", None)
+        if http is None or http.credentials is not self._creds:
+            http = google_auth_httplib2.AuthorizedHttp(self._creds, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def _build_request(self, http, *args, **kwargs):
+        return HttpRequest(self.thread_http(), *args, **kwargs)
+
+
+calendar_auth = CalendarAuth()
+
 
 def get_calendar_service():
     """
-    Authenticate and create a Google Calendar service object.
+    Get the shared, authenticated Google Calendar service object.
 
     Returns:
         A Google Calendar service object or None if authentication fails
     """
-    creds = None
+    return calendar_auth.get_service()
 
-    # Check if token exists and is valid
-    if TOKEN_PATH.exists():
-        creds = Credentials.from_authorized_user_info(
-            json.loads(TOKEN_PATH.read_text()), SCOPES
-        )
 
-    # If credentials don't exist or are invalid, refresh or get new ones
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # If credentials.json doesn't exist, we can't proceed with OAuth flow
-            if not CREDENTIALS_PATH.exists():
-                print(
-                    f"Error: {CREDENTIALS_PATH} not found. Please follow setup instructions."
-                )
-                return None
+# Calendar settings (e.g. timezone) almost never change; re-read them this often
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("CALENDAR_SETTINGS_TTL", "3600"))
+# Retry a failed settings fetch this soon rather than after the full TTL
+SETTINGS_RETRY_SECONDS = float(os.getenv("CALENDAR_SETTINGS_RETRY", "60"))
+DEFAULT_TIMEZONE = "America/New_York"
+
+
+class CalendarSettingsCache:
+    """Caches the user's calendar settings so tools don't fetch them on every call."""
+
+    def __init__(self, ttl_seconds: float = SETTINGS_CACHE_TTL_SECONDS, retry_seconds: float = SETTINGS_RETRY_SECONDS):
+        self._ttl = datetime.timedelta(seconds=ttl_seconds)
+        self._retry = datetime.timedelta(seconds=retry_seconds)
+        self._lock = threading.Lock()
+        self._settings = None
+        self._expires_at = None
+
+    def get(self, service, setting_id: str, default: str = None) -> str:
+        """
+        Return a calendar setting, fetching all settings at most once per TTL.
 
-            flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
+        Args:
+            service: The Calendar service used on a cache miss
+            setting_id (str): Setting name (e.g. "timezone")
+            default (str): Value to use if the setting is unavailable
 
-        # Save the credentials for the next run
-        TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
-        TOKEN_PATH.write_text(creds.to_json())
+        Returns:
+            str: The setting value or default
+        """
+        with self._lock:
+            now = datetime.datetime.utcnow()
+            if self._settings is None or now >= self._expires_at:
+                try:
+                    items = service.settings().list().execute().get("items", [])
+                    self._settings = {item.get("id"): item.get("value") for item in items}
+                    self._expires_at = now + self._ttl
+                except Exception as e:
+                    # Keep serving the previous settings if we have them, and retry soon
+                    print(f"Warning: calendar settings fetch failed, retrying in {self._retry}: {e}")
+                    self._settings = self._settings or {}
+                    self._expires_at = now + self._retry
+            return self._settings.get(setting_id) or default
 
-    # Create and return the Calendar service
-    return build("calendar", "v3", credentials=creds)
+    def invalidate(self):
+        with self._lock:
+            self._settings = None
+
+
+calendar_settings = CalendarSettingsCache()
+
+
+def get_calendar_timezone(service) -> str:
+    """Return the calendar's timezone ID (cached), defaulting to Eastern Time."""
+    return calendar_settings.get(service, "timezone", DEFAULT_TIMEZONE)
+
+
+# Local copy of the primary calendar, kept current with sync tokens
+event_store = CalendarEventStore(get_calendar_service, get_calendar_timezone)
 
 
 def format_event_time(event_time):
@@ -82,37 +223,6 @@ def format_event_time(event_time):
     return "Unknown time format"
 
 
-def parse_datetime(datetime_str):
-    """
-    Parse a datetime string into a datetime object.
-
-    Args:
-        datetime_str (str): A string representing a date and time
-
-    Returns:
-        datetime: A datetime object or None if parsing fails
-    """
-    formats = [
-        "%Y-%m-%d %H:%M",
-        "%Y-%m-%d %I:%M %p",
-        "%Y-%m-%d",
-        "%m/%d/%Y %H:%M",
-        "%m/%d/%Y %I:%M %p",
-        "%m/%d/%Y",
-        "%B %d, %Y %H:%M",
-        "%B %d, %Y %I:%M %p",
-        "%B %d, %Y",
-    ]
-
-    for fmt in formats:
-        try:
-            return datetime.datetime.strptime(datetime_str, fmt)
-        except ValueError:
-            continue
-
-    return None
-
-
 def get_current_time() -> dict:
     """
     Get the current time and date
@@ -142,8 +252,8 @@ def create_event(
 
     Args:
         summary (str): Event title/summary
-        start_time (str): Start time (e.g., "2023-12-31 14:00")
-        end_time (str): End time (e.g., "2023-12-31 15:00")
+        start_time (str): Start time (e.g., "2023-12-31 14:00" or "tomorrow 2pm")
+        end_time (str): End time (e.g., "2023-12-31 15:00" or "tomorrow 3pm")
 
     Returns:
         dict: Information about the created event or error details
@@ -170,19 +280,8 @@ def create_event(
                 "message": "Invalid date/time format. Please use YYYY-MM-DD HH:MM format.",
             }
 
-        # Dynamically determine timezone
-        timezone_id = "America/New_York"  # Default to Eastern Time
-
-        try:
-            # Try to get the timezone from the calendar settings
-            settings = service.settings().list().execute()
-            for setting in settings.get("items", []):
-                if setting.get("id") == "timezone":
-                    timezone_id = setting.get("value")
-                    break
-        except Exception:
-            # If we can't get it from settings, we'll use the default
-            pass
+        # Timezone from the (cached) calendar settings
+        timezone_id = get_calendar_timezone(service)
 
         # Create event body without type annotations
         event_body = {}
@@ -201,6 +300,7 @@ def create_event(
         event = (
             service.events().insert(calendarId=calendar_id, body=event_body).execute()
         )
+        event_store.upsert(event)
 
         return {
             "status": "success",
@@ -252,6 +352,7 @@ def delete_event(
 
         # Call the Calendar API to delete the event
         service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+        event_store.remove(event_id)
 
         return {
             "status": "success",
@@ -312,10 +413,11 @@ def edit_event(
         if summary:
             event["summary"] = summary
 
-        # Get timezone from the original event
-        timezone_id = "America/New_York"  # Default
+        # Get timezone from the original event, else from the calendar settings
         if "start" in event and "timeZone" in event["start"]:
             timezone_id = event["start"]["timeZone"]
+        else:
+            timezone_id = get_calendar_timezone(service)
 
         # Update start time if provided
         if start_time:
@@ -343,6 +445,7 @@ def edit_event(
             .update(calendarId=calendar_id, eventId=event_id, body=event)
             .execute()
         )
+        event_store.upsert(updated_event)
 
         return {
             "status": "success",
@@ -359,6 +462,37 @@ List events tool for Google Calendar integration.
 """
 
 
+def list_events_from_api(service, calendar_id, start_time, end_time):
+    """
+    Fetch every event in a window from the Calendar API, following nextPageToken.
+
+    Args:
+        service: The Calendar service
+        calendar_id (str): Calendar to read
+        start_time (datetime): Aware window start
+        end_time (datetime): Aware window end
+
+    Returns:
+        list: Calendar API event dicts ordered by start time
+    """
+    params = {
+        "calendarId": calendar_id,
+        "timeMin": start_time.isoformat(),
+        "timeMax": end_time.isoformat(),
+        "maxResults": 2500,
+        "singleEvents": True,
+        "orderBy": "startTime",
+        "timeZone": get_calendar_timezone(service),
+    }
+    events = []
+    while True:
+        events_result = service.events().list(**params).execute()
+        events.extend(events_result.get("items", []))
+        if not events_result.get("nextPageToken"):
+            return events
+        params["pageToken"] = events_result["nextPageToken"]
+
+
 def list_events(
     start_date: str,
     days: int,
@@ -386,18 +520,17 @@ def list_events(
                 "events": [],
             }
 
-        # Always use a large max_results value to return all events
-        max_results = 100
-
         # Always use primary calendar
         calendar_id = "primary"
 
-        # Set time range
+        # Set time range (UTC)
         if not start_date or start_date.strip() == "":
-            start_time = datetime.datetime.utcnow()
+            start_time = datetime.datetime.now(datetime.timezone.utc)
         else:
             try:
-                start_time = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+                start_time = datetime.datetime.strptime(start_date, "%Y-%m-%d").replace(
+                    tzinfo=datetime.timezone.utc
+                )
             except ValueError:
                 return {
                     "status": "error",
@@ -411,25 +544,12 @@ def list_events(
 
         end_time = start_time + datetime.timedelta(days=days)
 
-        # Format times for API call
-        time_min = start_time.isoformat() + "Z"
-        time_max = end_time.isoformat() + "Z"
-
-        # Call the Calendar API
-        events_result = (
-            service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                maxResults=max_results,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
-        )
-
-        events = events_result.get("items", [])
+        # Answer from the local event store when it covers the window,
+        # otherwise page through the API for this window only
+        if event_store.sync() and event_store.covers(start_time, end_time):
+            events = event_store.query(start_time, end_time)
+        else:
+            events = list_events_from_api(service, calendar_id, start_time, end_time)
 
         if not events:
             return {
@@ -470,6 +590,359 @@ def list_events(
             "events": [],
         }
 
+"""
+Batch event tools for Google Calendar integration.
+"""
+
+# The Calendar API accepts at most 50 calls per batch request
+BATCH_LIMIT = 50
+
+
+def execute_batch(service, requests):
+    """
+    Send API requests as HTTP batches of up to BATCH_LIMIT calls.
+
+    Args:
+        service: The Calendar service
+        requests (list): Unexecuted API requests
+
+    Returns:
+        list: (response, exception) for each request, in order
+    """
+    results = [(None, None)] * len(requests)
+
+    def callback(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for offset in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(offset, min(offset + BATCH_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+    return results
+
+
+def run_batch(service, prepared, on_success):
+    """
+    Execute prepared (index, request) pairs and build per-item results.
+
+    Items that failed validation are passed in as (index, error message).
+    """
+    results = {}
+    pending = []
+    for index, request in prepared:
+        if isinstance(request, str):
+            results[index] = {"index": index, "status": "error", "message": request}
+        else:
+            pending.append((index, request))
+
+    responses = execute_batch(service, [request for _, request in pending])
+    for (index, _), (response, exception) in zip(pending, responses):
+        if exception is not None:
+            results[index] = {"index": index, "status": "error", "message": str(exception)}
+        else:
+            results[index] = dict({"index": index, "status": "success"}, **on_success(index, response))
+
+    items = [results[index] for index in sorted(results)]
+    succeeded = sum(1 for item in items if item["status"] == "success")
+    return {
+        "status": "success" if succeeded == len(items) else ("partial" if succeeded else "error"),
+        "message": f"{succeeded} of {len(items)} operation(s) succeeded",
+        "results": items,
+    }
+
+
+def batch_create_events(events: list[dict]) -> dict:
+    """
+    Create several events in Google Calendar with one batch request.
+
+    Args:
+        events (list[dict]): Events to create, each with "summary",
+            "start_time" and "end_time" (e.g. "2023-12-31 14:00")
+
+    Returns:
+        dict: Overall status and a result per event, in the same order
+    """
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "results": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        timezone_id = get_calendar_timezone(service)
+
+        prepared = []
+        for index, item in enumerate(events):
+            start_dt = parse_datetime(item.get("start_time", ""))
+            end_dt = parse_datetime(item.get("end_time", ""))
+            if not start_dt or not end_dt:
+                prepared.append((index, "Invalid date/time format. Please use YYYY-MM-DD HH:MM format."))
+                continue
+            event_body = {
+                "summary": item.get("summary", ""),
+                "start": {"dateTime": start_dt.isoformat(), "timeZone": timezone_id},
+                "end": {"dateTime": end_dt.isoformat(), "timeZone": timezone_id},
+            }
+            prepared.append((index, service.events().insert(calendarId=calendar_id, body=event_body)))
+
+        def on_success(index, event):
+            event_store.upsert(event)
+            return {"event_id": event["id"], "event_link": event.get("htmlLink", "")}
+
+        return run_batch(service, prepared, on_success)
+
+    except Exception as e:
+        return {"status": "error", "message": f"Error creating events: {str(e)}", "results": []}
+
+
+def batch_edit_events(edits: list[dict]) -> dict:
+    """
+    Edit several existing events in Google Calendar with one batch request.
+
+    Args:
+        edits (list[dict]): Edits, each with "event_id" plus any of "summary",
+            "start_time" and "end_time" to change (omit or use "" to keep a value)
+
+    Returns:
+        dict: Overall status and a result per edit, in the same order
+    """
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "results": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        timezone_id = get_calendar_timezone(service)
+
+        prepared = []
+        for index, item in enumerate(edits):
+            # Patch sends only the changed fields, so no events().get is needed first
+            patch = {}
+            if item.get("summary"):
+                patch["summary"] = item["summary"]
+            for field in ("start", "end"):
+                value = item.get(f"{field}_time")
+                if not value:
+                    continue
+                parsed = parse_datetime(value)
+                if not parsed:
+                    patch = f"Invalid {field} time format. Please use YYYY-MM-DD HH:MM format."
+                    break
+                patch[field] = {"dateTime": parsed.isoformat(), "timeZone": timezone_id}
+
+            if not item.get("event_id"):
+                prepared.append((index, "Missing event_id."))
+            elif isinstance(patch, str):
+                prepared.append((index, patch))
+            elif not patch:
+                prepared.append((index, "Nothing to change."))
+            else:
+                prepared.append((
+                    index,
+                    service.events().patch(calendarId=calendar_id, eventId=item["event_id"], body=patch),
+                ))
+
+        def on_success(index, event):
+            event_store.upsert(event)
+            return {"event_id": event["id"], "event_link": event.get("htmlLink", "")}
+
+        return run_batch(service, prepared, on_success)
+
+    except Exception as e:
+        return {"status": "error", "message": f"Error updating events: {str(e)}", "results": []}
+
+
+def batch_delete_events(event_ids: list[str], confirm: bool) -> dict:
+    """
+    Delete several events from Google Calendar with one batch request.
+
+    Args:
+        event_ids (list[str]): The unique IDs of the events to delete
+        confirm (bool): Confirmation flag (must be set to True to delete)
+
+    Returns:
+        dict: Overall status and a result per event, in the same order
+    """
+    # Safety check - require explicit confirmation
+    if not confirm:
+        return {
+            "status": "error",
+            "message": "Please confirm deletion by setting confirm=True",
+            "results": [],
+        }
+
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "results": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+
+        prepared = [
+            (index, service.events().delete(calendarId=calendar_id, eventId=event_id))
+            for index, event_id in enumerate(event_ids)
+        ]
+
+        def on_success(index, _):
+            event_store.remove(event_ids[index])
+            return {"event_id": event_ids[index]}
+
+        return run_batch(service, prepared, on_success)
+
+    except Exception as e:
+        return {"status": "error", "message": f"Error deleting events: {str(e)}", "results": []}
+
+"""
+Find free time tool for Google Calendar integration.
+"""
+
+# Working hours used when looking for free time, in the calendar's timezone
+WORK_DAY_START = datetime.time.fromisoformat(os.getenv("CALENDAR_WORK_DAY_START", "09:00"))
+WORK_DAY_END = datetime.time.fromisoformat(os.getenv("CALENDAR_WORK_DAY_END", "17:00"))
+
+
+def is_busy(event):
+    """
+    Check whether an event blocks time.
+
+    Events marked "Show as: Free" (transparent) and invitations the user
+    declined don't count as busy.
+    """
+    if event.get("transparency") == "transparent":
+        return False
+    for attendee in event.get("attendees", []):
+        if attendee.get("self") and attendee.get("responseStatus") == "declined":
+            return False
+    return True
+
+
+def find_free_time(
+    start_date: str,
+    days: int,
+    duration_minutes: int,
+    max_slots: int,
+) -> dict:
+    """
+    Find free time slots during working hours (weekdays, 9 AM - 5 PM by default).
+
+    Args:
+        start_date (str): Start date in YYYY-MM-DD format. If empty string, searches from now.
+        days (int): Number of days to search. Use 1 for today only, 7 for a week, etc.
+        duration_minutes (int): Minimum length of a free slot in minutes (e.g. 30 or 60)
+        max_slots (int): Maximum number of free slots to return (e.g. 5)
+
+    Returns:
+        dict: The earliest free slots or error details
+    """
+    try:
+        # Get calendar service
+        service = get_calendar_service()
+        if not service:
+            return {
+                "status": "error",
+                "message": "Failed to authenticate with Google Calendar. Please check credentials.",
+                "free_slots": [],
+            }
+
+        # Always use primary calendar
+        calendar_id = "primary"
+        timezone_id = get_calendar_timezone(service)
+
+        # Set the search window in the calendar's timezone
+        if not start_date or start_date.strip() == "":
+            start_time = datetime.datetime.now(datetime.timezone.utc)
+        else:
+            try:
+                start_time = datetime.datetime.combine(
+                    datetime.date.fromisoformat(start_date.strip()),
+                    datetime.time.min,
+                    tzinfo=ZoneInfo(timezone_id),
+                )
+            except ValueError:
+                return {
+                    "status": "error",
+                    "message": f"Invalid date format: {start_date}. Use YYYY-MM-DD format.",
+                    "free_slots": [],
+                }
+
+        if not days or days < 1:
+            days = 1
+        if not duration_minutes or duration_minutes < 1:
+            duration_minutes = 30
+        if not max_slots or max_slots < 1:
+            max_slots = 5
+
+        end_time = start_time + datetime.timedelta(days=days)
+
+        # Collect busy intervals from the event store, or the API for old windows
+        if event_store.sync() and event_store.covers(start_time, end_time):
+            busy = [
+                (start, end)
+                for start, end, event in event_store.query_intervals(start_time, end_time)
+                if is_busy(event)
+            ]
+        else:
+            busy = []
+            for event in list_events_from_api(service, calendar_id, start_time, end_time):
+                bounds = event_bounds(event, timezone_id)
+                if bounds and is_busy(event):
+                    busy.append(bounds)
+
+        slots = find_free_slots(
+            busy,
+            start_time,
+            end_time,
+            datetime.timedelta(minutes=duration_minutes),
+            timezone_id,
+            max_slots=max_slots,
+            work_start=WORK_DAY_START,
+            work_end=WORK_DAY_END,
+        )
+
+        if not slots:
+            return {
+                "status": "success",
+                "message": f"No free slots of {duration_minutes} minutes found.",
+                "free_slots": [],
+            }
+
+        return {
+            "status": "success",
+            "message": f"Found {len(slots)} free slot(s).",
+            "free_slots": [
+                {
+                    "start": slot_start.strftime("%Y-%m-%d %I:%M %p"),
+                    "end": slot_end.strftime("%Y-%m-%d %I:%M %p"),
+                }
+                for slot_start, slot_end in slots
+            ],
+        }
+
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Error finding free time: {str(e)}",
+            "free_slots": [],
+        }
+
 calendar_agent = Agent(
     # A unique name for the agent.
     name="jarvis",
@@ -486,6 +959,7 @@ calendar_agent = Agent(
     - `edit_event`: Edit an existing event (change title or reschedule)
     - `delete_event`: Remove an event from your calendar
     - `find_free_time`: Find available free time slots in your calendar
+    - `batch_create_events`, `batch_edit_events`, `batch_delete_events`: Create, edit or delete several events at once
     
     ## Be proactive and conversational
     Be proactive when handling calendar requests. Don't ask unnecessary questions when the context or defaults make sense.
@@ -501,7 +975,6 @@ calendar_agent = Agent(
     - If no date is mentioned, use today's date for start_date, which will default to today
     - If a specific date is mentioned, format it as YYYY-MM-DD
     - Always pass "primary" as the calendar_id
-    - Always pass 100 for max_results (the function internally handles this)
     - For days, use 1 for today only, 7 for a week, 30 for a month, etc.
     
     ## Creating events guidelines
@@ -511,6 +984,19 @@ calendar_agent = Agent(
     - The local timezone is automatically added to events
     - Always use "primary" as the calendar_id
     
+    ## Batch operations guidelines
+    When the user asks to create, reschedule or delete more than one event (e.g. a series of follow-ups):
+    - Use the batch tools with all events in a single call instead of calling create_event, edit_event or delete_event repeatedly
+    - For batch_edit_events, only include the fields that change for each event
+    - Check the per-event results and tell the user about any that failed
+
+    ## Finding free time guidelines
+    For finding free time:
+    - Use find_free_time instead of listing events and working out the gaps yourself
+    - For start_date, use the same rules as for listing events
+    - For duration_minutes, use the meeting length (default to 30 if not mentioned)
+    - For max_slots, use 5 unless the user asks for more or fewer options
+
     ## Editing events guidelines
     For editing events:
     - You need the event_id, which you get from list_events results
@@ -530,5 +1016,9 @@ calendar_agent = Agent(
         create_event,
         edit_event,
         delete_event,
+        find_free_time,
+        batch_create_events,
+        batch_edit_events,
+        batch_delete_events,
     ],
 )
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Datetime parsing for the calendar agent's tool arguments.
+
+parse_datetime used to try nine strptime formats in turn, raising and
+catching a ValueError for every miss. Here one precompiled regex per input
+shape picks the format in a single match, and results are memoized because
+the model repeats the same strings across create/edit calls.
+
+Besides the absolute formats the tools have always accepted
+("2024-01-15 14:00", "01/15/2024 2:00 PM", "January 15, 2024"), relative
+phrases such as "tomorrow 3pm", "next tuesday at 10:30" or "in 2 days" are
+resolved against today's date.
+"""
+
+import re
+import datetime
+from functools import lru_cache
+
+WEEKDAYS = {
+    name: index
+    for index, names in enumerate(
+        [
+            ("monday", "mon"),
+            ("tuesday", "tue", "tues"),
+            ("wednesday", "wed"),
+            ("thursday", "thu", "thur", "thurs"),
+            ("friday", "fri"),
+            ("saturday", "sat"),
+            ("sunday", "sun"),
+        ]
+    )
+    for name in names
+}
+
+MONTHS = {}
+for _number, _name in enumerate(
+    [
+        "january", "february", "march", "april", "may", "june",
+        "july", "august", "september", "october", "november", "december",
+    ],
+    start=1,
+):
+    MONTHS[_name] = _number
+    MONTHS[_name[:3]] = _number
+MONTHS["sept"] = 9
+
+# "14:00", "14:00:30", "2:00 PM", "2pm", "2:30p.m."
+_CLOCK = r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?\s*(?P<meridiem>[ap])?\.?(?:m\.?)?"
+_TIME = r"(?:(?:\s+at)?\s+" + _CLOCK + ")?"
+
+_ISO_DATE = re.compile(r"(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?:(?:(?:\s+at)?\s+|t)" + _CLOCK + ")?")
+_US_DATE = re.compile(r"(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4})" + _TIME)
+_NAMED_DATE = re.compile(r"(?P<month_name>[a-z]+)\.?\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?,?\s+(?P<year>\d{4})" + _TIME)
+_RELATIVE_DAY = re.compile(r"(?P<word>today|tonight|tomorrow|yesterday)" + _TIME)
+_WEEKDAY = re.compile(r"(?:(?P<which>this|next)\s+)?(?P<weekday>[a-z]+)" + _TIME)
+_IN_DAYS = re.compile(r"in\s+(?P<count>\d+)\s+(?P<unit>day|week)s?" + _TIME)
+
+_DAY_OFFSETS = {"today": 0, "tonight": 0, "tomorrow": 1, "yesterday": -1}
+
+
+def _time_of_day(match) -> datetime.time:
+    """Read the optional time groups; None if the time is invalid."""
+    hour = match.group("hour")
+    if hour is None:
+        return datetime.time()
+    hour = int(hour)
+    minute = int(match.group("minute") or 0)
+    second = int(match.group("second") or 0)
+    meridiem = match.group("meridiem")
+    if meridiem is not None:
+        # 12-hour clock, matching strptime's %I
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    elif match.group("minute") is None:
+        # A bare number ("tomorrow 3") is too ambiguous to guess at
+        return None
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return datetime.time(hour, minute, second)
+
+
+def _combine(day: datetime.date, match) -> datetime.datetime:
+    time_of_day = _time_of_day(match)
+    if time_of_day is None:
+        return None
+    return datetime.datetime.combine(day, time_of_day)
+
+
+def _absolute_date(match) -> datetime.date:
+    groups = match.groupdict()
+    month = MONTHS.get(groups["month_name"]) if "month_name" in groups else int(groups["month"])
+    if month is None:
+        return None
+    try:
+        return datetime.date(int(groups["year"]), month, int(groups["day"]))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _parse(text: str, today: datetime.date) -> datetime.datetime:
+    # Dispatch on the first character so most inputs try a single pattern
+    if text[:1].isdigit():
+        for pattern in (_ISO_DATE, _US_DATE):
+            match = pattern.fullmatch(text)
+            if match:
+                day = _absolute_date(match)
+                return _combine(day, match) if day else None
+        return None
+
+    match = _NAMED_DATE.fullmatch(text)
+    if match:
+        day = _absolute_date(match)
+        return _combine(day, match) if day else None
+
+    match = _RELATIVE_DAY.fullmatch(text)
+    if match:
+        day = today + datetime.timedelta(days=_DAY_OFFSETS[match.group("word")])
+        return _combine(day, match)
+
+    match = _IN_DAYS.fullmatch(text)
+    if match:
+        days = int(match.group("count")) * (7 if match.group("unit") == "week" else 1)
+        return _combine(today + datetime.timedelta(days=days), match)
+
+    match = _WEEKDAY.fullmatch(text)
+    if match and match.group("weekday") in WEEKDAYS:
+        # "tuesday"/"this tuesday" is the coming one (today included),
+        # "next tuesday" is the first one after today
+        ahead = (WEEKDAYS[match.group("weekday")] - today.weekday()) % 7
+        if ahead == 0 and match.group("which") == "next":
+            ahead = 7
+        return _combine(today + datetime.timedelta(days=ahead), match)
+
+    return None
+
+
+def parse_datetime(datetime_str, today: datetime.date = None):
+    """
+    Parse a datetime string into a datetime object.
+
+    Args:
+        datetime_str (str): An absolute date and time ("2024-01-15 14:00",
+            "01/15/2024 2:00 PM", "January 15, 2024") or a relative phrase
+            ("tomorrow 3pm", "next tuesday at 10:30", "in 2 days")
+        today (date): Date relative phrases are resolved against (defaults to today)
+
+    Returns:
+        datetime: A naive datetime object or None if parsing fails
+    """
+    if not isinstance(datetime_str, str):
+        return None
+    text = " ".join(datetime_str.lower().split())
+    if not text:
+        return None
+    return _parse(text, today or datetime.date.today())
@@ -0,0 +1,125 @@
+"""
+Free-slot finder for the calendar agent.
+
+Given busy intervals (epoch seconds), a search window and working hours,
+find_free_slots merges the busy intervals once (O(n log n)) and sweeps
+each working-hours window in a single pass, returning the first free
+slots that are long enough.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+DEFAULT_WORK_START = datetime.time(9, 0)
+DEFAULT_WORK_END = datetime.time(17, 0)
+
+
+def merge_intervals(intervals) -> list:
+    """
+    Merge overlapping or touching (start, end) intervals.
+
+    Args:
+        intervals: Iterable of (start, end) pairs in epoch seconds
+
+    Returns:
+        list: Disjoint [start, end] pairs sorted by start
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def working_windows(
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    timezone_id: str,
+    work_start: datetime.time = DEFAULT_WORK_START,
+    work_end: datetime.time = DEFAULT_WORK_END,
+    weekdays_only: bool = True,
+):
+    """Yield (start, end) epoch seconds of each day's working hours inside the window."""
+    zone = ZoneInfo(timezone_id)
+    lower = window_start.timestamp()
+    upper = window_end.timestamp()
+    day = window_start.astimezone(zone).date()
+    last_day = window_end.astimezone(zone).date()
+    while day <= last_day:
+        if not weekdays_only or day.weekday() < 5:
+            start = datetime.datetime.combine(day, work_start, tzinfo=zone).timestamp()
+            end = datetime.datetime.combine(day, work_end, tzinfo=zone).timestamp()
+            start, end = max(start, lower), min(end, upper)
+            if start < end:
+                yield start, end
+        day += datetime.timedelta(days=1)
+
+
+def find_free_slots(
+    busy_intervals,
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    duration: datetime.timedelta,
+    timezone_id: str,
+    max_slots: int = 5,
+    work_start: datetime.time = DEFAULT_WORK_START,
+    work_end: datetime.time = DEFAULT_WORK_END,
+    weekdays_only: bool = True,
+) -> list:
+    """
+    Find the first free slots of at least `duration` within working hours.
+
+    Args:
+        busy_intervals: Iterable of (start, end) epoch seconds that are taken
+        window_start (datetime): Aware start of the search window
+        window_end (datetime): Aware end of the search window
+        duration (timedelta): Minimum slot length
+        timezone_id (str): Timezone the working hours are expressed in
+        max_slots (int): Stop after this many slots
+        work_start (time): Start of the working day
+        work_end (time): End of the working day
+        weekdays_only (bool): Skip Saturdays and Sundays
+
+    Returns:
+        list: (start, end) aware datetimes in timezone_id, earliest first
+    """
+    lower = window_start.timestamp()
+    upper = window_end.timestamp()
+    busy = merge_intervals(
+        (start, end) for start, end in busy_intervals if end > lower and start < upper
+    )
+    needed = duration.total_seconds()
+    zone = ZoneInfo(timezone_id)
+
+    slots = []
+    index = 0
+    for day_start, day_end in working_windows(
+        window_start, window_end, timezone_id, work_start, work_end, weekdays_only
+    ):
+        # Skip busy intervals that ended before this working window
+        while index < len(busy) and busy[index][1] <= day_start:
+            index += 1
+
+        cursor = day_start
+        scan = index
+        while scan < len(busy) and busy[scan][0] < day_end and len(slots) < max_slots:
+            busy_start, busy_end = busy[scan]
+            if busy_start - cursor >= needed:
+                slots.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            scan += 1
+        if len(slots) < max_slots and day_end - cursor >= needed:
+            slots.append((cursor, day_end))
+        if len(slots) >= max_slots:
+            break
+
+    return [
+        (
+            datetime.datetime.fromtimestamp(start, zone),
+            datetime.datetime.fromtimestamp(end, zone),
+        )
+        for start, end in slots
+    ]
@@ -0,0 +1,279 @@
+"""
+Local event store for the calendar agent.
+
+list_events used to download the requested window on every call and
+silently dropped everything past the first 100 events. CalendarEventStore
+instead keeps a local copy of the calendar that is:
+
+- fully paginated on the initial load from SYNC_LOOKBACK_DAYS ago, keeping
+  events up to SYNC_LOOKAHEAD_DAYS ahead, and reloaded once half of the
+  look-ahead has passed. The far end is clipped locally rather than with
+  timeMax, because the API returns no sync token for a timeMax-bounded list
+  (recurring events are expanded into instances, so the store would
+  otherwise grow without limit)
+- kept current with the Calendar API's incremental sync tokens, at most
+  once every MIN_SYNC_INTERVAL_SECONDS; if the API returns no sync token,
+  the window is reloaded every FULL_SYNC_INTERVAL_SECONDS instead
+- answered from an in-memory interval index, so repeated range queries
+  ("what's on this week") cost no API round-trip
+"""
+
+import os
+import bisect
+import datetime
+import threading
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+
+SYNC_LOOKBACK_DAYS = int(os.getenv("CALENDAR_SYNC_LOOKBACK_DAYS", "30"))
+SYNC_LOOKAHEAD_DAYS = int(os.getenv("CALENDAR_SYNC_LOOKAHEAD_DAYS", "365"))
+MIN_SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_MIN_SYNC_INTERVAL", "30"))
+FULL_SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_FULL_SYNC_INTERVAL", "600"))
+PAGE_SIZE = 2500
+
+
+def parse_event_time(event_time: dict, timezone_id: str) -> datetime.datetime:
+    """
+    Convert a Calendar API start/end value into an aware datetime.
+
+    Args:
+        event_time (dict): {"dateTime": ...} for timed events or
+            {"date": "YYYY-MM-DD"} for all-day events
+        timezone_id (str): Calendar timezone, used for all-day events
+
+    Returns:
+        datetime: Aware datetime, or None if the value has neither key
+    """
+    if "dateTime" in event_time:
+        return datetime.datetime.fromisoformat(event_time["dateTime"].replace("Z", "+00:00"))
+    if "date" in event_time:
+        day = datetime.date.fromisoformat(event_time["date"])
+        zone = ZoneInfo(event_time.get("timeZone") or timezone_id)
+        return datetime.datetime.combine(day, datetime.time.min, tzinfo=zone)
+    return None
+
+
+def event_bounds(event: dict, timezone_id: str) -> tuple:
+    """Return (start, end) epoch seconds of an event; all-day ends are exclusive."""
+    start = parse_event_time(event.get("start", {}), timezone_id)
+    end = parse_event_time(event.get("end", {}), timezone_id)
+    if start is None:
+        return None
+    if end is None or end < start:
+        end = start
+    return start.timestamp(), end.timestamp()
+
+
+class EventIntervalIndex:
+    """Events sorted by start time, answering overlap queries in O(log n + k)."""
+
+    def __init__(self, events: list, timezone_id: str):
+        intervals = []
+        for event in events:
+            bounds = event_bounds(event, timezone_id)
+            if bounds is not None:
+                intervals.append((bounds[0], bounds[1], event))
+        intervals.sort(key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in intervals]
+        self._intervals = intervals
+        # No event starting earlier than (query start - longest event) can overlap it
+        self._max_duration = max((end - start for start, end, _ in intervals), default=0)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def overlapping(self, start: float, end: float) -> list:
+        """
+        Return (start, end, event) for events overlapping [start, end).
+
+        Args:
+            start (float): Window start, epoch seconds
+            end (float): Window end, epoch seconds
+
+        Returns:
+            list: Matching intervals ordered by start time
+        """
+        low = bisect.bisect_left(self._starts, start - self._max_duration)
+        high = bisect.bisect_left(self._starts, end)
+        return [
+            interval
+            for interval in self._intervals[low:high]
+            if interval[1] > start or interval[0] >= start
+        ]
+
+
+class CalendarEventStore:
+    """Incrementally synced, in-memory copy of one calendar."""
+
+    def __init__(self, service_factory, timezone_factory, calendar_id: str = "primary"):
+        self._service_factory = service_factory
+        self._timezone_factory = timezone_factory
+        self._calendar_id = calendar_id
+        self._lock = threading.RLock()
+        self._events = {}
+        self._sync_token = None
+        self._window_start = None
+        self._window_end = None
+        self._last_sync = None
+        self._index = None
+        self._timezone_id = None
+        self.api_calls = 0
+
+    @property
+    def window_start(self) -> datetime.datetime:
+        """Earliest time the store holds events for (None before the first sync)."""
+        return self._window_start
+
+    def covers(self, time_min: datetime.datetime, time_max: datetime.datetime = None) -> bool:
+        """Whether [time_min, time_max) lies inside the synced window."""
+        if self._window_start is None or time_min < self._window_start:
+            return False
+        return time_max is None or time_max <= self._window_end
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Bring the store up to date with the calendar.
+
+        Args:
+            force (bool): Sync even if the last sync was very recent
+
+        Returns:
+            bool: True if the store is usable, False if no service is available
+        """
+        with self._lock:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            # Without a sync token every sync is a full reload, so space them out
+            interval = MIN_SYNC_INTERVAL_SECONDS if self._sync_token else FULL_SYNC_INTERVAL_SECONDS
+            recently_synced = (
+                self._last_sync is not None
+                and (now - self._last_sync).total_seconds() < interval
+            )
+            if recently_synced and not force:
+                return True
+
+            service = self._service_factory()
+            if not service:
+                return False
+            self._timezone_id = self._timezone_factory(service)
+
+            window_expiring = (
+                self._window_end is not None
+                and now + datetime.timedelta(days=SYNC_LOOKAHEAD_DAYS / 2) > self._window_end
+            )
+            if self._sync_token and not window_expiring:
+                try:
+                    self._incremental_sync(service)
+                except HttpError as e:
+                    # 410 Gone: the sync token expired, start over
+                    if e.resp.status != 410:
+                        raise
+                    self._full_sync(service, now)
+            else:
+                self._full_sync(service, now)
+            self._last_sync = now
+            return True
+
+    def _list_all(self, service, **params):
+        """Page through events().list, returning (items, nextSyncToken)."""
+        items = []
+        params = dict(
+            params,
+            calendarId=self._calendar_id,
+            singleEvents=True,
+            maxResults=PAGE_SIZE,
+            timeZone=self._timezone_id,
+        )
+        while True:
+            response = service.events().list(**params).execute()
+            self.api_calls += 1
+            items.extend(response.get("items", []))
+            if not response.get("nextPageToken"):
+                return items, response.get("nextSyncToken")
+            params["pageToken"] = response["nextPageToken"]
+
+    def _full_sync(self, service, now: datetime.datetime):
+        window_start = now - datetime.timedelta(days=SYNC_LOOKBACK_DAYS)
+        window_end = now + datetime.timedelta(days=SYNC_LOOKAHEAD_DAYS)
+        # No timeMax: it would suppress nextSyncToken; _apply clips to window_end
+        items, sync_token = self._list_all(
+            service,
+            timeMin=window_start.isoformat().replace("+00:00", "Z"),
+        )
+        if not sync_token:
+            print(
+                f"Warning: calendar {self._calendar_id} returned no sync token; "
+                f"reloading every {FULL_SYNC_INTERVAL_SECONDS:g}s instead of syncing incrementally"
+            )
+        self._window_start = window_start
+        self._window_end = window_end
+        self._events = {}
+        for event in items:
+            if event.get("status") != "cancelled":
+                self._apply(event)
+        self._sync_token = sync_token
+        self._index = None
+
+    def _incremental_sync(self, service):
+        # Incremental results include deleted events (status "cancelled")
+        items, sync_token = self._list_all(service, syncToken=self._sync_token)
+        for event in items:
+            self._apply(event)
+        self._sync_token = sync_token or self._sync_token
+
+    def _in_window(self, event: dict) -> bool:
+        bounds = event_bounds(event, self._timezone_id)
+        return bounds is not None and bounds[0] < self._window_end.timestamp()
+
+    def _apply(self, event: dict):
+        # Neither the full nor the incremental list is bounded above; drop instances past the window
+        if event.get("status") == "cancelled" or not self._in_window(event):
+            if self._events.pop(event.get("id"), None) is not None:
+                self._index = None
+        else:
+            self._events[event["id"]] = event
+            self._index = None
+
+    def upsert(self, event: dict):
+        """Record an event we just created or updated, ahead of the next sync."""
+        with self._lock:
+            if self._window_start is not None:
+                self._apply(event)
+
+    def remove(self, event_id: str):
+        """Forget an event we just deleted, ahead of the next sync."""
+        with self._lock:
+            self._apply({"id": event_id, "status": "cancelled"})
+
+    def query(self, time_min: datetime.datetime, time_max: datetime.datetime) -> list:
+        """
+        Return the events overlapping [time_min, time_max), ordered by start.
+
+        Args:
+            time_min (datetime): Aware window start
+            time_max (datetime): Aware window end
+
+        Returns:
+            list: Calendar API event dicts
+        """
+        return [event for _, _, event in self.query_intervals(time_min, time_max)]
+
+    def query_intervals(self, time_min: datetime.datetime, time_max: datetime.datetime) -> list:
+        """Like query(), but returns (start, end, event) with epoch-second bounds."""
+        with self._lock:
+            if self._index is None:
+                self._index = EventIntervalIndex(list(self._events.values()), self._timezone_id)
+            return self._index.overlapping(time_min.timestamp(), time_max.timestamp())
+
+    def timezone_id(self) -> str:
+        return self._timezone_id
+
+    def stats(self) -> dict:
+        return {
+            "events": len(self._events),
+            "window_start": self._window_start.isoformat() if self._window_start else None,
+            "window_end": self._window_end.isoformat() if self._window_end else None,
+            "sync_token": self._sync_token is not None,
+            "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            "api_calls": self.api_calls,
+        }
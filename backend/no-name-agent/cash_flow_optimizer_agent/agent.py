@@ -2,6 +2,9 @@ from google.adk.agents import Agent
 from google.adk.planners import PlanReActPlanner
 from google.adk.tools import tool
 
+from bank_client import BankApiError
+from transaction_store import transaction_store
+
 @tool
 def transfer_to_account(user_id: str, from_account: str, to_account: str, amount: float):
     """Transfers money from one account to another."""
@@ -15,10 +18,26 @@ def schedule_transfers(user_id: str, from_account: str, to_account: str, amount:
     return {"status": "success", "message": "Transfer scheduled successfully."}
 
 @tool
-def get_transactions(user_id: str):
-    """Gets the user's transactions."""
+async def get_transactions(user_id: str, start_date: str, end_date: str, category: str):
+    """
+    Gets the user's transactions, newest first, with a 7-day rolling spend for the period.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+        start_date (str): First day to include (YYYY-MM-DD), or "" for all history
+        end_date (str): Last day to include (YYYY-MM-DD), or "" for all history
+        category (str): Only include this category, or "" for every category
+    """
     print(f"Getting transactions for user {user_id}")
-    return {"status": "success", "transactions": []}
+    try:
+        transactions = await transaction_store.get(user_id)
+        return {
+            "status": "success",
+            "transactions": transactions.rows(start_date, end_date, category=category),
+            "weekly_spend": transactions.rolling_spend(7, start_date, end_date, category=category),
+        }
+    except (BankApiError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
 
 # Define the agent
 agent = Agent(
@@ -1,6 +1,9 @@
 from adk.agent import Agent
 from adk.tools import tool
 
+from bank_client import BankApiError
+from transaction_store import transaction_store
+
 @tool
 def recommend_credit_cards(user_id: str):
     """Recommends credit cards to the user based on their spending habits."""
@@ -20,10 +23,29 @@ def check_for_hidden_charges(user_id: str):
     return {"status": "success", "hidden_charges": []}
 
 @tool
-def get_spending_by_category(user_id: str, category: str):
-    """Gets the user's spending by category."""
+async def get_spending_by_category(user_id: str, category: str, start_date: str, end_date: str):
+    """
+    Gets the user's spending by category.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+        category (str): Category to total, or "" for a breakdown of every category
+        start_date (str): First day to include (YYYY-MM-DD), or "" for all history
+        end_date (str): Last day to include (YYYY-MM-DD), or "" for all history
+    """
     print(f"Getting spending by category for user {user_id} in category {category}")
-    return {"status": "success", "spending": 500.00}
+    try:
+        transactions = await transaction_store.get(user_id)
+        if not category:
+            return {"status": "success", "categories": transactions.spending_by_category(start_date, end_date)}
+        return {
+            "status": "success",
+            "category": category,
+            "spending": transactions.total_spent(start_date, end_date, category=category)["total"],
+            "top_merchants": transactions.top_merchants(5, start_date, end_date, category=category),
+        }
+    except (BankApiError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
 
 # Define the agent
 agent = Agent(
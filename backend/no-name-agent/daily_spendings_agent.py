@@ -7,7 +7,11 @@ from mcp.types import ToolsCapability
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import stripe
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
+from financial_agent.multi_fetch import fetch_financial_data
+from bank_client import BankApiError
+from duplicate_charge_detection_agent.detector import detect_duplicate_charges
+from transaction_store import transaction_store
 from google.adk.tools.agent_tool import AgentTool
 
 # Initialize Spotify API
@@ -16,8 +20,6 @@ spotify = spotipy.Spotify(client_credentials_manager=SpotifyClientCredentials(cl
 # Initialize Stripe API
 stripe.api_key = "STRIPE_API_KEY"
 
-financial_agent_tool = AgentTool(agent=financial_agent)
-
 
 def cancel_spotify_subscription(user_id: str):
     """Cancels the user's Spotify subscription if they haven't listened to much music recently."""
@@ -43,12 +45,71 @@ def human_approval(question: str):
     print(f"Awaiting human approval for: {question}")
     return {"status": "success", "approved": True} # Simulating approval
 
+async def find_duplicate_charges(user_id: str, window_minutes: int):
+    """
+    Finds likely duplicate charges in the user's transactions.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+        window_minutes (int): How many minutes apart charges with the same merchant
+            and amount may be to count as duplicates (use 10 if the user doesn't say)
+
+    Returns:
+        dict: Groups of candidate duplicate charges with their transaction IDs
+    """
+    try:
+        transactions = await transaction_store.get(user_id)
+    except BankApiError as e:
+        return {"status": "error", "message": str(e)}
+    return detect_duplicate_charges(transactions.transactions, window_minutes)
+
+async def find_subscriptions(user_id: str):
+    """
+    Finds the user's subscriptions and other recurring charges.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+
+    Returns:
+        dict: Active and lapsed subscriptions with their billing period, amount,
+            monthly cost and estimated next charge date
+    """
+    try:
+        transactions = await transaction_store.get(user_id)
+    except BankApiError as e:
+        return {"status": "error", "message": str(e)}
+    return transactions.subscriptions()
+
+async def get_spending_summary(user_id: str, start_date: str, end_date: str):
+    """
+    Summarizes the user's spending by category and merchant for a period.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+        start_date (str): First day to include (YYYY-MM-DD), or "" for all history
+        end_date (str): Last day to include (YYYY-MM-DD), or "" for all history
+
+    Returns:
+        dict: Spend per category and the top merchants, largest first
+    """
+    try:
+        transactions = await transaction_store.get(user_id)
+        return {
+            "status": "success",
+            "spending_by_category": transactions.spending_by_category(start_date, end_date),
+            "top_merchants": transactions.top_merchants(10, start_date, end_date),
+        }
+    except (BankApiError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
 subscriptions_agent = Agent(
     name="SubscriptionAgent",
     description="Manages user subscriptions.",
     instruction="""You are a subscription agent. Your goal is to help users manage their subscriptions.
 
-    To identify subscriptions, you need to get the user's transactions. You can do this by calling the `financial_agent` with the following input:
+    To identify subscriptions, call the `find_subscriptions` tool with the user's ID. It detects recurring charges (weekly, monthly, annual, ...) across the full transaction history and returns each one with its amount, monthly cost and estimated next charge date.
+
+    Only if `find_subscriptions` returns an error, get the user's transactions by calling the `financial_agent` with the following input:
 
     ```json
     {
@@ -59,11 +120,12 @@ subscriptions_agent = Agent(
     }
     ```
 
-    From the transactions, look for recurring transactions with the same description and amount. These are likely subscriptions.
+    and look for recurring transactions with the same description and amount yourself.
 
     If the user asks to cancel a subscription, you can use the `cancel_spotify_subscription` tool to cancel their Spotify subscription. For other subscriptions, you will need to ask for human approval before taking any action.""",
     model="gemini-2.5-flash",
     tools=[
+        find_subscriptions,
         cancel_spotify_subscription,
         human_approval,
         financial_agent_tool,
@@ -85,7 +147,7 @@ discounts_agent = Agent(
     }
     ```
 
-    You can also get the user's transactions to identify potential savings. To do this, call the `financial_agent` with the following input:
+    To identify potential savings, call the `get_spending_summary` tool to see where the user spends the most by category and merchant, and compare that with their partners. Only if it returns an error, get the user's transactions by calling the `financial_agent` with the following input:
 
     ```json
     {
@@ -97,6 +159,7 @@ discounts_agent = Agent(
     ```
     """,
     tools=[
+        get_spending_summary,
         financial_agent_tool,
     ],
 )
@@ -107,7 +170,9 @@ duplicate_charge_detection_agent = Agent(
     model="gemini-2.5-flash",
     instruction="""You are a duplicate charge detection agent. Your goal is to detect potential duplicate charges and escalate them to a support agent.
 
-    To detect duplicate charges, you need to get the user's transactions. You can do this by calling the `financial_agent` with the following input:
+    To detect duplicate charges, call the `find_duplicate_charges` tool with the user's ID. It checks the full transaction history and returns only the groups of charges that look like duplicates: "exact" groups share merchant, amount and time, "near" groups share merchant and amount within the time window.
+
+    Only if `find_duplicate_charges` returns an error, get the user's transactions by calling the `financial_agent` with the following input and look for transactions with the same merchant, amount, and date yourself:
 
     ```json
     {
@@ -118,8 +183,9 @@ duplicate_charge_detection_agent = Agent(
     }
     ```
 
-    Look for transactions with the same merchant, amount, and date. If you find any, ask for human approval before taking any action.""",
+    If you find any duplicates, ask for human approval before taking any action.""",
     tools=[
+        find_duplicate_charges,
         human_approval,
         financial_agent_tool,
     ],
@@ -143,7 +209,7 @@ daily_spendings_agent = Agent(
     *   `DiscountAgent`: Finds relevant discounts and coupons for the user.
     *   `DuplicateChargeDetectionAgent`: Detects potential duplicate charges and escalates to a support agent.
 
-    You can also interact with the `financial_agent` to get financial data.
+    You can also interact with the `financial_agent` to get financial data. When you need several independent pieces of data (e.g. transactions and partners), call `fetch_financial_data` once with all of the requests instead of calling the `financial_agent` once per request.
 
     To get the user's transactions, you can call the `financial_agent` with the following input:
 
@@ -166,6 +232,7 @@ daily_spendings_agent = Agent(
     ```
     """,
     tools=[
+        fetch_financial_data,
         financial_agent_tool,
     ],
 )
\ No newline at end of file
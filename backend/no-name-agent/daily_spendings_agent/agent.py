@@ -5,10 +5,10 @@ from google.adk.planners import PlanReActPlanner
 from subscription_agent.agent import agent as subscription_agent
 from discount_agent.agent import agent as discount_agent
 from duplicate_charge_detection_agent.agent import agent as duplicate_charge_detection_agent
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
+from financial_agent.multi_fetch import fetch_financial_data
 from google.adk.tools.agent_tool import AgentTool
 
-financial_agent_tool = AgentTool(agent=financial_agent)
 
 daily_spendings_agent = Agent(
     name="daily_spendings_agent",
@@ -20,6 +20,7 @@ daily_spendings_agent = Agent(
         duplicate_charge_detection_agent,
     ],
     tools=[
+        fetch_financial_data,
         financial_agent_tool,
     ],
     description="",
@@ -1,13 +1,33 @@
+import datetime
+
 from google.adk.agents import Agent
 # from google.adk.tools import tool
 
-def proactively_identify_discounts(user_id: str):
+from bank_client import BankApiError
+from transaction_store import transaction_store
+
+DISCOUNT_LOOKBACK_DAYS = 90
+
+async def proactively_identify_discounts(user_id: str):
     """
     Get users transactions for the last month or last 3 months. Identify the category, cross check with partners and see if they could have saved money by 
     using promotions or discounts. Flag it to the user.
+
+    Returns the user's spend per category and top merchants over the last 3 months;
+    cross check these with the partners from find_relevant_discounts.
     """
     print(f"Proactively identifying discounts for user {user_id}")
-    return {"status": "success", "potential_savings": "If you had instead purchased groceries from No Frills, you would have saved X amount of money by using this Y discount"}
+    start_date = (datetime.date.today() - datetime.timedelta(days=DISCOUNT_LOOKBACK_DAYS)).isoformat()
+    try:
+        transactions = await transaction_store.get(user_id)
+    except BankApiError as e:
+        return {"status": "error", "message": str(e)}
+    return {
+        "status": "success",
+        "since": start_date,
+        "spending_by_category": transactions.spending_by_category(start_date),
+        "top_merchants": transactions.top_merchants(10, start_date),
+    }
 
 def find_relevant_discounts(user_id: str, query: str):
     """
@@ -1,5 +1,7 @@
 from google.adk.agents import Agent
 
+from duplicate_charge_detection_agent.detector import detect_duplicate_charges
+
 def get_transactions(user_id: str):
     """Gets the user's transactions."""
     print(f"Getting transactions for user {user_id}")
@@ -10,6 +12,21 @@ def get_transactions(user_id: str):
         {"transaction_id": "125", "merchant": "Merchant B", "amount": 25.50, "date": "2025-08-14T11:00:00Z"},
     ]}
 
+def find_duplicate_charges(user_id: str, window_minutes: int):
+    """
+    Finds likely duplicate charges in the user's transactions.
+
+    Args:
+        user_id (str): The user to check
+        window_minutes (int): How many minutes apart charges with the same merchant
+            and amount may be to count as duplicates (use 10 if the user doesn't say)
+
+    Returns:
+        dict: Groups of candidate duplicate charges with their transaction IDs
+    """
+    result = get_transactions(user_id)
+    return detect_duplicate_charges(result["transactions"], window_minutes)
+
 def get_credit_card_charges(user_id: str):
     """Gets the user's credit card charges. [TBD]"""
     print(f"Getting credit card charges for user {user_id}")
@@ -25,7 +42,11 @@ agent = Agent(
     name="DuplicateChargeDetectionAgent",
     description="Detects potential duplicate charges and escalates to a support agent.",
     model="gemini-2.5-flash",
+    instruction="""You are a duplicate charge detection agent. Use the `find_duplicate_charges` tool to check the user's transactions; it returns only the groups of charges that look like duplicates, so there is no need to read the full transaction list yourself.
+
+    A group with match "exact" has the same merchant, amount and time; "near" means the same merchant and amount within the time window. Explain each group to the user, and ask for human approval before taking any action on it.""",
     tools=[
+        find_duplicate_charges,
         get_transactions,
         get_credit_card_charges,
         human_approval,
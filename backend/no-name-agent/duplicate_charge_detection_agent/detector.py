@@ -0,0 +1,136 @@
+"""
+Deterministic duplicate-charge detection.
+
+Rather than handing the model the raw transaction history and asking it to
+spot "the same merchant, amount, and date", the detector indexes charges by
+(normalized merchant, amount in cents) and keeps a sliding time window per
+key. Each charge is compared only against earlier charges with the same key
+that are still inside the window, so a pass over time-ordered transactions
+is linear; only the candidate groups are returned to the model.
+
+Two kinds of duplicates are flagged:
+
+- exact: same merchant, amount and timestamp (e.g. a double-posted charge,
+  or two same-day charges when the source only has dates)
+- near: same merchant and amount within window_minutes of each other
+  (e.g. transactions 123 and 124 in the sample data, five minutes apart)
+"""
+
+import datetime
+from collections import deque
+from dataclasses import dataclass
+
+from bank_client import Transaction, normalize_merchant, parse_transaction_date
+
+DEFAULT_WINDOW_MINUTES = 10
+
+
+@dataclass(frozen=True)
+class Charge:
+    """A transaction reduced to the fields duplicate detection keys on."""
+
+    transaction_id: str
+    merchant: str
+    amount: float
+    timestamp: datetime.datetime
+
+    @property
+    def key(self) -> tuple:
+        return normalize_merchant(self.merchant), round(self.amount * 100)
+
+
+def to_charges(transactions) -> tuple:
+    """
+    Convert transactions in any of the bank API shapes into time-ordered charges.
+
+    Args:
+        transactions: Transaction objects or API rows (snake_case keys,
+            display keys, or the merchant/date rows of the sample data)
+
+    Returns:
+        tuple: (charges sorted by timestamp, number of rows skipped for lacking a date)
+    """
+    charges = []
+    skipped = 0
+    for row in transactions:
+        if isinstance(row, dict):
+            row = Transaction.from_api(row)
+        timestamp = parse_transaction_date(row.date)
+        if timestamp is None:
+            skipped += 1
+            continue
+        charges.append(Charge(row.transaction_id, row.description, row.amount, timestamp))
+    # Bank history is usually already chronological; only sort when it is not
+    if any(later.timestamp < earlier.timestamp for earlier, later in zip(charges, charges[1:])):
+        charges.sort(key=lambda charge: charge.timestamp)
+    return charges, skipped
+
+
+def find_duplicate_groups(charges: list, window_minutes: float = DEFAULT_WINDOW_MINUTES) -> list:
+    """
+    Group time-ordered charges that look like duplicates of each other.
+
+    Args:
+        charges (list): Charges sorted by timestamp
+        window_minutes (float): Maximum gap between a charge and the previous
+            charge with the same merchant and amount
+
+    Returns:
+        list: Lists of two or more charges, in order of their first charge
+    """
+    window = datetime.timedelta(minutes=window_minutes)
+    recent = {}  # key -> deque of charges still inside the window
+    group_of = {}  # transaction ID -> index into groups
+    groups = []
+
+    for charge in charges:
+        pending = recent.setdefault(charge.key, deque())
+        while pending and charge.timestamp - pending[0].timestamp > window:
+            pending.popleft()
+        if pending:
+            # Chain onto the group of the latest matching charge
+            group = group_of[pending[-1].transaction_id]
+            groups[group].append(charge)
+        else:
+            group = len(groups)
+            groups.append([charge])
+        group_of[charge.transaction_id] = group
+        pending.append(charge)
+
+    return [group for group in groups if len(group) > 1]
+
+
+def detect_duplicate_charges(transactions, window_minutes: float = DEFAULT_WINDOW_MINUTES) -> dict:
+    """
+    Find likely duplicate charges in a transaction history.
+
+    Args:
+        transactions: Transaction objects or bank API rows
+        window_minutes (float): How close together same merchant/amount charges must be
+
+    Returns:
+        dict: Candidate groups only, ready to hand to the model
+    """
+    if not window_minutes or window_minutes <= 0:
+        window_minutes = DEFAULT_WINDOW_MINUTES
+    charges, skipped = to_charges(transactions)
+    candidates = []
+    for group in find_duplicate_groups(charges, window_minutes):
+        first, last = group[0], group[-1]
+        candidates.append({
+            "match": "exact" if first.timestamp == last.timestamp else "near",
+            "merchant": first.merchant,
+            "amount": first.amount,
+            "count": len(group),
+            "transaction_ids": [charge.transaction_id for charge in group],
+            "first_charged_at": first.timestamp.isoformat(),
+            "last_charged_at": last.timestamp.isoformat(),
+            "span_minutes": round((last.timestamp - first.timestamp).total_seconds() / 60, 1),
+        })
+    return {
+        "status": "success",
+        "window_minutes": window_minutes,
+        "transactions_checked": len(charges),
+        "transactions_skipped": skipped,
+        "duplicate_groups": candidates,
+    }
@@ -1,9 +1,18 @@
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 
+from a2a_client import A2A_TIMEOUT, a2a_http_client
+from financial_agent.cache import CachedAgentTool
+
+FINANCIAL_AGENT_CARD_URL = "https://a2a-ep2-33wwy4ha3a-uw.a.run.app/.well-known/agent-card.json"
+
+# One RemoteA2aAgent for the whole process, on the shared keep-alive pool
 financial_agent = RemoteA2aAgent(
     name="financial_agent",
     description="Agent that has access to financial data. When asked for financial information general or user specific, use your tools to fetch the information",
-    agent_card=(
-        f"https://a2a-ep2-33wwy4ha3a-uw.a.run.app/.well-known/agent-card.json"
-    ),
+    agent_card=FINANCIAL_AGENT_CARD_URL,
+    httpx_client=a2a_http_client,
+    timeout=A2A_TIMEOUT,
 )
+
+# Shared, cached tool wrapper; every agent that talks to financial_agent uses this
+financial_agent_tool = CachedAgentTool(agent=financial_agent)
@@ -0,0 +1,244 @@
+"""
+Read-through cache in front of the remote financial_agent.
+
+Every AgentTool(agent=financial_agent) call is an A2A round-trip to the
+Cloud Run service, and a single user question often fans out into several
+identical lookups (get_transactions, get_net_worth, ...). This module keeps
+recent results per user so repeated reads are answered from memory:
+
+- entries are keyed by (user_id, tool_name, normalized args)
+- entries expire after FINANCIAL_CACHE_TTL seconds and the least recently
+  used entries are evicted past FINANCIAL_CACHE_MAX_ENTRIES
+- only known reads are cached: get_/list_/view_ tool names and free text
+  that asks for data without any write verb. Everything else (create goal,
+  deposit, transfer, unknown tools, ...) goes straight to the agent and
+  drops the user's entries
+- concurrent identical reads share one in-flight call
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+
+CACHE_TTL_SECONDS = float(os.getenv("FINANCIAL_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("FINANCIAL_CACHE_MAX_ENTRIES", "1024"))
+
+# Tool names that only read bank data; any other tool is treated as a write
+READ_TOOL_PREFIXES = ("get_", "list_", "view_")
+
+# Free-text requests that ask for data
+READ_REQUEST_PATTERN = re.compile(
+    r"^\W*(show|list|display|view|get|fetch|check|find|explain|tell me|give me|"
+    r"what|what's|whats|which|how|when|where|who|is|are|am i|do i|did i|does|"
+    r"can i|could i|any|can you (show|list|display|check|find|get|tell|give|explain)|"
+    r"could you (show|list|display|check|find|get|tell|give|explain))\b",
+    re.IGNORECASE,
+)
+
+# Verbs that change data; a request using any of them is never treated as a read
+WRITE_REQUEST_PATTERN = re.compile(
+    r"\b(create|open|close|update|increase|decrease|change|edit|modify|delete|cancel|"
+    r"remove|stop|terminate|transfer|send|pay|deposit|withdraw|move|add|contribute|"
+    r"set|schedule|reschedule|book|make|submit|apply|subscribe|unsubscribe|confirm|"
+    r"approve|go ahead)\b",
+    re.IGNORECASE,
+)
+
+USER_ID_PATTERN = re.compile(r"\buser-\d+\b", re.IGNORECASE)
+CODE_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+@dataclass(frozen=True)
+class FinancialRequest:
+    """A financial_agent request reduced to its cache identity."""
+
+    user_id: str
+    tool_name: str
+    args: str
+    is_read: bool
+
+    @property
+    def key(self) -> tuple:
+        return (self.user_id, self.tool_name, self.args)
+
+
+def is_read_request(text: str) -> bool:
+    """Whether free text clearly only asks for data."""
+    return bool(READ_REQUEST_PATTERN.search(text)) and not WRITE_REQUEST_PATTERN.search(text)
+
+
+def parse_financial_request(args: dict, default_user_id: str = "") -> FinancialRequest:
+    """
+    Normalize the arguments of a financial_agent tool call.
+
+    The agents are instructed to send JSON such as
+    {"tool_name": "get_net_worth", "user_id": "user-001"}; anything else is
+    treated as a free-text query and normalized by case and whitespace.
+
+    Args:
+        args (dict): The AgentTool arguments (usually {"request": "..."})
+        default_user_id (str): User ID to use when the request names none
+
+    Returns:
+        FinancialRequest: The normalized request
+    """
+    request = args.get("request", args)
+    payload = None
+    if isinstance(request, dict):
+        payload = dict(request)
+    elif isinstance(request, str):
+        try:
+            payload = json.loads(CODE_FENCE_PATTERN.sub("", request.strip()))
+        except json.JSONDecodeError:
+            payload = None
+
+    if isinstance(payload, dict) and payload.get("tool_name"):
+        tool_name = str(payload.pop("tool_name"))
+        user_id = str(payload.pop("user_id", default_user_id))
+        return FinancialRequest(
+            user_id=user_id,
+            tool_name=tool_name,
+            args=json.dumps(payload, sort_keys=True, default=str),
+            is_read=tool_name.lower().startswith(READ_TOOL_PREFIXES),
+        )
+
+    text = " ".join(str(request).split()).lower()
+    user_match = USER_ID_PATTERN.search(text)
+    return FinancialRequest(
+        user_id=user_match.group(0) if user_match else default_user_id,
+        tool_name="query",
+        args=text,
+        is_read=is_read_request(text),
+    )
+
+
+class FinancialResultCache:
+    """TTL + LRU cache with single-flight coalescing of identical requests."""
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS, max_entries: int = CACHE_MAX_ENTRIES):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = {}  # key -> asyncio.Future
+        self._generations = {}  # user_id -> write counter
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(self, key: tuple, fetch):
+        """
+        Return the cached value for key, calling fetch() on a miss.
+
+        Args:
+            key (tuple): Cache key whose first element is the user ID
+            fetch: Zero-argument coroutine function producing the value
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading call was cancelled; retry unless we were too
+                if not future.cancelled():
+                    raise
+
+        self.misses += 1
+        user_id = key[0]
+        generation = self._generations.get(user_id, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        else:
+            # Skip storing reads that raced with a write for the same user
+            if self._generations.get(user_id, 0) == generation:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _store(self, key: tuple, value):
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached entry for a user (all users if user_id is empty)."""
+        if not user_id:
+            self._entries.clear()
+            for known_user in self._generations:
+                self._generations[known_user] += 1
+            return
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+financial_cache = FinancialResultCache()
+
+
+def context_user_id(tool_context: ToolContext) -> str:
+    invocation_context = getattr(tool_context, "_invocation_context", None)
+    return getattr(invocation_context, "user_id", "") or ""
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool that answers repeated financial_agent reads from financial_cache.
+
+    Anything not recognized as a read runs uncached and invalidates the user.
+    """
+
+    async def run_async(self, *, args: dict, tool_context: ToolContext):
+        request = parse_financial_request(args, context_user_id(tool_context))
+        parent_run = super(CachedAgentTool, self).run_async
+
+        if not request.is_read:
+            try:
+                return await parent_run(args=args, tool_context=tool_context)
+            finally:
+                financial_cache.invalidate_user(request.user_id)
+
+        return await financial_cache.get_or_fetch(
+            request.key,
+            lambda: parent_run(args=args, tool_context=tool_context),
+        )
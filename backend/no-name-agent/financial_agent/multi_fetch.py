@@ -0,0 +1,84 @@
+"""
+Concurrent fan-out of independent financial_agent requests.
+
+ReAct agents tend to ask financial_agent for one thing per planner step
+(accounts, then debts, then goals, then net worth), paying a full A2A
+round-trip each time. fetch_financial_data takes all of those requests in a
+single tool call and runs them concurrently through the cached
+financial_agent_tool, so the step costs about one round-trip and repeated
+reads are still answered from financial_cache.
+"""
+
+import os
+import json
+import asyncio
+
+from google.adk.tools.tool_context import ToolContext
+
+from financial_agent.agent import financial_agent_tool
+from financial_agent.cache import context_user_id, parse_financial_request
+
+MULTI_FETCH_CONCURRENCY = int(os.getenv("FINANCIAL_MULTI_FETCH_CONCURRENCY", "4"))
+MULTI_FETCH_MAX_REQUESTS = int(os.getenv("FINANCIAL_MULTI_FETCH_MAX_REQUESTS", "10"))
+
+
+async def fetch_financial_data(requests: list[dict], tool_context: ToolContext) -> dict:
+    """
+    Fetches several independent pieces of financial data from the financial_agent at once.
+
+    Use this instead of calling the financial_agent repeatedly when the requests do
+    not depend on each other, e.g. accounts, debts, goals and net worth. Do not use
+    it for requests that change data (creating, updating or deleting anything).
+
+    Args:
+        requests (list[dict]): Requests in the same format as financial_agent input,
+            e.g. [{"tool_name": "get_accounts", "user_id": "user-001"},
+                  {"tool_name": "get_goals", "user_id": "user-001"}]
+
+    Returns:
+        dict: One result per request, in the same order
+    """
+    if len(requests) > MULTI_FETCH_MAX_REQUESTS:
+        return {
+            "status": "error",
+            "message": f"At most {MULTI_FETCH_MAX_REQUESTS} requests can be fetched at once.",
+        }
+
+    default_user_id = context_user_id(tool_context)
+    semaphore = asyncio.Semaphore(MULTI_FETCH_CONCURRENCY)
+
+    # AgentTool writes state deltas into its context; give each concurrent
+    # call its own and merge them below in request order
+    sub_contexts = [
+        ToolContext(tool_context._invocation_context, function_call_id=tool_context.function_call_id)
+        for _ in requests
+    ]
+
+    async def fetch(request: dict, sub_context: ToolContext):
+        if not isinstance(request, dict) or not request.get("tool_name"):
+            raise ValueError("Each request needs a tool_name.")
+        request = dict(request)
+        request.setdefault("user_id", default_user_id)
+        if not parse_financial_request({"request": request}).is_read:
+            raise ValueError("Only read requests (get_/list_/view_ tools) can be fetched at once.")
+        async with semaphore:
+            return await financial_agent_tool.run_async(
+                args={"request": json.dumps(request)}, tool_context=sub_context
+            )
+
+    results = await asyncio.gather(
+        *(fetch(request, sub_context) for request, sub_context in zip(requests, sub_contexts)),
+        return_exceptions=True,
+    )
+    for sub_context in sub_contexts:
+        tool_context.state.update(sub_context.actions.state_delta)
+        tool_context.actions.artifact_delta.update(sub_context.actions.artifact_delta)
+    return {
+        "status": "success",
+        "results": [
+            {"request": request, "status": "error", "message": str(result)}
+            if isinstance(result, Exception)
+            else {"request": request, "status": "success", "result": result}
+            for request, result in zip(requests, results)
+        ],
+    }
@@ -0,0 +1,287 @@
+"""
+Deterministic pre-routing for root_agent.
+
+root_agent spends a full model call (with its multi-kilobyte instruction)
+just to pick which sub-agent tool to call. For requests whose target is
+obvious ("Show me my bank accounts", "Can you check my subscriptions?") a
+keyword classifier picks the same tool in microseconds:
+
+- every route is described by the example requests from root_agent's
+  instruction plus a few domain keywords
+- terms (stemmed words and word pairs) are weighted by how specific they
+  are to a route: a term every route uses weighs nothing
+- a request is routed only when the top route scores at least
+  INTENT_ROUTER_MIN_SCORE and holds INTENT_ROUTER_MIN_SHARE of the total
+  score, and only if it reads as a lookup or question (is_read_request):
+  anything that may change data stays with the model, since the
+  instruction asks it to gather details and confirm those first
+- follow-ups are left to the model: a request is only pre-routed when it is
+  the first user message of the conversation or the model's previous turn
+  did not ask the user a question
+
+Routed requests skip the routing model call: IntentRouter.before_model_callback
+answers it with the tool call the model would have made, and the model only
+sees the turn again to phrase the tool result. Everything else goes through
+the model as before.
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from google.genai import types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from financial_agent.cache import USER_ID_PATTERN, context_user_id, is_read_request
+
+ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "1") == "1"
+ROUTER_MIN_SCORE = float(os.getenv("INTENT_ROUTER_MIN_SCORE", "1.5"))
+ROUTER_MIN_SHARE = float(os.getenv("INTENT_ROUTER_MIN_SHARE", "0.8"))
+
+FINANCIAL = "financial"
+CALENDAR = "calendar"
+BIG_SPENDINGS = "big_spendings"
+DAILY_SPENDINGS = "daily_spendings"
+INVESTMENTS = "investments"
+
+# Example requests from root_agent's instruction, per route
+ROUTE_EXAMPLES = {
+    FINANCIAL: [
+        "Show me my bank accounts.",
+        "What are my savings goals?",
+        "Show me my recent transactions.",
+        "What's my transaction history?",
+        "Show me my transactions in a table",
+        "Display my debts to me in a table format",
+        "What's my current net worth?",
+        "What automatic payments do I have?",
+        "What benefits do I get with my account?",
+        "I need to speak to a mortgage advisor.",
+    ],
+    CALENDAR: [
+        "When is my next appointment?",
+        "I'd like to book a meeting with Alice Johnson on Monday at 10:00 AM.",
+        "I need to cancel my appointment for this Tuesday.",
+    ],
+    BIG_SPENDINGS: [
+        "Can I afford a new car?",
+        "Do I qualify for a mortgage?",
+    ],
+    DAILY_SPENDINGS: [
+        "Can you check my subscriptions?",
+        "Cancel my Spotify subscription.",
+        "Are there any discounts available for me?",
+        "I think I was double-charged for something.",
+    ],
+    INVESTMENTS: [
+        "What's the current price of Google stock?",
+        "What is a 401k?",
+        "What happened in the stock market today?",
+    ],
+}
+
+# Domain words from the sub-agent descriptions that the examples do not cover
+ROUTE_KEYWORDS = {
+    FINANCIAL: [
+        "account", "balance", "goal", "transaction", "transaction history", "net worth",
+        "debt", "liability", "cash flow", "benefit", "partner", "recurring payment",
+        "automatic payment", "checking", "savings account", "statement",
+    ],
+    CALENDAR: ["appointment", "meeting", "calendar", "reschedule", "availability", "free slot"],
+    BIG_SPENDINGS: [
+        "afford", "affordability", "mortgage eligibility", "qualify", "down payment",
+        "loan", "house", "home", "big purchase", "large purchase",
+    ],
+    DAILY_SPENDINGS: [
+        "subscription", "discount", "coupon", "promo", "deal", "duplicate", "duplicate charge",
+        "double charged", "charged twice", "daily spending",
+    ],
+    INVESTMENTS: [
+        "stock", "stock market", "share price", "market", "invest", "investment", "401k",
+        "ira", "roth", "etf", "index fund", "dividend", "bond", "crypto", "ticker",
+        "financial news", "nasdaq", "s&p",
+    ],
+}
+
+STOPWORDS = frozenset(
+    "a an the i me my mine you your we our is are am was were be been do does did "
+    "can could would should will to for of in on at with about any some this that "
+    "what what's whats when where which who how show tell give get see need want like "
+    "please there have has had it its and or if just all up".split()
+)
+WORD_PATTERN = re.compile(r"[a-z0-9&]+(?:'[a-z]+)?")
+
+
+def _stem(word: str) -> str:
+    word = word.split("'")[0]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> list:
+    """Stemmed content words of text and the pairs of adjacent ones."""
+    words = [_stem(word) for word in WORD_PATTERN.findall(text.lower().replace("-", " "))]
+    words = [word for word in words if word and word not in STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+@dataclass(frozen=True)
+class Route:
+    """A pre-routing decision."""
+
+    label: str
+    score: float
+    share: float
+
+
+class IntentClassifier:
+    """Keyword classifier over ROUTE_EXAMPLES and ROUTE_KEYWORDS."""
+
+    def __init__(
+        self,
+        examples: dict = ROUTE_EXAMPLES,
+        keywords: dict = ROUTE_KEYWORDS,
+        min_score: float = ROUTER_MIN_SCORE,
+        min_share: float = ROUTER_MIN_SHARE,
+    ):
+        counts = {label: Counter() for label in set(examples) | set(keywords)}
+        for label, texts in examples.items():
+            for text in texts:
+                counts[label].update(set(terms(text)))
+        for label, words in keywords.items():
+            for word in words:
+                # A keyword counts as if two examples used it; its first term carries the phrase
+                for term in set(terms(word)) or {word}:
+                    counts[label][term] += 2
+
+        # weight = log(1 + uses in the route) * log(routes / routes using the term)
+        route_count = len(counts)
+        document_frequency = Counter(term for counter in counts.values() for term in counter)
+        self.weights = {}
+        for label, counter in counts.items():
+            for term, count in counter.items():
+                weight = math.log1p(count) * math.log(route_count / document_frequency[term])
+                if weight > 0:
+                    self.weights.setdefault(term, []).append((label, weight))
+        self.labels = sorted(counts)
+        self.min_score = min_score
+        self.min_share = min_share
+        self._classify = lru_cache(maxsize=1024)(self._score)
+
+    def _score(self, text: str) -> tuple:
+        scores = dict.fromkeys(self.labels, 0.0)
+        for term in set(terms(text)):
+            for label, weight in self.weights.get(term, ()):
+                scores[label] += weight
+        return tuple(sorted(scores.items(), key=lambda item: item[1], reverse=True))
+
+    def scores(self, text: str) -> dict:
+        """Score of every route for text, highest first."""
+        return dict(self._classify(text.strip()))
+
+    def classify(self, text: str) -> Optional[Route]:
+        """
+        Pick the route for a request if it is unambiguous.
+
+        Args:
+            text (str): The user's request
+
+        Returns:
+            Route: The route, or None if the request should go through the model
+        """
+        if not text or not is_read_request(text):
+            return None
+        ranked = self._classify(text.strip())
+        label, score = ranked[0]
+        total = sum(value for _, value in ranked)
+        if score < self.min_score or score < self.min_share * total:
+            return None
+        return Route(label=label, score=round(score, 3), share=round(score / total, 3))
+
+
+def _asked_user(content: types.Content) -> bool:
+    """Whether a model turn ended by asking the user something."""
+    text = " ".join(part.text for part in content.parts or [] if part.text and not part.thought)
+    return "?" in text
+
+
+def _latest_user_text(llm_request: LlmRequest) -> str:
+    """
+    The user's message if this is the first model call of the turn and the
+    message is not an answer to the model, else "".
+    """
+    if not llm_request.contents:
+        return ""
+    content = llm_request.contents[-1]
+    if content.role != "user" or not content.parts:
+        return ""
+    if any(part.function_response or part.function_call for part in content.parts):
+        return ""
+    for previous in reversed(llm_request.contents[:-1]):
+        if previous.role == "model":
+            if _asked_user(previous):
+                return ""
+            break
+    return " ".join(part.text for part in content.parts if part.text).strip()
+
+
+class IntentRouter:
+    """before_model_callback that answers obvious routing decisions without the model."""
+
+    def __init__(self, tools: dict, classifier: IntentClassifier = None, enabled: bool = ROUTER_ENABLED):
+        """
+        Args:
+            tools (dict): Route label -> the tool (usually an AgentTool) to call
+            classifier (IntentClassifier): Defaults to one built from ROUTE_EXAMPLES
+            enabled (bool): When False every request goes to the model
+        """
+        self.tools = tools
+        self.classifier = classifier or IntentClassifier()
+        self.enabled = enabled
+        self.routed = Counter()
+        self.passed = 0
+
+    def route(self, text: str, user_id: str = ""):
+        """
+        Return (tool, request) for an obvious request, or None.
+
+        The request is the user's text, with their user ID appended the way
+        root_agent's instruction phrases sub-agent requests.
+        """
+        route = self.classifier.classify(text)
+        tool = self.tools.get(route.label) if route else None
+        if tool is None:
+            return None
+        request = text
+        if USER_ID_PATTERN.fullmatch(user_id or "") and not USER_ID_PATTERN.search(text):
+            request = f"{text} (for user {user_id})"
+        return tool, request
+
+    def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        if not self.enabled:
+            return None
+        text = _latest_user_text(llm_request)
+        routed = self.route(text, context_user_id(callback_context)) if text else None
+        if routed is None or routed[0].name not in llm_request.tools_dict:
+            self.passed += bool(text)
+            return None
+        tool, request = routed
+        self.routed[tool.name] += 1
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(function_call=types.FunctionCall(name=tool.name, args={"request": request}))],
+            )
+        )
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "routed": dict(self.routed), "passed_to_model": self.passed}
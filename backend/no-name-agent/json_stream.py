@@ -0,0 +1,153 @@
+"""
+Incremental extraction of JSON array elements from streamed agent text.
+
+Agents answer with text such as "Here are your transactions: ```json
+[{...}, {...}]```", delivered in chunks. Instead of concatenating the whole
+response and regex-searching it afterwards (where a non-greedy \\[.*?\\]
+truncates nested JSON), JsonArrayStream scans chunks as they arrive and
+emits each element of the first JSON array of objects as soon as it is
+complete.
+
+Text such as "[1, 2, foo]" only turns out not to be JSON at "foo", so an
+array is confirmed once one of its elements decodes to an object; until
+then its elements are held back and dropped if the array proves invalid.
+Once elements have been emitted they cannot be taken back: a later invalid
+element ends the stream with failed set instead of starting over.
+
+    stream = JsonArrayStream()
+    for chunk in chunks:
+        for element in stream.feed(chunk):
+            ...
+"""
+
+import json
+
+PREVIEW_CHARS = 500
+
+
+class JsonArrayStream:
+    """Scan streamed text and yield the elements of the first JSON array in it."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._array_depth = None  # bracket depth of the array being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._element_start = None
+        self._pending = []  # decoded elements of the array, until it is confirmed
+        self._confirmed = False
+        self.done = False
+        self.failed = False
+        self.elements = 0
+        self.chars = 0
+        self.preview = ""
+
+    def feed(self, chunk: str) -> list:
+        """
+        Consume a chunk of text.
+
+        Args:
+            chunk (str): The next piece of the agent's response
+
+        Returns:
+            list: Array elements completed by this chunk, already decoded
+        """
+        self.chars += len(chunk)
+        if len(self.preview) < PREVIEW_CHARS:
+            self.preview = (self.preview + chunk)[:PREVIEW_CHARS]
+        if self.done:
+            return []
+
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and not self.done:
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                pos += 1
+                continue
+
+            if self._array_depth is None:
+                # Still looking for the opening bracket of an array
+                if char == "[":
+                    self._array_depth = 1
+                    self._depth = 1
+                pos += 1
+                continue
+
+            at_element_level = self._depth == self._array_depth
+            if at_element_level and char in ",]":
+                if self._element_start is not None:
+                    element = self._decode(buffer[self._element_start:pos])
+                    if element is _INVALID:
+                        if self._confirmed:
+                            # Elements already went out; stop rather than mix in another array
+                            self.failed = True
+                            self.done = True
+                            break
+                        # Not a JSON array after all (e.g. "[user-001]"); keep looking
+                        self._reset()
+                        pos += 1
+                        continue
+                    self._element_start = None
+                    if self._confirmed:
+                        completed.append(element)
+                    elif isinstance(element, dict):
+                        self._confirmed = True
+                        completed.extend(self._pending)
+                        completed.append(element)
+                        self._pending = []
+                    else:
+                        self._pending.append(element)
+                if char == "]":
+                    completed.extend(self._pending)
+                    self._pending = []
+                    self.done = True
+                pos += 1
+                continue
+
+            if at_element_level and self._element_start is None and not char.isspace():
+                self._element_start = pos
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+            pos += 1
+
+        # Drop text that can no longer be part of an element
+        keep_from = self._element_start if self._element_start is not None else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        if self._element_start is not None:
+            self._element_start = 0
+        self.elements += len(completed)
+        return completed
+
+    def _reset(self):
+        self._array_depth = None
+        self._depth = 0
+        self._element_start = None
+        self._pending = []
+
+    @staticmethod
+    def _decode(text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return _INVALID
+
+
+_INVALID = object()
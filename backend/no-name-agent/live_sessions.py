@@ -0,0 +1,207 @@
+"""
+Lifecycle management for live WebSocket agent sessions.
+
+A live session owns two messaging tasks, an outbound writer task, the
+upstream live model stream (live_events + LiveRequestQueue) and a session
+on a shared runner. When any part ends - client disconnect, error, idle
+timeout or server shutdown - LiveSessionManager tears all of it down:
+cancels the surviving tasks, closes the live stream and the request queue,
+and deletes the session from the runner's session service.
+
+Sessions whose tasks do not finish after cancellation are kept in a
+lingering set so soak tests can detect leaks via stats().
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+
+from fastapi import WebSocketDisconnect
+
+from runner_registry import AgentSession, RunnerRegistry
+from stream_logging import SessionLog
+from ws_outbound import OutboundQueue
+
+IDLE_TIMEOUT_SECONDS = float(os.getenv("LIVE_SESSION_IDLE_TIMEOUT", "300"))
+REAP_INTERVAL_SECONDS = float(os.getenv("LIVE_SESSION_REAP_INTERVAL", "30"))
+CANCEL_TIMEOUT_SECONDS = float(os.getenv("LIVE_SESSION_CANCEL_TIMEOUT", "5"))
+
+CLOSE_DISCONNECT = "disconnect"
+CLOSE_ERROR = "error"
+CLOSE_IDLE = "idle"
+CLOSE_SHUTDOWN = "shutdown"
+
+
+@dataclass
+class LiveSession:
+    """Everything a connected client holds on to."""
+
+    websocket: object
+    agent_session: AgentSession
+    live_events: object
+    live_request_queue: object
+    outbound: OutboundQueue
+    log: SessionLog
+    tasks: list = field(default_factory=list)
+    last_activity: float = field(default_factory=time.monotonic)
+    close_reason: str = None
+
+    @property
+    def session_id(self) -> str:
+        return self.agent_session.session.id
+
+    def touch(self):
+        """Record client or agent activity for idle detection."""
+        self.last_activity = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_activity
+
+
+class LiveSessionManager:
+    """Tracks live sessions and reclaims their resources when they end."""
+
+    def __init__(
+        self,
+        runner_registry: RunnerRegistry,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        reap_interval: float = REAP_INTERVAL_SECONDS,
+        cancel_timeout: float = CANCEL_TIMEOUT_SECONDS,
+    ):
+        self._runner_registry = runner_registry
+        self._idle_timeout = idle_timeout
+        self._reap_interval = reap_interval
+        self._cancel_timeout = cancel_timeout
+        self._sessions = {}
+        self._lingering = {}
+        self._closed = Counter()
+        self._reaper = None
+
+    def start(self):
+        """Start the idle-session reaper."""
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle_sessions())
+
+    async def serve(self, live_session: LiveSession, coroutines: list):
+        """
+        Run a session's tasks until one of them ends, then close the session.
+
+        Args:
+            live_session (LiveSession): The session to run
+            coroutines (list): Messaging and writer coroutines for the session
+        """
+        self._sessions[live_session.session_id] = live_session
+        live_session.tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+        try:
+            await asyncio.wait(live_session.tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            await self.close(live_session)
+
+    @staticmethod
+    def _log_task_errors(live_session: LiveSession, tasks):
+        """Log the exception of every finished task; a client disconnect is routine."""
+        for task in tasks:
+            if task.cancelled() or task.exception() is None:
+                continue
+            error = task.exception()
+            live_session.log.event(
+                "session",
+                "task_failed",
+                logging.DEBUG if isinstance(error, WebSocketDisconnect) else logging.ERROR,
+                task=task.get_coro().__qualname__,
+                error=repr(error),
+            )
+
+    async def close(self, live_session: LiveSession, reason: str = None):
+        """Cancel the session's tasks, close its streams and evict its state."""
+        if self._sessions.pop(live_session.session_id, None) is None:
+            return
+        live_session.close_reason = reason or self._close_reason(live_session)
+
+        # Stop both directions and the writer
+        live_session.live_request_queue.close()
+        live_session.outbound.close()
+        for task in live_session.tasks:
+            task.cancel()
+        pending = set()
+        if live_session.tasks:
+            done, pending = await asyncio.wait(live_session.tasks, timeout=self._cancel_timeout)
+            self._log_task_errors(live_session, done)
+
+        # Close the upstream live model stream once nothing iterates it
+        if not pending:
+            try:
+                await live_session.live_events.aclose()
+            except Exception as e:
+                live_session.log.event("session", "live_stream_close_failed", error=str(e))
+        else:
+            self._lingering[live_session.session_id] = live_session
+
+        if live_session.close_reason in (CLOSE_IDLE, CLOSE_SHUTDOWN):
+            try:
+                await live_session.websocket.close(code=1001)
+            except Exception:
+                pass
+
+        await self._runner_registry.end_session(live_session.agent_session)
+        self._closed[live_session.close_reason] += 1
+        live_session.log.event(
+            "session",
+            "closed",
+            reason=live_session.close_reason,
+            lingering_tasks=len(pending),
+            counters=live_session.log.summary(),
+            outbound=live_session.outbound.metrics(),
+        )
+
+    def _close_reason(self, live_session: LiveSession) -> str:
+        errors = [
+            task.exception()
+            for task in live_session.tasks
+            if task.done() and not task.cancelled()
+        ]
+        if any(error is not None and not isinstance(error, WebSocketDisconnect) for error in errors):
+            return CLOSE_ERROR
+        return CLOSE_DISCONNECT
+
+    async def _reap_idle_sessions(self):
+        while True:
+            await asyncio.sleep(self._reap_interval)
+            for live_session in list(self._sessions.values()):
+                if live_session.idle_seconds() > self._idle_timeout:
+                    # One failed close must not stop the reaper for every other session
+                    try:
+                        await self.close(live_session, CLOSE_IDLE)
+                    except Exception as e:
+                        live_session.log.event("session", "idle_close_failed", logging.ERROR, error=repr(e))
+            # Forget lingering sessions whose tasks eventually finished
+            for session_id, live_session in list(self._lingering.items()):
+                if all(task.done() for task in live_session.tasks):
+                    del self._lingering[session_id]
+
+    async def shutdown(self):
+        """Close every live session and stop the reaper."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        await asyncio.gather(
+            *(self.close(live_session, CLOSE_SHUTDOWN) for live_session in list(self._sessions.values())),
+            return_exceptions=True,
+        )
+
+    def get(self, session_id: str) -> LiveSession:
+        return self._sessions.get(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._sessions),
+            "lingering": len(self._lingering),
+            "closed": dict(self._closed),
+            "outbound": {
+                session_id: live_session.outbound.metrics()
+                for session_id, live_session in self._sessions.items()
+            },
+        }
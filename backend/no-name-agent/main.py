@@ -3,6 +3,7 @@ import os
 import json
 import asyncio
 import base64
+import logging
 import warnings
 
 from pathlib import Path
@@ -14,20 +15,29 @@ from google.genai.types import (
     Blob,
 )
 
-from google.adk.runners import InMemoryRunner
 from google.adk.agents import LiveRequestQueue
 from google.adk.agents.run_config import RunConfig
 from google.genai import types
 
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
-from agent import root_agent
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from agent import intent_router, root_agent
+from a2a_client import a2a_transport, close_shared_transport, prefetch_agent_card
+from bank_client import bank_client, BankApiError, Transaction
+from json_stream import JsonArrayStream
+from runner_registry import RunnerRegistry
+from stream_logging import SessionLog, configure_stream_logging
+from live_sessions import LiveSession, LiveSessionManager
+from prompt_budget import instrument_agent_tree, prompt_budget, static_instruction_cache
+from ws_outbound import OutboundQueue
+from ws_protocol import KIND_AUDIO_PCM, decode_frame, negotiate_subprotocol
 from investments_agent.agent import agent as investments_agent
 from daily_spendings_agent import daily_spendings_agent
-from financial_agent.agent import financial_agent
+from financial_agent.agent import FINANCIAL_AGENT_CARD_URL, financial_agent
 from transaction_history_agent.agent import agent as transaction_history_agent
+from proactive_insights_agent.pipeline import insight_pipeline
 # from proactive_insights_agent.agent import proactive_insights_agent
 
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
@@ -36,29 +46,32 @@ load_dotenv()
 
 APP_NAME = "ADK Streaming example"
 
+configure_stream_logging()
 
-async def start_agent_session(user_id, is_audio=False, agent_id=None):
-    """Starts an agent session"""
 
-    # Create a Runner
-    agent_map = {
+runner_registry = RunnerRegistry(
+    app_name=APP_NAME,
+    agents={
+        "root_agent": root_agent,
         "investments_agent": investments_agent,
         "daily_spendings_agent": daily_spendings_agent,
         "financial_agent": financial_agent,
         "transaction_history_agent": transaction_history_agent,
         # "proactive_insights_agent": proactive_insights_agent
-    }
+    },
+)
+# Per-agent token usage (and static instruction caching when enabled) for every served agent
+for served_agent in (root_agent, investments_agent, daily_spendings_agent, transaction_history_agent):
+    instrument_agent_tree(served_agent)
 
-    runner = InMemoryRunner(
-        app_name=APP_NAME,
-        agent=agent_map.get(agent_id, root_agent),
-    )
+live_session_manager = LiveSessionManager(runner_registry)
 
-    # Create a Session
-    session = await runner.session_service.create_session(
-        app_name=APP_NAME,
-        user_id=user_id,  # Replace with actual user ID
-    )
+
+async def start_agent_session(user_id, is_audio=False, agent_id=None):
+    """Starts an agent session"""
+
+    # Create a Session on the shared runner for this agent
+    agent_session = await runner_registry.create_session(user_id, agent_id)
 
     # Set response modality
     modality = "AUDIO" if is_audio else "TEXT"
@@ -71,17 +84,20 @@ async def start_agent_session(user_id, is_audio=False, agent_id=None):
     live_request_queue = LiveRequestQueue()
 
     # Start agent session
-    live_events = runner.run_live(
-        session=session,
+    live_events = agent_session.runner.run_live(
+        session=agent_session.session,
         live_request_queue=live_request_queue,
         run_config=run_config,
     )
-    return live_events, live_request_queue
+    return live_events, live_request_queue, agent_session
 
 
-async def agent_to_client_messaging(websocket, live_events):
-    """Agent to client communication"""
+async def agent_to_client_messaging(live_session, live_events):
+    """Agent to client communication, queued through the connection's OutboundQueue"""
+    outbound = live_session.outbound
+    session_log = live_session.log
     async for event in live_events:
+        live_session.touch()
 
         # If the turn complete or interrupted, send it
         if event.turn_complete or event.interrupted:
@@ -89,8 +105,11 @@ async def agent_to_client_messaging(websocket, live_events):
                 "turn_complete": event.turn_complete,
                 "interrupted": event.interrupted,
             }
-            await websocket.send_text(json.dumps(message))
-            print(f"[AGENT TO CLIENT]: {message}")
+            if event.interrupted:
+                # Audio still queued for the client is now stale
+                outbound.discard_audio()
+            await outbound.put_message(message)
+            session_log.event("control", "turn_status", **message)
             continue
 
         # Read the Content and its first Part
@@ -107,21 +126,17 @@ async def agent_to_client_messaging(websocket, live_events):
                 "mime_type": "application/json",
                 "data": json.dumps({"transcript": part.text})
             }
-            await websocket.send_text(json.dumps(message))
-            print(f"[AGENT TO CLIENT]: transcript: {part.text}")
+            await outbound.put_message(message)
+            session_log.event("text", "transcript_out", chars=len(part.text))
             continue
 
-        # If it's audio, send Base64 encoded audio data
+        # If it's audio, queue it; the writer coalesces and frames it
         is_audio = part.inline_data and part.inline_data.mime_type.startswith("audio/pcm")
         if is_audio:
             audio_data = part.inline_data and part.inline_data.data
             if audio_data:
-                message = {
-                    "mime_type": "audio/pcm",
-                    "data": base64.b64encode(audio_data).decode("ascii")
-                }
-                await websocket.send_text(json.dumps(message))
-                print(f"[AGENT TO CLIENT]: audio/pcm: {len(audio_data)} bytes.")
+                outbound.put_audio(audio_data)
+                session_log.event("audio", "audio_out", logging.DEBUG, bytes=len(audio_data))
                 continue
 
         # If it's text and a parial text, send it
@@ -130,16 +145,30 @@ async def agent_to_client_messaging(websocket, live_events):
                 "mime_type": "text/plain",
                 "data": part.text
             }
-            await websocket.send_text(json.dumps(message))
-            print(f"[AGENT TO CLIENT]: text/plain: {message}")
+            await outbound.put_message(message)
+            session_log.event("text", "text_out", logging.DEBUG, chars=len(part.text))
 
 
-async def client_to_agent_messaging(websocket, live_request_queue):
+async def client_to_agent_messaging(websocket, live_request_queue, live_session):
     """Client to agent communication"""
+    session_log = live_session.log
     while True:
+        frame = await websocket.receive()
+        if frame["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(frame.get("code", 1000))
+        live_session.touch()
+
+        # Binary frames carry raw microphone audio
+        if frame.get("bytes") is not None:
+            kind, _, pcm_data = decode_frame(frame["bytes"])
+            if kind != KIND_AUDIO_PCM:
+                raise ValueError(f"Binary frame kind not supported: {kind}")
+            live_request_queue.send_realtime(Blob(data=pcm_data, mime_type="audio/pcm"))
+            session_log.event("audio", "audio_in", logging.DEBUG, bytes=len(pcm_data), binary=True)
+            continue
+
         # Decode JSON message
-        message_json = await websocket.receive_text()
-        message = json.loads(message_json)
+        message = json.loads(frame["text"])
         mime_type = message["mime_type"]
         data = message["data"]
 
@@ -148,11 +177,12 @@ async def client_to_agent_messaging(websocket, live_request_queue):
             # Send a text message
             content = Content(role="user", parts=[Part.from_text(text=data)])
             live_request_queue.send_content(content=content)
-            print(f"[CLIENT TO AGENT]: {data}")
+            session_log.event("text", "text_in", chars=len(data))
         elif mime_type == "audio/pcm":
             # Send an audio data
             decoded_data = base64.b64decode(data)
             live_request_queue.send_realtime(Blob(data=decoded_data, mime_type=mime_type))
+            session_log.event("audio", "audio_in", logging.DEBUG, bytes=len(decoded_data), binary=False)
         else:
             raise ValueError(f"Mime type not supported: {mime_type}")
 
@@ -185,156 +215,205 @@ async def root():
     return JSONResponse({"status": "ok", "message": "Backend running"})
 
 
+# Startup prefetch of the financial agent card; kept so it is not garbage collected mid-flight
+_card_prefetch_task = None
+
+
+def _log_card_prefetch(task: asyncio.Task):
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"⚠️ Prefetching {FINANCIAL_AGENT_CARD_URL} failed: {error!r}")
+    elif not task.result():
+        print(f"⚠️ Could not fetch the financial agent card from {FINANCIAL_AGENT_CARD_URL}")
+
+
+@app.on_event("startup")
+async def start_runners():
+    global _card_prefetch_task
+    runner_registry.start()
+    live_session_manager.start()
+    if not bank_client.configured:
+        print(
+            "⚠️ BANK_API_BASE_URL is not set: transaction history, spending, subscription, duplicate-charge, "
+            "affordability and insight tools will fall back to the financial_agent or report no data, "
+            "and background insight refresh is off"
+        )
+    insight_pipeline.start()
+    # Open the pooled connection and cache the agent card before the first request needs them
+    _card_prefetch_task = asyncio.create_task(prefetch_agent_card(FINANCIAL_AGENT_CARD_URL))
+    _card_prefetch_task.add_done_callback(_log_card_prefetch)
+
+
+@app.on_event("shutdown")
+async def close_live_sessions():
+    await live_session_manager.shutdown()
+    await insight_pipeline.shutdown()
+
+
+@app.get("/api/sessions/stats")
+async def get_session_stats():
+    """Report shared runners, live session lifecycle and outbound queue metrics"""
+    stats = runner_registry.stats()
+    stats["live"] = live_session_manager.stats()
+    stats["insights"] = insight_pipeline.stats()
+    stats["a2a"] = a2a_transport.stats()
+    stats["router"] = intent_router.stats()
+    stats["prompts"] = prompt_budget.stats()
+    return JSONResponse(stats)
+
+
+@app.on_event("shutdown")
+async def close_bank_client():
+    if _card_prefetch_task is not None:
+        _card_prefetch_task.cancel()
+    await bank_client.aclose()
+    await close_shared_transport()
+    await static_instruction_cache.aclose()
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+AGENT_TRANSACTIONS_TIMEOUT_SECONDS = 60
+
+
+async def json_array_lines(rows):
+    """Serialize rows as a JSON array, one row at a time"""
+    yield "["
+    first = True
+    async for row in rows:
+        yield ("" if first else ",") + json.dumps(row)
+        first = False
+    yield "]"
+
+
+async def ndjson_lines(rows):
+    """Serialize rows as newline-delimited JSON"""
+    async for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+async def bank_transaction_rows(transactions):
+    for transaction in transactions:
+        yield transaction.to_row()
+
+
+async def agent_transaction_rows(user_id, json_stream):
+    """Yield transaction rows from the transaction history agent as soon as each one is complete"""
+    live_events, live_request_queue, agent_session = await start_agent_session(
+        user_id,
+        is_audio=False,
+        agent_id="transaction_history_agent"
+    )
+
+    # Send the request to get transaction history
+    request_text = f"Get transaction history for user ID: {user_id}. This is the specific user I need data for. When you query the financial_agent, you MUST explicitly ask for transaction data for user {user_id}. Do not return generic data - ensure you get user-specific transaction data for {user_id}. Return the data in the exact JSON format."
+    live_request_queue.send_content(
+        content=Content(role="user", parts=[Part.from_text(text=request_text)])
+    )
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + AGENT_TRANSACTIONS_TIMEOUT_SECONDS
+    seen_partial_text = False
+    try:
+        while not json_stream.done:
+            try:
+                event = await asyncio.wait_for(anext(live_events), deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                print(f"⏰ Timeout after {AGENT_TRANSACTIONS_TIMEOUT_SECONDS} seconds - response may be incomplete")
+                break
+
+            if event.turn_complete:
+                break
+            part = event.content and event.content.parts and event.content.parts[0]
+            if not part or not part.text:
+                continue
+
+            # The final non-partial event repeats the streamed text
+            if event.partial:
+                seen_partial_text = True
+            elif seen_partial_text:
+                continue
+
+            for element in json_stream.feed(part.text):
+                if isinstance(element, dict):
+                    element = Transaction.from_api(element).to_row()
+                yield element
+    finally:
+        # Close the queue and live stream, and release the session
+        live_request_queue.close()
+        await live_events.aclose()
+        await runner_registry.end_session(agent_session)
+
+
 @app.get("/api/transaction-history/{user_id}")
-async def get_transaction_history(user_id: str):
-    """Get transaction history for a specific user"""
+async def get_transaction_history(user_id: str, format: str = "json"):
+    """
+    Get transaction history for a specific user.
+
+    Returns a JSON array by default, or newline-delimited JSON rows with
+    ?format=ndjson so clients can render transactions as they arrive.
+    """
+    serialize, media_type = (
+        (ndjson_lines, NDJSON_MEDIA_TYPE) if format == "ndjson"
+        else (json_array_lines, "application/json")
+    )
+
+    # Fast path: read the rows straight from the bank API, when one is configured
     try:
-        print(f"Fetching transaction history for user: {user_id}")
-        
-        # Start agent session for transaction history
-        live_events, live_request_queue = await start_agent_session(
-            user_id, 
-            is_audio=False, 
-            agent_id="transaction_history_agent"
+        transactions = await bank_client.fetch_transactions(user_id) if bank_client.configured else None
+    except BankApiError as e:
+        print(f"⚠️ Direct transaction fetch failed, falling back to agent: {e}")
+        transactions = None
+    if transactions is not None:
+        print(f"✅ Fetched {len(transactions)} transactions for user {user_id} from bank API")
+        return StreamingResponse(
+            serialize(bank_transaction_rows(transactions)),
+            media_type=media_type,
         )
-        
-        # Set a timeout for the entire operation
-        import asyncio
-        timeout_seconds = 60  # 1 minute timeout
-        
-        # Send the request to get transaction history
-        request_text = f"Get transaction history for user ID: {user_id}. This is the specific user I need data for. When you query the financial_agent, you MUST explicitly ask for transaction data for user {user_id}. Do not return generic data - ensure you get user-specific transaction data for {user_id}. Return the data in the exact JSON format."
-        
-        print(f"Sending request to transaction history agent: {request_text}")
-        
-        content = Content(
-            role="user", 
-            parts=[Part.from_text(text=request_text)]
-        )
-        live_request_queue.send_content(content=content)
-        
-        # Collect the response with timeout
-        transaction_response = ""
-        response_chunks = []
-        try:
-            async with asyncio.timeout(timeout_seconds):
-                async for event in live_events:
-                    if event.turn_complete:
-                        break
-                        
-                    if event.content and event.content.parts:
-                        part = event.content.parts[0]
-                        if part.text:
-                            transaction_response += part.text
-                            response_chunks.append(part.text)
-                            print(f"📝 Received chunk: {len(part.text)} characters")
-        except asyncio.TimeoutError:
-            print(f"⏰ Timeout after {timeout_seconds} seconds - response may be incomplete")
-        except Exception as e:
-            print(f"⚠️ Error during response collection: {e}")
-        finally:
-            # Close the queue
-            live_request_queue.close()
-        
-        print(f"📊 Total response length: {len(transaction_response)} characters")
-        print(f"📊 Number of response chunks: {len(response_chunks)}")
-        
-        # Check if the response mentions the user ID
-        if user_id in transaction_response:
-            print(f"✅ Response contains user ID: {user_id}")
-        else:
-            print(f"⚠️ WARNING: Response does NOT contain user ID: {user_id}")
-            print(f"🔍 This suggests the agent may not be querying for user-specific data")
-        
-        # Try to parse JSON from the response
-        print(f"Raw transaction response: {transaction_response}")
-        print(f"🔍 Looking for user-specific data for user: {user_id}")
-        try:
-            # Look for JSON in markdown code blocks first
-            import re
-            code_block_pattern = r'```(?:json)?\s*([\s\S]*?)```'
-            code_block_matches = re.findall(code_block_pattern, transaction_response)
-            
-            for code_content in code_block_matches:
-                try:
-                    # Clean up the content (remove extra whitespace)
-                    clean_content = code_content.strip()
-                    transactions_data = json.loads(clean_content)
-                    
-                    # If it's an array, return it directly
-                    if isinstance(transactions_data, list):
-                        print(f"✅ Successfully parsed {len(transactions_data)} transactions from code block")
-                        
-                        # Check if the data contains the expected user ID
-                        if transactions_data and len(transactions_data) > 0:
-                            first_transaction = transactions_data[0]
-                            if 'Account ID' in first_transaction:
-                                print(f"🔍 First transaction Account ID: {first_transaction['Account ID']}")
-                                if user_id in first_transaction['Account ID']:
-                                    print(f"✅ Data appears to be user-specific for {user_id}")
-                                else:
-                                    print(f"⚠️ WARNING: Data may not be user-specific for {user_id}")
-                        
-                        return JSONResponse(transactions_data)
-                    
-                    # If it's an object with transactions array, extract it
-                    if isinstance(transactions_data, dict) and 'transactions' in transactions_data:
-                        return JSONResponse(transactions_data['transactions'])
-                    
-                    # Return the object as is
-                    return JSONResponse(transactions_data)
-                except json.JSONDecodeError:
-                    continue
-            
-            # If no code blocks found, try to find JSON directly
-            json_match = re.search(r'\[.*?\]', transaction_response, re.DOTALL)
-            if json_match:
-                try:
-                    transactions_data = json.loads(json_match.group())
-                    if isinstance(transactions_data, list):
-                        print(f"✅ Successfully parsed {len(transactions_data)} transactions from direct JSON array")
-                    return JSONResponse(transactions_data)
-                except json.JSONDecodeError:
-                    pass
-            
-            # If no array JSON found, try to find object JSON
-            json_match = re.search(r'\{.*?\}', transaction_response, re.DOTALL)
-            if json_match:
-                try:
-                    transactions_data = json.loads(json_match.group())
-                    # If it's an object with transactions array, extract it
-                    if isinstance(transactions_data, dict) and 'transactions' in transactions_data:
-                        return JSONResponse(transactions_data['transactions'])
-                    return JSONResponse(transactions_data)
-                except json.JSONDecodeError:
-                    pass
-            
-            # If no JSON found, return the raw response
-            print(f"❌ No valid JSON found in response")
-            print(f"📄 Response preview: {transaction_response[:200]}...")
-            
-            # Try to extract partial JSON if the response was cut off
-            if len(transaction_response) > 1000:  # If response is substantial
-                print(f"⚠️ Response seems substantial but incomplete - may have hit token limits")
-                
-            return JSONResponse({
-                "error": "Failed to parse transaction response",
-                "raw_response": transaction_response[:500],
-                "response_length": len(transaction_response),
-                "chunks_received": len(response_chunks)
-            }, status_code=500)
-            
-        except Exception as e:
-            return JSONResponse({
-                "error": "Failed to parse transaction response",
-                "raw_response": transaction_response[:500],
-                "parse_error": str(e)
-            }, status_code=500)
-            
+
+    # Fallback: extract the rows from the transaction history agent's answer
+    json_stream = JsonArrayStream()
+    rows = agent_transaction_rows(user_id, json_stream)
+    if format == "ndjson":
+        return StreamingResponse(serialize(rows), media_type=media_type)
+
+    try:
+        transactions = [row async for row in rows]
     except Exception as e:
         print(f"Error fetching transaction history: {e}")
         return JSONResponse(
-            {"error": f"Failed to fetch transaction history: {str(e)}"}, 
+            {"error": f"Failed to fetch transaction history: {str(e)}"},
+            status_code=500
+        )
+
+    print(f"📊 Parsed {len(transactions)} transactions from {json_stream.chars} characters of agent response")
+    if not json_stream.done or json_stream.failed:
+        return JSONResponse({
+            "error": "Failed to parse transaction response",
+            "raw_response": json_stream.preview,
+            "response_length": json_stream.chars,
+            "transactions_parsed": len(transactions),
+        }, status_code=500)
+    return JSONResponse(transactions)
+
+
+@app.get("/api/insights/{user_id}")
+async def get_insights(user_id: str):
+    """
+    Get precomputed proactive insights for a user.
+
+    Insights are computed in the background by the insight pipeline, so this
+    only reads stored values (computing them on the first request for a user).
+    """
+    try:
+        return JSONResponse(await insight_pipeline.get(user_id))
+    except Exception as e:
+        print(f"Error fetching insights: {e}")
+        return JSONResponse(
+            {"error": f"Failed to fetch insights: {str(e)}"},
             status_code=500
         )
 
@@ -353,7 +432,7 @@ async def get_transaction_history(user_id: str):
 #         print(f"Generating insights for user: {user_id}")
 #         
 #         # Start agent session for proactive insights
-#         live_events, live_request_queue = await start_agent_session(
+#         live_events, live_request_queue, agent_session = await start_agent_session(
 #             user_id, 
 #             is_audio=False, 
 #             agent_id="proactive_insights_agent"
@@ -417,28 +496,31 @@ async def get_transaction_history(user_id: str):
 async def websocket_endpoint(websocket: WebSocket, user_id: str, is_audio: str, agent_id: str = None):
     """Client websocket endpoint"""
 
-    # Wait for client connection
-    await websocket.accept()
-    print(f"Client #{user_id} connected, audio mode: {is_audio}, agent_id: {agent_id}")
+    # Wait for client connection, agreeing to binary audio frames if offered
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    await websocket.accept(subprotocol=subprotocol)
+    session_log = SessionLog(user_id)
+    session_log.event("session", "connected", is_audio=is_audio, agent_id=agent_id, subprotocol=subprotocol)
 
     # Start agent session
     user_id_str = str(user_id)
-    live_events, live_request_queue = await start_agent_session(user_id_str, is_audio == "true", agent_id)
+    live_events, live_request_queue, agent_session = await start_agent_session(user_id_str, is_audio == "true", agent_id)
 
-    # Start tasks
-    agent_to_client_task = asyncio.create_task(
-        agent_to_client_messaging(websocket, live_events)
-    )
-    client_to_agent_task = asyncio.create_task(
-        client_to_agent_messaging(websocket, live_request_queue)
+    # Outbound messages go through a bounded queue drained by a writer task
+    live_session = LiveSession(
+        websocket=websocket,
+        agent_session=agent_session,
+        live_events=live_events,
+        live_request_queue=live_request_queue,
+        outbound=OutboundQueue(websocket, binary_audio=subprotocol is not None),
+        log=session_log,
     )
 
-    # Wait until the websocket is disconnected or an error occurs
-    tasks = [agent_to_client_task, client_to_agent_task]
-    await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
-
-    # Close LiveRequestQueue
-    live_request_queue.close()
-
-    # Disconnected
-    print(f"Client #{user_id} disconnected")
\ No newline at end of file
+    # Run both directions and the writer until the client disconnects, an
+    # error occurs or the session goes idle; the manager then cancels what
+    # is left, closes the live stream and evicts the session
+    await live_session_manager.serve(live_session, [
+        agent_to_client_messaging(live_session, live_events),
+        client_to_agent_messaging(websocket, live_request_queue, live_session),
+        live_session.outbound.run(),
+    ])
\ No newline at end of file
@@ -1,16 +1,32 @@
 from google.adk.agents import Agent
 from google.adk.models import Gemini
 from google.adk.planners import PlanReActPlanner
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
+from financial_agent.multi_fetch import fetch_financial_data
 from google.adk.tools.agent_tool import AgentTool
+from proactive_insights_agent.pipeline import insight_pipeline
+
+
+async def get_precomputed_insights(user_id: str):
+    """
+    Gets the user's precomputed insights: savings and spending change versus the
+    previous month, debt and net worth change, and progress toward each goal.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+
+    Returns:
+        dict: Insights with their exact values and percentages, plus any data
+            sources that could not be loaded
+    """
+    return await insight_pipeline.get(user_id)
 
-financial_agent_tool = AgentTool(agent=financial_agent)
 
 proactive_insights_agent = Agent(
     name="proactive_insights_agent",
     model="gemini-2.5-flash",
     planner=PlanReActPlanner(),
-    tools=[financial_agent_tool],
+    tools=[get_precomputed_insights, fetch_financial_data, financial_agent_tool],
     description="Agent that generates proactive insights and statistics for users by analyzing their financial data, goals, and trends. This agent communicates with the external cymbal bank agent to fetch user data and generate meaningful insights.",
     instruction="""You are a Proactive Insights Agent specialized in analyzing financial data and generating meaningful insights for users.
 
@@ -19,9 +35,11 @@ Your primary responsibilities:
 2. Generate proactive insights that highlight positive trends, areas for improvement, and actionable recommendations
 3. Present insights in a clear, engaging format suitable for display in a scrolling insights bar
 
-IMPORTANT: You have access to all of the user's financial data through the financial_agent. You must use this tool to gather information before generating insights.
+IMPORTANT: Always call get_precomputed_insights first. Its values, percentages and goal progress are already computed from the user's data: use them exactly as given and only phrase them. Do not recompute them.
+
+Only use the financial_agent for data that get_precomputed_insights does not cover, or that it reports under "errors".
 
-To get user data, you can call the financial_agent with these tool names:
+To get user data, you can call the financial_agent with these tool names (to get several of them, call fetch_financial_data once with all of the requests rather than calling the financial_agent once per request):
 - get_financial_summary: Get overall financial summary
 - get_net_worth: Get user's net worth
 - get_cash_flow: Get user's cash flow information
@@ -84,5 +102,5 @@ CRITICAL: Always return insights in valid JSON format like this:
 }
 ```
 
-Focus on creating 5-8 meaningful insights that will motivate and inform the user about their financial progress. Always fetch real data from the financial_agent before generating insights."""
+Focus on creating 5-8 meaningful insights that will motivate and inform the user about their financial progress. Always base insights on real data: the precomputed insights first, the financial_agent only to fill gaps."""
 )
@@ -0,0 +1,361 @@
+"""
+Precomputed proactive insights.
+
+Running proactive_insights_agent on every page load means a ReAct planning
+loop plus several financial_agent round-trips just to work out numbers
+like "Savings Up 15%". InsightPipeline computes those numbers in the
+background instead and keeps the latest insights per user:
+
+- transactions are folded into per-month income/spend totals once each,
+  so a refresh only does work for transactions that arrived since the last one
+- debt and net worth are snapshotted once per day (a later refresh replaces
+  that day's value), so reductions over COMPARE_DAYS can be measured even
+  when the bank API only reports current balances; no change is reported
+  until the snapshots span MIN_BASELINE_DAYS
+- goal progress is read from the goals endpoint
+
+GET /api/insights/{user_id} serves the stored insights and triggers a
+background refresh when they are older than INSIGHTS_REFRESH_INTERVAL; the
+agent's get_precomputed_insights tool returns the same facts so the model
+only has to phrase them.
+"""
+
+import os
+import time
+import asyncio
+import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from bank_client import BankApiClient, bank_client, parse_amount, parse_transaction_date
+from transaction_store import TransactionStore, transaction_store
+
+REFRESH_INTERVAL_SECONDS = float(os.getenv("INSIGHTS_REFRESH_INTERVAL", "300"))
+MAX_USERS = int(os.getenv("INSIGHTS_MAX_USERS", "1000"))
+# Compare debt and net worth against the oldest snapshot within this many days
+COMPARE_DAYS = int(os.getenv("INSIGHTS_COMPARE_DAYS", "30"))
+# Report no debt or net worth change until the history spans this many days
+MIN_BASELINE_DAYS = int(os.getenv("INSIGHTS_MIN_BASELINE_DAYS", "7"))
+# One snapshot per day, enough to reach back COMPARE_DAYS
+MAX_SNAPSHOTS = COMPARE_DAYS + 2
+
+INCOME_CATEGORIES = ("income", "salary", "payroll", "deposit", "paycheck", "interest", "dividend")
+DEBT_ACCOUNT_TYPES = ("credit", "loan", "mortgage", "debt", "line of credit")
+
+
+def _pick(row: dict, *keys, default=None):
+    for key in keys:
+        if row.get(key) is not None:
+            return row[key]
+    return default
+
+
+def _percent_change(current: float, previous: float) -> float:
+    if not previous:
+        return None
+    return round((current - previous) / abs(previous) * 100, 1)
+
+
+@dataclass
+class UserInsights:
+    """Running aggregates and the latest insights for one user."""
+
+    user_id: str
+    months: dict = field(default_factory=dict)  # "YYYY-MM" -> [income, spend]
+    seen: set = field(default_factory=set)
+    debits_negative: bool = None
+    debt_snapshots: list = field(default_factory=list)  # (epoch seconds, total debt)
+    net_worth_snapshots: list = field(default_factory=list)  # (epoch seconds, net worth)
+    debt_accounts: list = field(default_factory=list)
+    goals: list = field(default_factory=list)
+    insights: list = field(default_factory=list)
+    errors: dict = field(default_factory=dict)
+    updated_at: float = None
+    refreshed_monotonic: float = None
+
+    def fold_transactions(self, transactions: list) -> int:
+        """
+        Add transactions not seen before to the monthly totals.
+
+        Returns:
+            int: Number of new transactions folded in
+        """
+        if self.debits_negative is None and transactions:
+            self.debits_negative = any(row.amount < 0 for row in transactions)
+        added = 0
+        for row in transactions:
+            key = row.transaction_id or (row.date, row.amount, row.description)
+            if key in self.seen:
+                continue
+            timestamp = parse_transaction_date(row.date)
+            if timestamp is None:
+                continue
+            self.seen.add(key)
+            added += 1
+            totals = self.months.setdefault(timestamp.strftime("%Y-%m"), [0.0, 0.0])
+            if self.debits_negative:
+                totals[0 if row.amount > 0 else 1] += abs(row.amount)
+            elif row.category.lower().startswith(INCOME_CATEGORIES):
+                totals[0] += row.amount
+            else:
+                totals[1] += row.amount
+        return added
+
+    def record_balances(self, accounts: list, net_worth: dict, now: float):
+        """Snapshot total debt (and net worth) from the accounts and net worth payloads."""
+        if accounts is not None:
+            self.debt_accounts = []
+            for account in accounts:
+                account_type = str(_pick(account, "account_type", "type", "name", default="")).lower()
+                balance = parse_amount(_pick(account, "balance", "current_balance", default=0))
+                if any(kind in account_type for kind in DEBT_ACCOUNT_TYPES) or balance < 0:
+                    original = _pick(account, "original_amount", "original_balance", "principal")
+                    self.debt_accounts.append({
+                        "name": _pick(account, "name", "account_name", "account_type", default="Debt"),
+                        "balance": abs(balance),
+                        "original": abs(parse_amount(original)) if original is not None else None,
+                    })
+        debt_total = None
+        if net_worth:
+            liabilities = _pick(net_worth, "total_liabilities", "liabilities")
+            if isinstance(liabilities, (int, float, str)):
+                debt_total = abs(parse_amount(liabilities))
+            worth = _pick(net_worth, "net_worth", "netWorth", "total")
+            if isinstance(worth, (int, float, str)):
+                self._snapshot(self.net_worth_snapshots, now, parse_amount(worth))
+        if debt_total is None and accounts is not None:
+            debt_total = sum(account["balance"] for account in self.debt_accounts)
+        if debt_total is not None:
+            self._snapshot(self.debt_snapshots, now, debt_total)
+
+    @staticmethod
+    def _snapshot(snapshots: list, now: float, value: float):
+        if snapshots and snapshots[-1][0] // 86400 == now // 86400:
+            snapshots[-1] = (now, value)
+            return
+        snapshots.append((now, value))
+        del snapshots[:-MAX_SNAPSHOTS]
+
+    @staticmethod
+    def _baseline(snapshots: list, now: float):
+        """Oldest snapshot within COMPARE_DAYS, if it is at least MIN_BASELINE_DAYS old."""
+        cutoff = now - COMPARE_DAYS * 86400
+        for taken_at, value in snapshots[:-1]:
+            if taken_at >= cutoff:
+                # A day or two of history would report noise as a trend
+                if now - taken_at < MIN_BASELINE_DAYS * 86400:
+                    return None
+                return value
+        return None
+
+    def compute(self, today: datetime.date, now: float) -> list:
+        """Build the insight list from the current aggregates."""
+        insights = []
+        this_month = today.strftime("%Y-%m")
+        complete = sorted(month for month in self.months if month < this_month)
+
+        if len(complete) >= 2:
+            (income, spend), (previous_income, previous_spend) = self.months[complete[-1]], self.months[complete[-2]]
+            savings, previous_savings = income - spend, previous_income - previous_spend
+            change = _percent_change(savings, previous_savings)
+            if change is not None:
+                insights.append({
+                    "id": "savings-change",
+                    "message": f"Savings {'Up' if change >= 0 else 'Down'} {abs(change):g}%",
+                    "type": "positive" if change >= 0 else "negative",
+                    "value": round(savings, 2),
+                    "changePercent": change,
+                    "icon": "💰",
+                    "period": complete[-1],
+                })
+            change = _percent_change(spend, previous_spend)
+            if change is not None:
+                insights.append({
+                    "id": "spending-change",
+                    "message": f"Spending {'Down' if change <= 0 else 'Up'} {abs(change):g}%",
+                    "type": "positive" if change <= 0 else "negative",
+                    "value": round(spend, 2),
+                    "changePercent": change,
+                    "icon": "🧾",
+                    "period": complete[-1],
+                })
+
+        if self.debt_snapshots:
+            debt = self.debt_snapshots[-1][1]
+            baseline = self._baseline(self.debt_snapshots, now)
+            if baseline is None:
+                # No history yet: use the accounts' original balances if the API reports them
+                originals = [account for account in self.debt_accounts if account["original"]]
+                if originals:
+                    baseline = sum(account["original"] for account in originals)
+                    debt = sum(account["balance"] for account in originals)
+            change = _percent_change(debt, baseline) if baseline else None
+            if change is not None and change != 0:
+                insights.append({
+                    "id": "debt-change",
+                    "message": f"Debt {'Down' if change < 0 else 'Up'} {abs(change):g}%",
+                    "type": "positive" if change < 0 else "negative",
+                    "value": round(debt, 2),
+                    "changePercent": change,
+                    "icon": "📉" if change < 0 else "📈",
+                })
+
+        if len(self.net_worth_snapshots) >= 2:
+            worth = self.net_worth_snapshots[-1][1]
+            change = _percent_change(worth, self._baseline(self.net_worth_snapshots, now))
+            if change:
+                insights.append({
+                    "id": "net-worth-change",
+                    "message": f"Net Worth {'Up' if change > 0 else 'Down'} {abs(change):g}%",
+                    "type": "positive" if change > 0 else "negative",
+                    "value": round(worth, 2),
+                    "changePercent": change,
+                    "icon": "🏦",
+                })
+
+        for index, goal in enumerate(self.goals):
+            target = parse_amount(_pick(goal, "target_amount", "target", "goal_amount", default=0))
+            current = parse_amount(_pick(goal, "current_amount", "saved_amount", "current", "amount_saved", default=0))
+            if target <= 0:
+                continue
+            progress = round(min(current / target, 1) * 100, 1)
+            name = _pick(goal, "name", "goal_name", "description", default="Goal")
+            insights.append({
+                "id": f"goal-{_pick(goal, 'goal_id', 'id', default=index)}",
+                "message": f"{name} goal reached" if progress >= 100 else f"{name} {progress:g}% funded",
+                "type": "positive" if progress >= 50 else "neutral",
+                "value": round(current, 2),
+                "target": round(target, 2),
+                "progressPercent": progress,
+                "icon": "🎯",
+            })
+        return insights
+
+    def snapshot(self, max_age: float) -> dict:
+        age = time.monotonic() - self.refreshed_monotonic if self.refreshed_monotonic else None
+        return {
+            "user_id": self.user_id,
+            "insights": self.insights,
+            "updated_at": self.updated_at,
+            "stale": age is None or age > max_age,
+            "errors": self.errors,
+        }
+
+
+class InsightPipeline:
+    """Refreshes and serves precomputed insights per user."""
+
+    def __init__(
+        self,
+        client: BankApiClient = bank_client,
+        store: TransactionStore = transaction_store,
+        refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+        max_users: int = MAX_USERS,
+    ):
+        self._client = client
+        self._store = store
+        self._refresh_interval = refresh_interval
+        self._max_users = max_users
+        self._users = OrderedDict()  # user_id -> UserInsights, least recently served first
+        self._refreshing = {}  # user_id -> asyncio.Task
+        self._loop_task = None
+        self.refreshes = 0
+        self.transactions_folded = 0
+
+    def start(self):
+        """Start refreshing known users in the background, if the bank API is configured."""
+        # Without a bank API every refresh would only record errors
+        if self._loop_task is None and self._client.configured:
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def shutdown(self):
+        tasks = list(self._refreshing.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get(self, user_id: str) -> dict:
+        """
+        Return the user's insights, computing them first if there are none yet.
+
+        Stale insights are returned immediately and refreshed in the background.
+        """
+        state = self._users.get(user_id)
+        if state is None or state.updated_at is None:
+            await self.refresh(user_id)
+            state = self._users[user_id]
+        else:
+            self._users.move_to_end(user_id)
+            if time.monotonic() - state.refreshed_monotonic > self._refresh_interval:
+                self._schedule_refresh(user_id)
+        return state.snapshot(self._refresh_interval)
+
+    def _schedule_refresh(self, user_id: str) -> asyncio.Task:
+        task = self._refreshing.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._refresh(user_id))
+            self._refreshing[user_id] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(user_id, None))
+        return task
+
+    async def refresh(self, user_id: str):
+        """Recompute the user's insights now (joining a refresh already in progress)."""
+        await asyncio.shield(self._schedule_refresh(user_id))
+
+    async def _refresh(self, user_id: str):
+        state = self._users.get(user_id)
+        if state is None:
+            state = self._users[user_id] = UserInsights(user_id)
+            while len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+
+        transactions, accounts, goals, net_worth = await asyncio.gather(
+            self._store.get(user_id),
+            self._client.fetch_accounts(user_id),
+            self._client.fetch_goals(user_id),
+            self._client.fetch_net_worth(user_id),
+            return_exceptions=True,
+        )
+        results = {"transactions": transactions, "accounts": accounts, "goals": goals, "net_worth": net_worth}
+        state.errors = {name: str(result) for name, result in results.items() if isinstance(result, Exception)}
+        if len(state.errors) == len(results):
+            print(f"⚠️ Insight refresh failed for user {user_id}: {state.errors}")
+
+        now = time.time()
+        if "transactions" not in state.errors:
+            self.transactions_folded += state.fold_transactions(transactions.transactions)
+        if "goals" not in state.errors:
+            state.goals = goals
+        state.record_balances(
+            None if "accounts" in state.errors else accounts,
+            None if "net_worth" in state.errors else net_worth,
+            now,
+        )
+        state.insights = state.compute(datetime.date.today(), now)
+        state.updated_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        state.refreshed_monotonic = time.monotonic()
+        self.refreshes += 1
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            for user_id in list(self._users):
+                try:
+                    await self.refresh(user_id)
+                except Exception as e:
+                    print(f"⚠️ Insight refresh failed for user {user_id}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "background_refresh": self._loop_task is not None,
+            "users": len(self._users),
+            "refreshing": len(self._refreshing),
+            "refreshes": self.refreshes,
+            "transactions_folded": self.transactions_folded,
+        }
+
+
+insight_pipeline = InsightPipeline()
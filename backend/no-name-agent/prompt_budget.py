@@ -0,0 +1,348 @@
+"""
+Prompt size budget and static-instruction caching for the agent tree.
+
+The instructions of root_agent, big_spendings_agent, daily_spendings_agent,
+proactive_insights_agent and investments_agent are multi-kilobyte static
+strings, sent with every model call together with the tool declarations,
+and nested AgentTool calls multiply them. This module:
+
+- measures the static prompt (instruction, global instruction, tool
+  declarations) of every LlmAgent in a tree, and flags agents above
+  PROMPT_BUDGET_TOKENS
+- records the usage the model reports per agent and per turn (one agent
+  invocation; an AgentTool call is its own invocation): prompt, cached and
+  output tokens, see PromptBudget.stats
+- with PROMPT_CONTEXT_CACHE=1, registers each agent's static prefix (system
+  instruction + tools) as a Gemini cached content and sends only the
+  dynamic contents with every call. ADK's own context caching (App
+  context_cache_config) does not reach AgentTool sub-agents, which run in a
+  fresh session per call; this cache is keyed by the static prefix, so every
+  call of the same agent shares it whatever session it runs in
+
+Caches live for PROMPT_CACHE_TTL seconds and are recreated when they expire.
+Prefixes below PROMPT_CACHE_MIN_TOKENS are not cached (Gemini rejects caches
+under the model's minimum), and a failed cache creation falls back to an
+uncached call.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from google import genai
+from google.genai import types
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.function_tool import FunctionTool
+
+PROMPT_BUDGET_TOKENS = int(os.getenv("PROMPT_BUDGET_TOKENS", "4000"))
+CONTEXT_CACHE_ENABLED = os.getenv("PROMPT_CONTEXT_CACHE", "0") == "1"
+CONTEXT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "2048"))
+# Recreate a cache this long before it expires, so no call races its expiry
+CONTEXT_CACHE_REFRESH_MARGIN = 60
+# Retry creating a cache that failed after this long
+CONTEXT_CACHE_RETRY_AFTER = 300
+# Rough size of a token for estimates; the benchmark can count exactly
+CHARS_PER_TOKEN = 4
+RECENT_TURNS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _tool_declaration(tool) -> Optional[types.FunctionDeclaration]:
+    if not isinstance(tool, BaseTool):
+        tool = FunctionTool(tool)
+    return tool._get_declaration()
+
+
+def walk_agents(agent) -> list:
+    """Every LlmAgent reachable from agent through sub_agents and AgentTools, once each."""
+    seen, order, pending = set(), [], [agent]
+    while pending:
+        current = pending.pop(0)
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, LlmAgent):
+            order.append(current)
+            pending.extend(tool.agent for tool in current.tools if isinstance(tool, AgentTool))
+        pending.extend(getattr(current, "sub_agents", None) or [])
+    return order
+
+
+@dataclass
+class StaticPromptSize:
+    """The part of an agent's prompt that is the same on every call."""
+
+    agent: str
+    model: str
+    instruction_chars: int
+    global_instruction_chars: int
+    tool_declaration_chars: int
+    tools: int
+
+    @property
+    def chars(self) -> int:
+        return self.instruction_chars + self.global_instruction_chars + self.tool_declaration_chars
+
+    @property
+    def estimated_tokens(self) -> int:
+        return (self.chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def to_dict(self) -> dict:
+        return {
+            "agent": self.agent,
+            "model": self.model,
+            "instruction_chars": self.instruction_chars,
+            "global_instruction_chars": self.global_instruction_chars,
+            "tool_declaration_chars": self.tool_declaration_chars,
+            "tools": self.tools,
+            "estimated_tokens": self.estimated_tokens,
+            "over_budget": self.estimated_tokens > PROMPT_BUDGET_TOKENS,
+        }
+
+
+def static_prompt_size(agent: LlmAgent) -> StaticPromptSize:
+    """
+    Measure an agent's static prompt.
+
+    Instructions given as callables are dynamic and count as zero.
+    """
+    declarations = [_tool_declaration(tool) for tool in agent.tools]
+    declarations = [declaration for declaration in declarations if declaration is not None]
+    return StaticPromptSize(
+        agent=agent.name,
+        model=agent.model if isinstance(agent.model, str) else getattr(agent.model, "model", ""),
+        instruction_chars=len(agent.instruction) if isinstance(agent.instruction, str) else 0,
+        global_instruction_chars=(
+            len(agent.global_instruction) if isinstance(agent.global_instruction, str) else 0
+        ),
+        tool_declaration_chars=sum(
+            len(declaration.model_dump_json(exclude_none=True)) for declaration in declarations
+        ),
+        tools=len(agent.tools),
+    )
+
+
+def measure_agent_tree(agent) -> list:
+    """static_prompt_size of every LlmAgent in the tree, largest first."""
+    sizes = [static_prompt_size(current) for current in walk_agents(agent)]
+    return sorted(sizes, key=lambda size: size.chars, reverse=True)
+
+
+def _static_prefix(llm_request: LlmRequest) -> str:
+    """The system instruction, tools and tool config of a request, serialized."""
+    config = llm_request.config
+    if config is None or not (config.system_instruction or config.tools):
+        return ""
+    instruction = config.system_instruction
+    if isinstance(instruction, types.Content):
+        instruction = instruction.model_dump_json(exclude_none=True)
+    return json.dumps(
+        {
+            "system_instruction": instruction if isinstance(instruction, str) else str(instruction),
+            "tools": [
+                tool.model_dump(mode="json", exclude_none=True) if hasattr(tool, "model_dump") else str(tool)
+                for tool in config.tools or []
+            ],
+            "tool_config": config.tool_config.model_dump(mode="json", exclude_none=True) if config.tool_config else None,
+        },
+        sort_keys=True,
+    )
+
+
+@dataclass
+class _CachedPrefix:
+    name: str
+    expires_at: float
+
+
+class StaticInstructionCache:
+    """Gemini cached contents for static prompt prefixes, shared by every call of an agent."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = CONTEXT_CACHE_TTL,
+        min_tokens: int = CONTEXT_CACHE_MIN_TOKENS,
+        client: genai.Client = None,
+    ):
+        self._ttl = ttl_seconds
+        self._min_tokens = min_tokens
+        self._client = client
+        self._caches = {}
+        self._failed = {}
+        self._locks = defaultdict(asyncio.Lock)
+        self.counters = Counter()
+
+    def _get_client(self) -> genai.Client:
+        if self._client is None:
+            self._client = genai.Client()
+        return self._client
+
+    async def _get_or_create(self, key: tuple, llm_request: LlmRequest) -> Optional[str]:
+        now = time.time()
+        cached = self._caches.get(key)
+        if cached is not None and cached.expires_at - CONTEXT_CACHE_REFRESH_MARGIN > now:
+            return cached.name
+        if now < self._failed.get(key, 0):
+            return None
+
+        async with self._locks[key]:
+            cached = self._caches.get(key)
+            if cached is not None and cached.expires_at - CONTEXT_CACHE_REFRESH_MARGIN > time.time():
+                return cached.name
+            config = llm_request.config
+            try:
+                created = await self._get_client().aio.caches.create(
+                    model=llm_request.model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=config.system_instruction,
+                        tools=config.tools,
+                        tool_config=config.tool_config,
+                        ttl=f"{self._ttl}s",
+                        display_name=f"static-{key[1][:12]}",
+                    ),
+                )
+            except Exception as e:
+                self._failed[key] = time.time() + CONTEXT_CACHE_RETRY_AFTER
+                self.counters["create_failed"] += 1
+                print(f"⚠️ Context cache creation failed for {llm_request.model}: {e}")
+                return None
+            self._caches[key] = _CachedPrefix(name=created.name, expires_at=time.time() + self._ttl)
+            self.counters["created"] += 1
+            return created.name
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        config = llm_request.config
+        if config is None or config.cached_content or not llm_request.model:
+            return None
+        prefix = _static_prefix(llm_request)
+        if estimate_tokens(prefix) < self._min_tokens:
+            self.counters["too_small"] += 1
+            return None
+        key = (llm_request.model, hashlib.sha256(prefix.encode()).hexdigest())
+        name = await self._get_or_create(key, llm_request)
+        if name is None:
+            self.counters["uncached_calls"] += 1
+            return None
+        config.cached_content = name
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        self.counters["cached_calls"] += 1
+        return None
+
+    async def aclose(self):
+        """Delete the caches this process created."""
+        for cached in list(self._caches.values()):
+            try:
+                await self._get_client().aio.caches.delete(name=cached.name)
+            except Exception:
+                pass
+        self._caches.clear()
+
+    def stats(self) -> dict:
+        return {"caches": len(self._caches), **self.counters}
+
+
+class PromptBudget:
+    """Per-agent and per-turn token usage, as reported by the model."""
+
+    def __init__(self, recent_turns: int = RECENT_TURNS):
+        self.agents = defaultdict(Counter)
+        self.turns = OrderedDict()
+        self._recent_turns = recent_turns
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if usage is None or llm_response.partial:
+            return None
+        record = {
+            "model_calls": 1,
+            "prompt_tokens": usage.prompt_token_count or 0,
+            "cached_tokens": usage.cached_content_token_count or 0,
+            "output_tokens": usage.candidates_token_count or 0,
+        }
+        self.agents[callback_context.agent_name].update(record)
+
+        turn = self.turns.setdefault(callback_context.invocation_id, Counter())
+        turn.update(record)
+        turn[callback_context.agent_name] += record["prompt_tokens"]
+        self.turns.move_to_end(callback_context.invocation_id)
+        while len(self.turns) > self._recent_turns:
+            self.turns.popitem(last=False)
+        return None
+
+    def stats(self) -> dict:
+        turns = list(self.turns.values())
+        return {
+            "agents": {
+                name: {
+                    **usage,
+                    "prompt_tokens_per_call": usage["prompt_tokens"] // max(usage["model_calls"], 1),
+                }
+                for name, usage in self.agents.items()
+            },
+            "recent_turns": len(turns),
+            "prompt_tokens_per_turn": (
+                sum(turn["prompt_tokens"] for turn in turns) // len(turns) if turns else 0
+            ),
+            "cached_tokens_per_turn": (
+                sum(turn["cached_tokens"] for turn in turns) // len(turns) if turns else 0
+            ),
+            "static_instruction_cache": static_instruction_cache.stats(),
+        }
+
+
+prompt_budget = PromptBudget()
+static_instruction_cache = StaticInstructionCache()
+_instrumented = set()
+
+
+def _with_callback(existing, callback) -> list:
+    if existing is None:
+        return [callback]
+    existing = list(existing) if isinstance(existing, list) else [existing]
+    return existing + [callback]
+
+
+def instrument_agent_tree(agent, enable_cache: bool = CONTEXT_CACHE_ENABLED):
+    """
+    Attach usage recording (and, if enabled, the static-instruction cache) to
+    every LlmAgent in the tree. Agents already instrumented are skipped, and
+    agents whose static prompt exceeds PROMPT_BUDGET_TOKENS are reported.
+    """
+    for current in walk_agents(agent):
+        if id(current) in _instrumented:
+            continue
+        _instrumented.add(id(current))
+        current.after_model_callback = _with_callback(
+            current.after_model_callback, prompt_budget.after_model_callback
+        )
+        if enable_cache:
+            # Runs after any existing callbacks, so a pre-routed call never reaches it
+            current.before_model_callback = _with_callback(
+                current.before_model_callback, static_instruction_cache.before_model_callback
+            )
+        size = static_prompt_size(current)
+        if size.estimated_tokens > PROMPT_BUDGET_TOKENS:
+            print(
+                f"⚠️ {current.name} static prompt is ~{size.estimated_tokens} tokens "
+                f"(budget {PROMPT_BUDGET_TOKENS})"
+            )
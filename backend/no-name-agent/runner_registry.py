@@ -0,0 +1,94 @@
+"""
+Shared ADK runners for the streaming backend.
+
+Building an InMemoryRunner (and its session, artifact and memory services)
+for every WebSocket connection is wasted work: runners are stateless apart
+from their services, and sessions are already partitioned by user. The
+registry builds one runner per agent at startup and hands out per-user
+sessions on top of it.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+
+from google.adk.runners import InMemoryRunner
+from google.adk.sessions import Session
+
+DEFAULT_AGENT_ID = "root_agent"
+
+
+@dataclass
+class AgentSession:
+    """A user's session on one of the shared runners."""
+
+    agent_id: str
+    runner: InMemoryRunner
+    session: Session
+
+
+class RunnerRegistry:
+    """One InMemoryRunner per agent_id, shared across connections."""
+
+    def __init__(self, app_name: str, agents: dict, default_agent_id: str = DEFAULT_AGENT_ID):
+        self._app_name = app_name
+        self._agents = agents
+        self._default_agent_id = default_agent_id
+        self._runners = {}
+        self._active_sessions = Counter()
+
+    def start(self):
+        """Build a runner for every registered agent."""
+        for agent_id in self._agents:
+            self.get_runner(agent_id)
+
+    def resolve_agent_id(self, agent_id: str = None) -> str:
+        """Map an unknown or missing agent_id onto the default agent."""
+        return agent_id if agent_id in self._agents else self._default_agent_id
+
+    def get_runner(self, agent_id: str = None) -> InMemoryRunner:
+        agent_id = self.resolve_agent_id(agent_id)
+        runner = self._runners.get(agent_id)
+        if runner is None:
+            runner = InMemoryRunner(app_name=self._app_name, agent=self._agents[agent_id])
+            self._runners[agent_id] = runner
+        return runner
+
+    async def create_session(self, user_id: str, agent_id: str = None) -> AgentSession:
+        """
+        Create a new session for a user on the shared runner for agent_id.
+
+        Args:
+            user_id (str): The user the session belongs to
+            agent_id (str): The agent to talk to (defaults to the root agent)
+
+        Returns:
+            AgentSession: The runner and the user's new session
+        """
+        agent_id = self.resolve_agent_id(agent_id)
+        runner = self.get_runner(agent_id)
+        session = await runner.session_service.create_session(
+            app_name=self._app_name,
+            user_id=user_id,
+        )
+        self._active_sessions[agent_id] += 1
+        return AgentSession(agent_id=agent_id, runner=runner, session=session)
+
+    async def end_session(self, agent_session: AgentSession):
+        """Delete a session from its runner's session service."""
+        await agent_session.runner.session_service.delete_session(
+            app_name=self._app_name,
+            user_id=agent_session.session.user_id,
+            session_id=agent_session.session.id,
+        )
+        self._active_sessions[agent_session.agent_id] -= 1
+
+    def active_session_counts(self) -> dict:
+        """Return the number of open sessions per agent_id."""
+        return {agent_id: self._active_sessions[agent_id] for agent_id in self._agents}
+
+    def stats(self) -> dict:
+        return {
+            "runners": len(self._runners),
+            "active_sessions": sum(self._active_sessions.values()),
+            "sessions_by_agent": self.active_session_counts(),
+        }
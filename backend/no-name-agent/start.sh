@@ -64,6 +64,11 @@ if [ ! -f "$HOME/.credentials/calendar_token.json" ]; then
 fi
 
 echo "✅ Google Calendar authentication complete!"
+
+# The direct bank data path needs the bank REST API's base URL (see README)
+if [ -z "$BANK_API_BASE_URL" ] && ! grep -qs "^BANK_API_BASE_URL=." .env; then
+    echo "⚠️  BANK_API_BASE_URL is not set (environment or .env): bank data tools will fall back to the financial_agent"
+fi
 echo "🚀 Starting backend server..."
 
 # Start the backend server
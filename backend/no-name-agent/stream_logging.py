@@ -0,0 +1,133 @@
+"""
+Structured, queue-backed logging for the streaming hot path.
+
+print() on every audio chunk and partial text blocks the event loop on
+stdout. Records here are put on an in-memory queue and written by a
+background listener thread, as one JSON object per line.
+
+- Per-category levels: STREAM_LOG_LEVELS="audio=WARNING,text=DEBUG"
+  (categories: session, text, audio, control, executor)
+- Audio records are sampled: only one in STREAM_AUDIO_LOG_SAMPLE_RATE is
+  written, but every event is still counted
+- SessionLog keeps per-session counters that are logged on disconnect
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from collections import Counter
+
+LOGGER_PREFIX = "stream"
+CATEGORIES = ("session", "text", "audio", "control", "executor")
+DEFAULT_LEVEL = os.getenv("STREAM_LOG_LEVEL", "INFO").upper()
+AUDIO_SAMPLE_RATE = max(1, int(os.getenv("STREAM_AUDIO_LOG_SAMPLE_RATE", "100")))
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "category": record.name.split(".", 1)[-1],
+            "event": record.getMessage(),
+        }
+        session_id = getattr(record, "session_id", None)
+        if session_id is not None:
+            entry["session_id"] = session_id
+        entry.update(getattr(record, "fields", {}))
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through one record in every `rate`; warnings and errors always pass."""
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self._rate = rate
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        self._seen += 1
+        return self._seen % self._rate == 1 or self._rate == 1
+
+
+def _parse_levels(spec: str) -> dict:
+    levels = {}
+    for item in spec.split(","):
+        category, _, level = item.partition("=")
+        if category.strip() and level.strip():
+            levels[category.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_stream_logging():
+    """Attach the queue handler to the stream loggers and start the writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+    atexit.register(stop_stream_logging)
+
+    root = logging.getLogger(LOGGER_PREFIX)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(DEFAULT_LEVEL)
+    root.propagate = False
+
+    levels = _parse_levels(os.getenv("STREAM_LOG_LEVELS", ""))
+    for category in CATEGORIES:
+        get_stream_logger(category).setLevel(levels.get(category, DEFAULT_LEVEL))
+    get_stream_logger("audio").addFilter(SamplingFilter(AUDIO_SAMPLE_RATE))
+
+
+def stop_stream_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_stream_logger(category: str) -> logging.Logger:
+    return logging.getLogger(f"{LOGGER_PREFIX}.{category}")
+
+
+class SessionLog:
+    """Per-session counters plus structured logging tagged with the session ID."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.counters = Counter()
+
+    def event(self, category: str, event: str, level: int = logging.INFO, **fields):
+        """
+        Count an event and log it if its category is enabled at this level.
+
+        Args:
+            category (str): One of CATEGORIES
+            event (str): Short event name (e.g. "audio_out")
+            level (int): Logging level for the record
+            **fields: Extra structured fields; a "bytes" field is also summed
+        """
+        self.counters[f"{category}.{event}"] += 1
+        if "bytes" in fields:
+            self.counters[f"{category}.{event}.bytes"] += fields["bytes"]
+        logger = get_stream_logger(category)
+        if logger.isEnabledFor(level):
+            logger.log(level, event, extra={"session_id": self.session_id, "fields": fields})
+
+    def summary(self) -> dict:
+        return dict(self.counters)
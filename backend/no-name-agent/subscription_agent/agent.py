@@ -1,9 +1,26 @@
 from google.adk.agents import Agent
 
-def identify_unused_subscriptions(user_id: str):
-    """Identifies subscriptions that the user may not be using."""
+from bank_client import BankApiError
+from transaction_store import transaction_store
+
+async def identify_unused_subscriptions(user_id: str):
+    """
+    Identifies the user's subscriptions so ones they may not be using can be reviewed.
+
+    Recurring charges are detected from the user's transaction history. Each
+    subscription has its billing period, amount, monthly cost, last charge and
+    estimated next charge; lapsed ones have stopped charging. Usage itself is
+    not known, so confirm with the user which active subscriptions they still use.
+
+    Args:
+        user_id (str): The bank user ID (e.g. "user-001")
+    """
     print(f"Identifying unused subscriptions for user {user_id}")
-    return {"status": "success", "unused_subscriptions": ["Subscription A", "Subscription B"]}
+    try:
+        transactions = await transaction_store.get(user_id)
+    except BankApiError as e:
+        return {"status": "error", "message": str(e)}
+    return transactions.subscriptions()
 
 def cancel_subscription(merchant: str, user_id: str):
     """Cancels a subscription for the user."""
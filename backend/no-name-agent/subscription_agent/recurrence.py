@@ -0,0 +1,221 @@
+"""
+Recurring-charge (subscription) detection.
+
+Charges are grouped by normalized merchant and the gaps between consecutive
+charges in each group are examined with numpy, all groups at once:
+
+1. sort charges by (merchant, day) with one lexsort
+2. take the per-group median gap and match it to a known period
+   (weekly, biweekly, monthly, quarterly, annual)
+3. keep groups whose gaps mostly fit that period and whose amounts are
+   steady, then estimate the next charge date and the monthly cost
+
+Nothing loops over individual transactions in Python after the arrays are
+built, so years of history per user take milliseconds.
+"""
+
+import datetime
+
+import numpy as np
+
+from bank_client import Transaction, debits_are_negative, normalize_merchant, parse_transaction_date
+
+SECONDS_PER_DAY = 86400.0
+DAYS_PER_MONTH = 365.25 / 12
+
+# name, length in days, allowed deviation of a single gap, minimum number of charges
+PERIODS = [
+    ("weekly", 7.0, 1.5, 4),
+    ("biweekly", 14.0, 2.0, 3),
+    ("monthly", DAYS_PER_MONTH, 4.0, 3),
+    ("quarterly", 365.25 / 4, 10.0, 2),
+    ("annual", 365.25, 20.0, 2),
+]
+
+# Share of a merchant's gaps that must fit the period
+MIN_REGULAR_SHARE = 0.75
+# Maximum coefficient of variation of the charged amounts
+MAX_AMOUNT_VARIATION = 0.25
+# A subscription is lapsed when no charge came within this many periods of the last one
+LAPSED_AFTER_PERIODS = 1.5
+
+
+def detect_recurring(merchant_codes, days, amounts, as_of_day: float) -> list:
+    """
+    Detect recurring charges in columnar transaction data.
+
+    Args:
+        merchant_codes: Integer merchant code per charge
+        days: Charge time per charge, in days since the epoch
+        amounts: Positive charge amount per charge
+        as_of_day (float): "Now", in days since the epoch
+
+    Returns:
+        list: One dict per recurring merchant code with its period, charge
+            count, typical amount, last/next charge day, monthly cost and
+            whether it is still active
+    """
+    merchant_codes = np.asarray(merchant_codes, dtype=np.int64)
+    days = np.asarray(days, dtype=np.float64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    if len(days) < 2:
+        return []
+
+    order = np.lexsort((days, merchant_codes))
+    codes, days, amounts = merchant_codes[order], days[order], amounts[order]
+    group_count = int(codes.max()) + 1
+
+    charges = np.bincount(codes, minlength=group_count)
+    last_index = np.cumsum(charges) - 1
+
+    # Gaps between consecutive charges of the same merchant
+    same = codes[1:] == codes[:-1]
+    gap_codes = codes[1:][same]
+    gaps = np.diff(days)[same]
+    gap_counts = np.bincount(gap_codes, minlength=group_count)
+
+    # Per-merchant median gap: sort gaps within each group, index the middle
+    gap_order = np.lexsort((gaps, gap_codes))
+    sorted_gaps = gaps[gap_order]
+    gap_starts = np.concatenate(([0], np.cumsum(gap_counts)[:-1]))
+    has_gaps = gap_counts > 0
+    lower = gap_starts + np.maximum(gap_counts - 1, 0) // 2
+    upper = gap_starts + np.maximum(gap_counts, 1) // 2
+    median_gap = np.zeros(group_count)
+    median_gap[has_gaps] = (
+        sorted_gaps[np.minimum(lower[has_gaps], len(gaps) - 1)]
+        + sorted_gaps[np.minimum(upper[has_gaps], len(gaps) - 1)]
+    ) / 2
+
+    # Match each median gap to the closest known period within its tolerance
+    lengths = np.array([period[1] for period in PERIODS])
+    tolerances = np.array([period[2] for period in PERIODS])
+    min_charges = np.array([period[3] for period in PERIODS])
+    distance = np.abs(median_gap[:, None] - lengths[None, :])
+    period_index = np.argmin(np.where(distance <= tolerances, distance, np.inf), axis=1)
+    matched = has_gaps & (distance[np.arange(group_count), period_index] <= tolerances[period_index])
+
+    # Most gaps must fit the period (allowing the odd skipped or doubled month)
+    fits = np.abs(gaps - lengths[period_index[gap_codes]]) <= tolerances[period_index[gap_codes]]
+    regular_share = np.bincount(gap_codes, weights=fits, minlength=group_count) / np.maximum(gap_counts, 1)
+
+    # Amounts should be steady
+    mean_amount = np.bincount(codes, weights=amounts, minlength=group_count) / np.maximum(charges, 1)
+    variance = (
+        np.bincount(codes, weights=(amounts - mean_amount[codes]) ** 2, minlength=group_count)
+        / np.maximum(charges, 1)
+    )
+    variation = np.sqrt(variance) / np.maximum(mean_amount, 1e-9)
+
+    recurring = (
+        matched
+        & (charges >= min_charges[period_index])
+        & (regular_share >= MIN_REGULAR_SHARE)
+        & (variation <= MAX_AMOUNT_VARIATION)
+    )
+
+    last_day = days[last_index]
+    last_amount = amounts[last_index]
+    next_day = last_day + median_gap
+    monthly_cost = last_amount * DAYS_PER_MONTH / np.maximum(median_gap, 1e-9)
+    active = as_of_day - last_day <= LAPSED_AFTER_PERIODS * median_gap
+
+    return [
+        {
+            "merchant_code": int(code),
+            "period": PERIODS[period_index[code]][0],
+            "interval_days": round(float(median_gap[code]), 1),
+            "charges": int(charges[code]),
+            "amount": round(float(last_amount[code]), 2),
+            "average_amount": round(float(mean_amount[code]), 2),
+            "last_charge_day": float(last_day[code]),
+            "next_charge_day": float(next_day[code]),
+            "monthly_cost": round(float(monthly_cost[code]), 2),
+            "active": bool(active[code]),
+        }
+        for code in np.flatnonzero(recurring)
+    ]
+
+
+def _to_date(day: float) -> str:
+    return datetime.datetime.fromtimestamp(day * SECONDS_PER_DAY, datetime.timezone.utc).date().isoformat()
+
+
+def detect_subscriptions(transactions, as_of: datetime.datetime = None) -> dict:
+    """
+    Find subscriptions and other recurring charges in a transaction history.
+
+    Args:
+        transactions: Transaction objects or bank API rows
+        as_of (datetime): Date to judge active/lapsed against (defaults to now)
+
+    Returns:
+        dict: Active and lapsed recurring charges, most expensive first, and
+            the total monthly cost of the active ones
+    """
+    rows = [row if isinstance(row, Transaction) else Transaction.from_api(row) for row in transactions]
+    # Keep only charges, whichever sign the bank records them with
+    if debits_are_negative(row.amount for row in rows):
+        rows = [row for row in rows if row.amount < 0]
+    else:
+        rows = [row for row in rows if row.amount > 0]
+
+    names = []
+    codes = {}
+    merchant_codes, days, amounts = [], [], []
+    for row in rows:
+        timestamp = parse_transaction_date(row.date)
+        # Billing descriptors carry changing reference numbers; group them per merchant
+        key = normalize_merchant(row.description, merge_locations=True)
+        if timestamp is None or not key:
+            continue
+        if key not in codes:
+            codes[key] = len(names)
+            names.append(row.description)
+        merchant_codes.append(codes[key])
+        days.append(timestamp.timestamp() / SECONDS_PER_DAY)
+        amounts.append(abs(row.amount))
+
+    return summarize_subscriptions(merchant_codes, days, amounts, names, as_of)
+
+
+def summarize_subscriptions(merchant_codes, days, amounts, merchant_names: list, as_of: datetime.datetime = None) -> dict:
+    """
+    Run detect_recurring on columnar data and format the result for the model.
+
+    Args:
+        merchant_codes: Integer merchant code per charge
+        days: Charge time per charge, in days since the epoch
+        amounts: Positive charge amount per charge
+        merchant_names (list): Display name for each merchant code
+        as_of (datetime): Date to judge active/lapsed against (defaults to now)
+
+    Returns:
+        dict: Same shape as detect_subscriptions
+    """
+    as_of = as_of or datetime.datetime.now(datetime.timezone.utc)
+    found = detect_recurring(merchant_codes, days, amounts, as_of.timestamp() / SECONDS_PER_DAY)
+
+    subscriptions = []
+    for item in found:
+        subscriptions.append({
+            "merchant": merchant_names[item["merchant_code"]],
+            "period": item["period"],
+            "interval_days": item["interval_days"],
+            "charges": item["charges"],
+            "amount": item["amount"],
+            "average_amount": item["average_amount"],
+            "monthly_cost": item["monthly_cost"],
+            "last_charge_date": _to_date(item["last_charge_day"]),
+            "next_charge_estimate": _to_date(item["next_charge_day"]) if item["active"] else None,
+            "active": item["active"],
+        })
+    subscriptions.sort(key=lambda item: item["monthly_cost"], reverse=True)
+    active = [item for item in subscriptions if item["active"]]
+    return {
+        "status": "success",
+        "transactions_checked": len(days),
+        "subscriptions": active,
+        "lapsed_subscriptions": [item for item in subscriptions if not item["active"]],
+        "total_monthly_cost": round(sum(item["monthly_cost"] for item in active), 2),
+    }
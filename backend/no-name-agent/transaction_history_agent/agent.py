@@ -1,9 +1,8 @@
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
-from financial_agent.agent import financial_agent
+from financial_agent.agent import financial_agent, financial_agent_tool
 from google.adk.agents.llm_agent import LlmAgent
 
-financial_agent_tool = AgentTool(agent=financial_agent)
 
 agent = LlmAgent(
     name="TransactionHistoryAgent",
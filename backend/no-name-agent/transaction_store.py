@@ -0,0 +1,297 @@
+"""
+Shared per-user columnar transaction store.
+
+The credit card, cash flow, discount and subscription tools all need a
+user's transactions sliced by category, merchant and date. Instead of each
+one re-fetching JSON through financial_agent, the store loads a user's
+history from the bank API once and keeps it as columns:
+
+- timestamps: int64 epoch seconds, sorted, so date ranges are two binary searches
+- amounts: int64 cents (fixed point), plus a derived spend column
+- categories and merchants: dictionary-encoded int32 codes
+
+Aggregations (group by category, rolling-window sums, top merchants) are
+numpy reductions over those columns. Loaded users live in the shared
+financial_cache, so they expire with FINANCIAL_CACHE_TTL and are dropped
+when a write request goes through financial_agent for that user.
+"""
+
+import datetime
+
+import numpy as np
+
+from bank_client import (
+    BankApiClient,
+    Transaction,
+    bank_client,
+    debits_are_negative,
+    format_amount,
+    normalize_merchant,
+    parse_transaction_date,
+)
+from financial_agent.cache import FinancialResultCache, financial_cache
+from subscription_agent.recurrence import summarize_subscriptions
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime.date(1970, 1, 1)
+STORE_CACHE_TOOL = "transaction_store"
+UNCATEGORIZED = "Uncategorized"
+
+
+def parse_date_bound(value: str, end: bool = False) -> int:
+    """
+    Convert a "YYYY-MM-DD" range bound into epoch seconds.
+
+    Args:
+        value (str): Date string; empty means unbounded
+        end (bool): Treat the date as inclusive end (i.e. the following midnight)
+
+    Returns:
+        int: Epoch seconds, or None if unbounded
+    """
+    if not value:
+        return None
+    parsed = parse_transaction_date(value)
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value}. Use YYYY-MM-DD format.")
+    seconds = int(parsed.timestamp())
+    if end and len(value.strip()) <= 10:
+        seconds += SECONDS_PER_DAY
+    return seconds
+
+
+def _dollars(cents) -> float:
+    return round(float(cents) / 100, 2)
+
+
+class UserTransactions:
+    """One user's transactions as sorted, dictionary-encoded columns."""
+
+    def __init__(self, transactions: list):
+        rows = []
+        for row in transactions:
+            if isinstance(row, dict):
+                row = Transaction.from_api(row)
+            timestamp = parse_transaction_date(row.date)
+            if timestamp is not None:
+                rows.append((int(timestamp.timestamp()), row))
+        rows.sort(key=lambda item: item[0])
+
+        self.categories = []
+        self.merchants = []
+        category_codes, merchant_codes = {}, {}
+        categories, merchants = [], []
+        for _, row in rows:
+            category = row.category or UNCATEGORIZED
+            if category.lower() not in category_codes:
+                category_codes[category.lower()] = len(self.categories)
+                self.categories.append(category)
+            categories.append(category_codes[category.lower()])
+
+            merchant = normalize_merchant(row.description)
+            if merchant not in merchant_codes:
+                merchant_codes[merchant] = len(self.merchants)
+                self.merchants.append(row.description)
+            merchants.append(merchant_codes[merchant])
+
+        self._category_codes = category_codes
+        self._merchant_codes = merchant_codes
+        self.transactions = [row for _, row in rows]
+        self.timestamps = np.array([timestamp for timestamp, _ in rows], dtype=np.int64)
+        self.amounts = np.array([round(row.amount * 100) for _, row in rows], dtype=np.int64)
+        self.category_codes = np.array(categories, dtype=np.int32)
+        self.merchant_codes = np.array(merchants, dtype=np.int32)
+        # Banks that record debits as negative amounts; otherwise every row is spend
+        self.debits_negative = debits_are_negative(row.amount for _, row in rows)
+        if self.debits_negative:
+            self.spend = np.where(self.amounts < 0, -self.amounts, 0)
+            self.income = np.where(self.amounts > 0, self.amounts, 0)
+        else:
+            self.spend = self.amounts.copy()
+            self.income = np.zeros_like(self.amounts)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _select(self, start_date: str = "", end_date: str = "", category: str = "", merchant: str = ""):
+        """Return (slice, mask) for rows in the date range matching the filters."""
+        return self._select_between(
+            parse_date_bound(start_date), parse_date_bound(end_date, end=True), category, merchant
+        )
+
+    def _select_between(self, start: int, end: int, category: str = "", merchant: str = ""):
+        low = 0 if start is None else int(np.searchsorted(self.timestamps, start, side="left"))
+        high = len(self) if end is None else int(np.searchsorted(self.timestamps, end, side="left"))
+        window = slice(low, max(low, high))
+
+        mask = np.ones(window.stop - window.start, dtype=bool)
+        if category:
+            code = self._category_codes.get(category.lower(), -1)
+            mask &= self.category_codes[window] == code
+        if merchant:
+            code = self._merchant_codes.get(normalize_merchant(merchant), -1)
+            mask &= self.merchant_codes[window] == code
+        return window, mask
+
+    def spending_by_category(self, start_date: str = "", end_date: str = "") -> list:
+        """
+        Total spend per category in a date range, largest first.
+
+        Returns:
+            list: {"category", "total", "count"} dicts
+        """
+        window, _ = self._select(start_date, end_date)
+        codes = self.category_codes[window]
+        spend = self.spend[window]
+        totals = np.bincount(codes, weights=spend, minlength=len(self.categories))
+        counts = np.bincount(codes[spend > 0], minlength=len(self.categories))
+        return [
+            {"category": self.categories[code], "total": _dollars(totals[code]), "count": int(counts[code])}
+            for code in np.argsort(-totals, kind="stable")
+            if counts[code]
+        ]
+
+    def total_spent(self, start_date: str = "", end_date: str = "", category: str = "", merchant: str = "") -> dict:
+        """Total spend and number of charges matching the filters."""
+        window, mask = self._select(start_date, end_date, category, merchant)
+        spend = self.spend[window][mask]
+        return {"total": _dollars(spend.sum()), "count": int((spend > 0).sum())}
+
+    def rolling_spend(
+        self, window_days: int, start_date: str = "", end_date: str = "", category: str = ""
+    ) -> list:
+        """
+        Spend over a trailing window of window_days, for every day in the range.
+
+        Returns:
+            list: {"date", "total"} dicts, one per day
+        """
+        window_days = max(int(window_days), 1)
+        start = parse_date_bound(start_date)
+        end = parse_date_bound(end_date, end=True)
+        # Include the window_days before the range so its first days have full windows
+        lookback = None if start is None else start - window_days * SECONDS_PER_DAY
+        window, mask = self._select_between(lookback, end, category)
+        timestamps = self.timestamps[window][mask]
+        if not len(timestamps):
+            return []
+        days = timestamps // SECONDS_PER_DAY
+        first_day = int(days[0])
+        daily = np.bincount(days - first_day, weights=self.spend[window][mask])
+        # Rolling sum via prefix sums: total(d) = prefix[d] - prefix[d - window_days]
+        prefix = np.concatenate(([0], np.cumsum(daily)))
+        index = np.arange(1, len(prefix))
+        rolling = prefix[index] - prefix[np.maximum(index - window_days, 0)]
+        skip = 0 if start is None else max(start // SECONDS_PER_DAY - first_day, 0)
+        return [
+            {
+                "date": (EPOCH + datetime.timedelta(days=first_day + offset)).isoformat(),
+                "total": _dollars(total),
+            }
+            for offset, total in enumerate(rolling)
+            if offset >= skip
+        ]
+
+    def top_merchants(self, limit: int = 5, start_date: str = "", end_date: str = "", category: str = "") -> list:
+        """
+        Merchants with the highest spend in a date range.
+
+        Returns:
+            list: {"merchant", "total", "count"} dicts, largest first
+        """
+        window, mask = self._select(start_date, end_date, category)
+        codes = self.merchant_codes[window][mask]
+        spend = self.spend[window][mask]
+        totals = np.bincount(codes, weights=spend, minlength=len(self.merchants))
+        counts = np.bincount(codes[spend > 0], minlength=len(self.merchants))
+        top = np.argsort(-totals, kind="stable")[: max(limit, 0)]
+        return [
+            {"merchant": self.merchants[code], "total": _dollars(totals[code]), "count": int(counts[code])}
+            for code in top
+            if counts[code]
+        ]
+
+    def rows(
+        self, start_date: str = "", end_date: str = "", category: str = "", merchant: str = "", limit: int = 0
+    ) -> list:
+        """Matching transactions in the frontend row format, newest first."""
+        window, mask = self._select(start_date, end_date, category, merchant)
+        indices = np.flatnonzero(mask)[::-1] + window.start
+        if limit:
+            indices = indices[:limit]
+        return [self.transactions[index].to_row() for index in indices]
+
+    def subscriptions(self, as_of: datetime.datetime = None) -> dict:
+        """Recurring charges, as returned by subscription_agent.recurrence.detect_subscriptions."""
+        charged = self.spend > 0
+        return summarize_subscriptions(
+            self.merchant_codes[charged],
+            self.timestamps[charged] / SECONDS_PER_DAY,
+            self.spend[charged] / 100,
+            self.merchants,
+            as_of,
+        )
+
+    def monthly_cash_flow(self, months: int = 3, today: datetime.date = None) -> dict:
+        """
+        Average monthly income and spend over the last complete months.
+
+        Income is only known when the bank records debits as negative amounts;
+        otherwise "income" is None.
+
+        Returns:
+            dict: {"income", "spending", "months"} with dollar averages
+        """
+        today = today or datetime.date.today()
+        end = today.replace(day=1)
+        start = end
+        for _ in range(months):
+            start = (start - datetime.timedelta(days=1)).replace(day=1)
+        window, _ = self._select(start.isoformat(), (end - datetime.timedelta(days=1)).isoformat())
+        covered = months if len(self) and self.timestamps[0] <= parse_date_bound(start.isoformat()) else None
+        if covered is None:
+            # History starts inside the window: average over the months actually present
+            first = datetime.datetime.fromtimestamp(int(self.timestamps[window][0]), datetime.timezone.utc).date() if window.stop > window.start else end
+            covered = max((end.year - first.year) * 12 + end.month - first.month, 1)
+        return {
+            "income": _dollars(self.income[window].sum() / covered) if self.debits_negative else None,
+            "spending": _dollars(self.spend[window].sum() / covered),
+            "months": covered,
+        }
+
+    def summary(self) -> dict:
+        return {
+            "transactions": len(self),
+            "categories": len(self.categories),
+            "merchants": len(self.merchants),
+            "first_date": self.transactions[0].date if len(self) else None,
+            "last_date": self.transactions[-1].date if len(self) else None,
+            "total_spent": format_amount(_dollars(self.spend.sum())),
+        }
+
+
+class TransactionStore:
+    """Loads and caches UserTransactions per user."""
+
+    def __init__(self, client: BankApiClient = bank_client, cache: FinancialResultCache = financial_cache):
+        self._client = client
+        self._cache = cache
+
+    async def get(self, user_id: str) -> UserTransactions:
+        """
+        Return the user's transactions, loading them from the bank API on a miss.
+
+        Raises:
+            BankApiError: If the bank API is unavailable
+        """
+        async def load():
+            return UserTransactions(await self._client.fetch_transactions(user_id))
+
+        return await self._cache.get_or_fetch((user_id, STORE_CACHE_TOOL, ""), load)
+
+    def invalidate(self, user_id: str):
+        """Drop the user's loaded transactions (and their other cached reads)."""
+        self._cache.invalidate_user(user_id)
+
+
+transaction_store = TransactionStore()
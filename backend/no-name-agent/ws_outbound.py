@@ -0,0 +1,212 @@
+"""
+Backpressure-aware outbound queue for a client WebSocket.
+
+agent_to_client_messaging used to await websocket.send_text once per ADK
+event, so a slow client stalled consumption of live_events and backed up
+the live model stream. Instead, events are now put on a per-connection
+queue and a dedicated writer task drains it:
+
+- adjacent PCM chunks are coalesced into frames of up to
+  WS_AUDIO_COALESCE_BYTES
+- queued audio is bounded by WS_AUDIO_MAX_QUEUED_BYTES; past that the
+  WS_AUDIO_DROP_POLICY ("drop_oldest" or "drop_newest") discards audio.
+  Chunks larger than a frame are split first, so none can exceed the bound
+- every chunk that waited longer than WS_AUDIO_MAX_AGE_MS is dropped as
+  stale, including those merged into a coalesced frame, and pending audio
+  is discarded when the model is interrupted
+- control and text messages are never dropped; producers wait when more
+  than WS_OUTBOUND_MAX_MESSAGES of them are queued
+"""
+
+import os
+import json
+import time
+import base64
+import asyncio
+from collections import deque
+
+from ws_protocol import encode_pcm_frame
+
+MAX_MESSAGES = int(os.getenv("WS_OUTBOUND_MAX_MESSAGES", "256"))
+AUDIO_MAX_QUEUED_BYTES = int(os.getenv("WS_AUDIO_MAX_QUEUED_BYTES", "192000"))
+AUDIO_COALESCE_BYTES = int(os.getenv("WS_AUDIO_COALESCE_BYTES", "9600"))
+AUDIO_MAX_AGE_MS = float(os.getenv("WS_AUDIO_MAX_AGE_MS", "2000"))
+AUDIO_DROP_POLICY = os.getenv("WS_AUDIO_DROP_POLICY", "drop_oldest")
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+_AUDIO = "audio"
+_MESSAGE = "message"
+
+
+class OutboundQueue:
+    """Per-connection send queue drained by a single writer task."""
+
+    def __init__(
+        self,
+        websocket,
+        binary_audio: bool = False,
+        max_messages: int = MAX_MESSAGES,
+        audio_max_queued_bytes: int = AUDIO_MAX_QUEUED_BYTES,
+        audio_coalesce_bytes: int = AUDIO_COALESCE_BYTES,
+        audio_max_age_ms: float = AUDIO_MAX_AGE_MS,
+        audio_drop_policy: str = AUDIO_DROP_POLICY,
+    ):
+        if audio_drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown audio drop policy: {audio_drop_policy}")
+        self._websocket = websocket
+        self._binary_audio = binary_audio
+        self._max_messages = max_messages
+        self._audio_max_queued_bytes = audio_max_queued_bytes
+        self._audio_coalesce_bytes = audio_coalesce_bytes
+        self._audio_max_age = audio_max_age_ms / 1000
+        self._audio_drop_policy = audio_drop_policy
+
+        self._items = deque()  # (kind, enqueued_at, payload)
+        self._queued_messages = 0
+        self._queued_audio_bytes = 0
+        self._audio_sequence = 0
+        self._closed = False
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+
+        self.frames_sent = 0
+        self.audio_chunks_coalesced = 0
+        self.audio_chunks_dropped = 0
+        self.audio_bytes_dropped = 0
+        self.max_depth = 0
+
+    async def put_message(self, message: dict):
+        """Queue a JSON control/text message, waiting if too many are pending."""
+        while self._queued_messages >= self._max_messages and not self._closed:
+            self._space.clear()
+            await self._space.wait()
+        self._append(_MESSAGE, message)
+        self._queued_messages += 1
+
+    def put_audio(self, pcm_data: bytes):
+        """Queue a PCM chunk, applying the drop policy if audio is backed up."""
+        # Split on a whole 16-bit sample, so each piece fits a frame and the bound
+        piece = min(self._audio_coalesce_bytes, self._audio_max_queued_bytes)
+        piece = max(piece - piece % 2, 2)
+        if len(pcm_data) > piece:
+            for offset in range(0, len(pcm_data), piece):
+                self._put_audio_chunk(pcm_data[offset:offset + piece])
+            return
+        self._put_audio_chunk(pcm_data)
+
+    def _put_audio_chunk(self, pcm_data: bytes):
+        if self._queued_audio_bytes + len(pcm_data) > self._audio_max_queued_bytes:
+            if self._audio_drop_policy == DROP_NEWEST:
+                self._record_drop(len(pcm_data))
+                return
+            self._drop_audio(len(pcm_data))
+        self._append(_AUDIO, pcm_data)
+        self._queued_audio_bytes += len(pcm_data)
+
+    def discard_audio(self):
+        """Drop all pending audio (e.g. after the model was interrupted)."""
+        self._drop_audio()
+
+    def close(self):
+        """Stop accepting items; the writer exits once the queue is drained."""
+        self._closed = True
+        self._wakeup.set()
+        self._space.set()
+
+    def _append(self, kind: str, payload):
+        self._items.append((kind, time.monotonic(), payload))
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._wakeup.set()
+
+    def _record_drop(self, size: int):
+        self.audio_chunks_dropped += 1
+        self.audio_bytes_dropped += size
+
+    def _drop_audio(self, needed: int = None):
+        """Drop queued audio oldest first: all of it, or just enough to fit `needed` bytes."""
+        kept = deque()
+        for item in self._items:
+            kind, _, payload = item
+            has_room = (
+                needed is not None
+                and self._queued_audio_bytes + needed <= self._audio_max_queued_bytes
+            )
+            if kind == _AUDIO and not has_room:
+                self._queued_audio_bytes -= len(payload)
+                self._record_drop(len(payload))
+            else:
+                kept.append(item)
+        self._items = kept
+
+    async def run(self):
+        """Writer task: send queued items until closed and drained."""
+        while True:
+            if not self._items:
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            kind, enqueued_at, payload = self._items.popleft()
+            if kind == _MESSAGE:
+                self._queued_messages -= 1
+                self._space.set()
+                await self._websocket.send_text(json.dumps(payload))
+                self.frames_sent += 1
+                continue
+
+            self._queued_audio_bytes -= len(payload)
+            pcm_data = self._coalesce(payload, enqueued_at)
+            if not pcm_data:
+                continue
+            await self._send_audio(pcm_data)
+            self.frames_sent += 1
+
+    def _coalesce(self, first_chunk: bytes, enqueued_at: float) -> bytes:
+        """Merge directly following audio chunks into one frame, leaving out stale ones."""
+        now = time.monotonic()
+        chunks = []
+        size = 0
+        item = (_AUDIO, enqueued_at, first_chunk)
+        while True:
+            _, enqueued_at, chunk = item
+            if now - enqueued_at > self._audio_max_age:
+                self._record_drop(len(chunk))
+            else:
+                chunks.append(chunk)
+                size += len(chunk)
+            if not self._items or self._items[0][0] != _AUDIO:
+                break
+            if size + len(self._items[0][2]) > self._audio_coalesce_bytes:
+                break
+            item = self._items.popleft()
+            self._queued_audio_bytes -= len(item[2])
+        self.audio_chunks_coalesced += max(len(chunks) - 1, 0)
+        return b"".join(chunks) if len(chunks) > 1 else (chunks[0] if chunks else b"")
+
+    async def _send_audio(self, pcm_data: bytes):
+        if self._binary_audio:
+            await self._websocket.send_bytes(encode_pcm_frame(pcm_data, self._audio_sequence))
+            self._audio_sequence += 1
+            return
+        message = {
+            "mime_type": "audio/pcm",
+            "data": base64.b64encode(pcm_data).decode("ascii"),
+        }
+        await self._websocket.send_text(json.dumps(message))
+
+    def metrics(self) -> dict:
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "queued_messages": self._queued_messages,
+            "queued_audio_bytes": self._queued_audio_bytes,
+            "frames_sent": self.frames_sent,
+            "audio_chunks_coalesced": self.audio_chunks_coalesced,
+            "audio_chunks_dropped": self.audio_chunks_dropped,
+            "audio_bytes_dropped": self.audio_bytes_dropped,
+        }
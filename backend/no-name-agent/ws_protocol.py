@@ -0,0 +1,66 @@
+"""
+Binary WebSocket framing for PCM audio.
+
+Clients that request the PCM_SUBPROTOCOL sub-protocol exchange audio as raw
+binary frames instead of base64 strings inside JSON, which saves a third of
+the audio bandwidth and the encode/decode work on both ends. Control and
+text messages keep using JSON text frames, and clients that don't request
+the sub-protocol keep the original all-JSON format.
+
+Binary frame layout (network byte order):
+
+    +---------+------+----------+-------------------+
+    | version | kind | sequence | payload ...       |
+    | 1 byte  | 1 B  | 2 bytes  | raw 16-bit PCM    |
+    +---------+------+----------+-------------------+
+"""
+
+import struct
+
+PCM_SUBPROTOCOL = "cymbal.pcm.v1"
+
+FRAME_VERSION = 1
+KIND_AUDIO_PCM = 1
+
+FRAME_HEADER = struct.Struct("!BBH")
+
+
+class FrameError(ValueError):
+    """Raised when a binary frame cannot be decoded."""
+
+
+def negotiate_subprotocol(requested: list) -> str:
+    """Return PCM_SUBPROTOCOL if the client offered it, else None."""
+    return PCM_SUBPROTOCOL if PCM_SUBPROTOCOL in (requested or []) else None
+
+
+def encode_pcm_frame(pcm_data: bytes, sequence: int = 0) -> bytes:
+    """
+    Wrap raw PCM audio in a binary frame.
+
+    Args:
+        pcm_data (bytes): Raw PCM audio
+        sequence (int): Frame counter, wraps at 65536
+
+    Returns:
+        bytes: The header followed by the audio
+    """
+    return FRAME_HEADER.pack(FRAME_VERSION, KIND_AUDIO_PCM, sequence & 0xFFFF) + pcm_data
+
+
+def decode_frame(frame: bytes) -> tuple:
+    """
+    Split a binary frame into its header fields and payload.
+
+    Args:
+        frame (bytes): A frame produced by encode_pcm_frame (or the client)
+
+    Returns:
+        tuple: (kind, sequence, payload)
+    """
+    if len(frame) < FRAME_HEADER.size:
+        raise FrameError(f"Frame too short: {len(frame)} bytes")
+    version, kind, sequence = FRAME_HEADER.unpack_from(frame)
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version: {version}")
+    return kind, sequence, memoryview(frame)[FRAME_HEADER.size:].tobytes()
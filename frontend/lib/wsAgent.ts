@@ -5,6 +5,13 @@ export type AgentIncomingMessage = {
   data?: string;
 };
 
+// Binary audio sub-protocol (see backend/no-name-agent/ws_protocol.py).
+// Frame layout: version (u8), kind (u8), sequence (u16, big-endian), raw PCM.
+const PCM_SUBPROTOCOL = 'cymbal.pcm.v1';
+const FRAME_VERSION = 1;
+const KIND_AUDIO_PCM = 1;
+const FRAME_HEADER_SIZE = 4;
+
 export type AgentEventHandlers = {
   onOpen?: () => void;
   onClose?: () => void;
@@ -30,6 +37,7 @@ export class RealtimeAgentClient {
   private micStream: MediaStream | null = null;
   private audioBuffer: Uint8Array[] = [];
   private bufferTimer: number | null = null;
+  private audioSequence: number = 0;
 
   private handlers: AgentEventHandlers;
 
@@ -43,6 +51,11 @@ export class RealtimeAgentClient {
     return !!this.websocket && this.websocket.readyState === WebSocket.OPEN;
   }
 
+  // True once the server has agreed to exchange audio as binary frames
+  private get binaryAudio(): boolean {
+    return !!this.websocket && this.websocket.protocol === PCM_SUBPROTOCOL;
+  }
+
   // Method to update permission context function
   setPermissionContext(fn: () => string) {
     this.permissionContextFn = fn;
@@ -59,7 +72,9 @@ export class RealtimeAgentClient {
       try { this.websocket.close(); } catch {}
     }
 
-    this.websocket = new WebSocket(wsUrl);
+    // Offer binary audio frames; older servers ignore the sub-protocol
+    this.websocket = new WebSocket(wsUrl, [PCM_SUBPROTOCOL]);
+    this.websocket.binaryType = 'arraybuffer';
     this.websocket.onopen = () => {
       this.handlers.onOpen && this.handlers.onOpen();
     };
@@ -181,6 +196,17 @@ export class RealtimeAgentClient {
 
   private sendAudioPcm(buffer: ArrayBuffer, agentId?: string) {
     if (!this.connected) return;
+    if (this.binaryAudio) {
+      const frame = new Uint8Array(FRAME_HEADER_SIZE + buffer.byteLength);
+      const header = new DataView(frame.buffer);
+      header.setUint8(0, FRAME_VERSION);
+      header.setUint8(1, KIND_AUDIO_PCM);
+      header.setUint16(2, this.audioSequence & 0xffff);
+      frame.set(new Uint8Array(buffer), FRAME_HEADER_SIZE);
+      this.audioSequence = (this.audioSequence + 1) & 0xffff;
+      this.websocket!.send(frame.buffer);
+      return;
+    }
     const base64 = this.arrayBufferToBase64(buffer);
     const payload: any = { mime_type: 'audio/pcm', data: base64 };
     if (agentId) payload.agent_id = agentId;
@@ -188,6 +214,10 @@ export class RealtimeAgentClient {
   }
 
   private handleIncoming(evt: MessageEvent) {
+    if (evt.data instanceof ArrayBuffer) {
+      this.handleBinaryFrame(evt.data);
+      return;
+    }
     const message: AgentIncomingMessage = JSON.parse(evt.data);
     if (message.turn_complete) {
       this.handlers.onTurnComplete && this.handlers.onTurnComplete();
@@ -201,18 +231,28 @@ export class RealtimeAgentClient {
       return;
     }
     if (message.mime_type === 'audio/pcm' && this.audioPlayerNode && message.data) {
-      if (!this.isSpeaking) {
-        this.isSpeaking = true;
-        this.handlers.onIsSpeaking && this.handlers.onIsSpeaking(true);
-      }
-      const arr = this.base64ToArray(message.data);
-      this.audioPlayerNode.port.postMessage(arr);
+      this.playAudio(this.base64ToArray(message.data));
     }
     if (message.mime_type === 'text/plain' && typeof message.data === 'string') {
       this.handlers.onText && this.handlers.onText(message.data);
     }
   }
 
+  private handleBinaryFrame(frame: ArrayBuffer) {
+    if (frame.byteLength < FRAME_HEADER_SIZE) return;
+    const header = new DataView(frame);
+    if (header.getUint8(0) !== FRAME_VERSION || header.getUint8(1) !== KIND_AUDIO_PCM) return;
+    if (this.audioPlayerNode) this.playAudio(frame.slice(FRAME_HEADER_SIZE));
+  }
+
+  private playAudio(pcm: ArrayBuffer) {
+    if (!this.isSpeaking) {
+      this.isSpeaking = true;
+      this.handlers.onIsSpeaking && this.handlers.onIsSpeaking(true);
+    }
+    this.audioPlayerNode.port.postMessage(pcm);
+  }
+
   private base64ToArray(base64: string): ArrayBuffer {
     const binaryString = window.atob(base64);
     const len = binaryString.length;